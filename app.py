@@ -0,0 +1,338 @@
+'''
+Serves ResearchMatch over HTTP.
+
+    python app.py --data public/data/results.json --index index --workers 4
+
+The matchers are loaded once in the parent process and the listening
+socket is shared with pre-forked worker processes, which inherit the
+matchers copy-on-write. Build the index first (scripts/build_index.py)
+so the score matrices are memory-mapped and every worker reads the same
+pages instead of holding its own copy.
+
+Workers poll the delta directory written by `scripts/enrich.py` and apply
+new deltas to their matchers in place, so a dataset refresh does not need
+a restart (updated structures are private to each worker).
+
+Endpoints:
+    GET /match   ?q=...&strategy=keyword&model=scraping&N=50&sort_by=citations&page=1&page_size=20
+    GET /topics  ?model=scraping
+'''
+import gc
+import os
+import time
+import sys
+import atexit
+import signal
+import socket
+import argparse
+import threading
+
+from flask import Flask, jsonify, request
+from werkzeug.serving import make_server
+
+from matching.artifacts import INDEX_PATH
+from matching.dataset import DELTA_PATH, load_delta
+from matching.sorters import SortMetric
+from matching.matchers import (
+    NUM_MATCHES,
+    TFIDFMatcher,
+    Word2VecMatcher,
+    KeywordMatcher,
+)
+from dashboard.monitor import exporter_port, start_exporter
+
+
+SERVER_DATA_PATH: str = 'public/data/results.json'
+STATIC_PATH: str = 'public'
+MATCHER_CLASSES: dict[str, type] = {
+    'tfidf': TFIDFMatcher,
+    'word2vec': Word2VecMatcher,
+    'keyword': KeywordMatcher,
+}
+MAX_MATCHES: int = int(os.environ.get('RESEARCHMATCH_MAX_MATCHES', 200))
+PAGE_SIZE: int = 20
+MAX_PAGE_SIZE: int = 100
+DELTA_POLL_SECONDS: float = float(os.environ.get('RESEARCHMATCH_DELTA_POLL_SECONDS', 10))
+
+
+def load_matchers(
+        data_path: str,
+        index_path: str | None,
+        strategies: list[str]
+    ) -> dict:
+    '''
+    Loads the matchers served by the application.
+
+    Args:
+        data_path: Dataset JSON file
+        index_path: Root index directory (None fits every model)
+        strategies: Names of the strategies to load
+
+    Returns:
+        Strategy name -> matcher
+    '''
+    matchers = {}
+    for strategy in strategies:
+        matchers[strategy] = MATCHER_CLASSES[strategy](data_path, index_path)
+    return matchers
+
+
+def apply_deltas(matchers: dict, delta_path: str = DELTA_PATH) -> int:
+    '''
+    Brings every matcher up to the newest dataset in the delta directory.
+
+    Args:
+        matchers: Strategy name -> matcher
+        delta_path: Directory of deltas named after their base version
+
+    Returns:
+        Number of deltas applied
+    '''
+    applied = 0
+    for strategy, matcher in matchers.items():
+        delta = load_delta(matcher.dataset_version, delta_path)
+        while delta is not None and delta['version'] != matcher.dataset_version:
+            try:
+                matcher.apply_delta(delta)
+            except (ValueError, KeyError) as e:
+                print(f'Warning: Could not apply delta to {strategy}. Error: {e}')
+                break
+            applied += 1
+            delta = load_delta(matcher.dataset_version, delta_path)
+    return applied
+
+
+def _watch_deltas(matchers: dict, delta_path: str, interval: float):
+    '''
+    Applies new deltas every `interval` seconds in a daemon thread.
+    '''
+    def run():
+        while True:
+            try:
+                if apply_deltas(matchers, delta_path):
+                    version = next(iter(matchers.values())).dataset_version
+                    print(f'Worker {os.getpid()} updated to dataset {version}')
+            except Exception as e:
+                print(f'Warning: Delta update failed. Error: {e}')
+            time.sleep(interval)
+
+    threading.Thread(target=run, name='delta-watcher', daemon=True).start()
+
+
+def _int_arg(name: str, default: int, low: int, high: int) -> int:
+    value = request.args.get(name, default, type=int)
+    return max(low, min(high, value))
+
+
+def _has_areas(entry: dict, model: str) -> bool:
+    research_areas = entry.get('research_areas')
+    return isinstance(research_areas, dict) and any(research_areas.get(model) or [])
+
+
+def create_app(matchers: dict) -> Flask:
+    '''
+    Builds the Flask application around preloaded matchers.
+
+    Args:
+        matchers: Strategy name -> matcher
+
+    Returns:
+        Flask application
+    '''
+    app = Flask(__name__, static_folder=STATIC_PATH, static_url_path='')
+    default_strategy = 'keyword' if 'keyword' in matchers else next(iter(matchers))
+
+    @app.get('/')
+    def index():
+        return app.send_static_file('index.html')
+
+    @app.get('/match')
+    def match():
+        strategy = request.args.get('strategy', default_strategy)
+        matcher = matchers.get(strategy)
+        if matcher is None:
+            return jsonify(
+                error=f'Unknown strategy {strategy!r}, expected one of {sorted(matchers)}'
+            ), 400
+        N = _int_arg('N', NUM_MATCHES, 1, MAX_MATCHES)
+        page = _int_arg('page', 1, 1, MAX_MATCHES)
+        page_size = _int_arg('page_size', PAGE_SIZE, 1, MAX_PAGE_SIZE)
+        try:
+            sort_by = request.args.get('sort_by')
+            sort_by = SortMetric(sort_by) if sort_by else None
+        except ValueError as e:
+            return jsonify(error=str(e)), 400
+        sort_reverse = request.args.get('reverse', 'true').lower() not in (
+            'false', '0', 'no'
+        )
+
+        # repeated q parameters (e.g. selected topics) form one query
+        query = ' '.join(q.strip() for q in request.args.getlist('q') if q.strip())
+        # the matchers score the areas of every source; when a source is
+        # given, only researchers with areas from it are returned, so the
+        # candidate list is widened before it is filtered down to N
+        model = request.args.get('model')
+        matches = matcher.get_matches(
+            query=query,
+            N=MAX_MATCHES if model else N,
+            sort_by=sort_by,
+            sort_reverse=sort_reverse,
+        )
+        if model:
+            matches = [m for m in matches if _has_areas(m, model)][:N]
+        offset = (page - 1) * page_size
+        return jsonify(
+            strategy=strategy,
+            model=model,
+            query=query,
+            total=len(matches),
+            page=page,
+            page_size=page_size,
+            results=matches[offset:offset + page_size],
+        )
+
+    @app.get('/topics')
+    def topics():
+        model = request.args.get('model', 'scraping')
+        areas = set()
+        for entry in next(iter(matchers.values())).data:
+            research_areas = entry.get('research_areas')
+            if isinstance(research_areas, dict):
+                areas.update(a for a in research_areas.get(model) or [] if a)
+        return jsonify(model=model, topics=sorted(areas))
+
+    return app
+
+
+def _run_worker(
+        app: Flask, sock: socket.socket, worker_index: int,
+        matchers: dict, delta_path: str | None
+    ):
+    '''
+    Serves requests on the shared socket until interrupted.
+    '''
+    if delta_path is not None:
+        _watch_deltas(matchers, delta_path, DELTA_POLL_SECONDS)
+    if exporter_port is not None:
+        # one exporter per worker, on consecutive ports
+        start_exporter(exporter_port + worker_index)
+    host, port = sock.getsockname()[:2]
+    server = make_server(host, port, app, threaded=True, fd=sock.fileno())
+    try:
+        server.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        server.server_close()
+
+
+def _spawn_worker(
+        app: Flask, sock: socket.socket, worker_index: int,
+        matchers: dict, delta_path: str | None
+    ) -> int:
+    pid = os.fork()
+    if pid:
+        return pid
+    # worker: exit on SIGTERM through SystemExit so buffered metrics flush
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    code = 0
+    try:
+        _run_worker(app, sock, worker_index, matchers, delta_path)
+    except Exception as e:
+        print(f'Warning: Worker {worker_index} failed. Error: {e}')
+        code = 1
+    finally:
+        atexit._run_exitfuncs()
+        os._exit(code)
+
+
+def serve(
+        matchers: dict, host: str, port: int, workers: int,
+        delta_path: str | None = DELTA_PATH
+    ):
+    '''
+    Serves the application from pre-forked worker processes.
+
+    The parent binds the socket, forks the workers and restarts any that
+    exit until it receives SIGINT or SIGTERM.
+
+    Args:
+        matchers: Strategy name -> matcher
+        host: Interface to bind
+        port: Port to bind
+        workers: Number of worker processes (1 serves in-process)
+        delta_path: Delta directory to poll (None disables updates)
+    '''
+    app = create_app(matchers)
+    sock = socket.create_server((host, port), backlog=128)
+    sock.set_inheritable(True)
+    print(f'Serving ResearchMatch on http://{host}:{sock.getsockname()[1]}')
+
+    if workers <= 1 or not hasattr(os, 'fork'):
+        _run_worker(app, sock, 0, matchers, delta_path)
+        return
+
+    # keep the loaded matchers out of the collector so workers do not
+    # touch (and copy) their pages
+    gc.collect()
+    gc.freeze()
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    children = {}
+    for worker_index in range(workers):
+        children[_spawn_worker(
+            app, sock, worker_index, matchers, delta_path
+        )] = worker_index
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while children:
+        try:
+            pid, _ = os.wait()
+        except ChildProcessError:
+            break
+        worker_index = children.pop(pid, None)
+        if worker_index is not None and not stopping:
+            print(f'Warning: Worker {worker_index} exited, restarting.')
+            children[_spawn_worker(
+                app, sock, worker_index, matchers, delta_path
+            )] = worker_index
+    sock.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve ResearchMatch over HTTP.')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind.')
+    parser.add_argument('--port', type=int, default=8000, help='Port to bind.')
+    parser.add_argument(
+        '--workers', type=int, default=os.cpu_count() or 1,
+        help='Worker processes sharing the loaded matchers.'
+    )
+    parser.add_argument('--data', default=SERVER_DATA_PATH, help='Dataset JSON file.')
+    parser.add_argument(
+        '--index', default=INDEX_PATH,
+        help='Matcher index directory built by scripts/build_index.py.'
+    )
+    parser.add_argument(
+        '--deltas', default=DELTA_PATH,
+        help='Directory of dataset deltas applied without restarting.'
+    )
+    parser.add_argument(
+        '--strategies', nargs='+', default=list(MATCHER_CLASSES),
+        choices=list(MATCHER_CLASSES), help='Matching strategies to serve.'
+    )
+    args = parser.parse_args()
+
+    matchers = load_matchers(args.data, args.index, args.strategies)
+    serve(matchers, args.host, args.port, args.workers, args.deltas)
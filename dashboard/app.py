@@ -31,13 +31,64 @@ sys.path.append(
 )
 
 from dashboard.utils import (
-    load_metrics,
-    rolling_mean,
-    rolling_p05,
-    rolling_p95,
+    get_metrics_store,
+    box_stats,
+    downsample,
+    cache_tier_counts,
+    evaluation_costs,
+    load_latency_percentiles,
+    MetricsFrameCache,
+    RollingStatsCache,
 )
 
 
+# sidebar time windows -> seconds (None loads the full history)
+TIME_WINDOWS: dict[str, int | None] = {
+    'Last 15 minutes': 15 * 60,
+    'Last hour': 60 * 60,
+    'Last 6 hours': 6 * 60 * 60,
+    'Last 24 hours': 24 * 60 * 60,
+    'Last 7 days': 7 * 24 * 60 * 60,
+    'All time': None,
+}
+DEFAULT_TIME_WINDOW: str = 'Last 24 hours'
+# points sent to the browser per line plot
+POINT_BUDGET: int = int(os.environ.get('DASHBOARD_POINT_BUDGET', 5000))
+RAW_PAGE_SIZE: int = int(os.environ.get('DASHBOARD_PAGE_SIZE', 100))
+REFRESH_SECONDS: float = float(os.environ.get('DASHBOARD_REFRESH_SECONDS', 1))
+
+
+@st.cache_resource
+def get_metrics_frames() -> MetricsFrameCache:
+    """
+    Metrics frame shared across refreshes and sessions, so each refresh
+    only reads newly recorded rows.
+    """
+    return MetricsFrameCache()
+
+
+@st.cache_resource
+def get_rolling_stats() -> RollingStatsCache:
+    """
+    Rolling statistics shared across refreshes and sessions, so each
+    refresh only processes newly recorded rows.
+    """
+    return RollingStatsCache()
+
+
+@st.cache_data(ttl=10)
+def get_stage_percentiles(
+        start: float | None, strategies: tuple[str, ...] | None
+    ) -> pd.DataFrame:
+    """
+    Stage latency percentiles, merged from the stored histograms at most
+    once per histogram interval.
+    """
+    return load_latency_percentiles(
+        start=start, strategies=list(strategies) if strategies else None
+    )
+
+
 st.set_page_config(
     page_title='ResearchMatch Performance Dashboard',
     page_icon='📊',
@@ -50,6 +101,25 @@ This dashboard aggregates metrics of different matching strategies.
 Metrics are updated whenever a matching operation is performed.
 ''')
 
+# only the displayed window is read from the metrics store
+window_label = st.sidebar.selectbox(
+    'Time window',
+    list(TIME_WINDOWS),
+    index=list(TIME_WINDOWS).index(DEFAULT_TIME_WINDOW)
+)
+selected_strategies = st.sidebar.multiselect(
+    'Strategies', get_metrics_store().strategies()
+)
+point_budget = st.sidebar.number_input(
+    'Points per plot', min_value=100, value=POINT_BUDGET, step=500
+)
+refresh_seconds = st.sidebar.number_input(
+    'Refresh interval (seconds, 0 = off)',
+    min_value=0.0,
+    value=REFRESH_SECONDS,
+    step=1.0
+)
+
 # tabs for each metric
 tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
     'Latency & Cache',
@@ -74,30 +144,34 @@ def create_box_plot(
         strategy_col: Column name containing strategy names
         
     The plot shows the distribution of metric values across different
-    matching strategies using a box-and-whisker plot.
+    matching strategies using a box-and-whisker plot. Box statistics are
+    computed here, so only a handful of numbers per strategy reach the
+    browser.
     """
-    metrics = load_metrics()
-    if not metrics[metric_name]:
+    if df.empty:
         tab.write(f'No data available for {metric_name}.')
         return
 
-    # create a color-map
-    unique_strategies = sorted(df[strategy_col].unique())
+    # per-strategy box statistics, colored like the trend lines
+    stats = box_stats(df, strategy_col, metric_name).sort_index()
     colors = px.colors.qualitative.Plotly
-    color_map = {
-        strategy: colors[i % len(colors)] for i, strategy in enumerate(unique_strategies)
-    }
     
-    fig = px.box(
-        df,
-        x=strategy_col,
-        y=metric_name,
-        title=f'Query Response {metric_name.title()} Distribution',
-        color=strategy_col,
-        color_discrete_map=color_map
-    )
+    fig = go.Figure()
+    for i, (strategy, row) in enumerate(stats.iterrows()):
+        fig.add_trace(go.Box(
+            x=[strategy],
+            q1=[row['q1']],
+            median=[row['median']],
+            q3=[row['q3']],
+            mean=[row['mean']],
+            lowerfence=[row['lowerfence']],
+            upperfence=[row['upperfence']],
+            name=strategy,
+            marker_color=colors[i % len(colors)]
+        ))
     
     fig.update_layout(
+        title=f'Query Response {metric_name.title()} Distribution',
         showlegend=False,
         xaxis_title='Matching Strategy',
         yaxis_title=metric_name.title(),
@@ -123,6 +197,8 @@ def create_line_plot(
     - Moving average line
     - 90% confidence interval band
     - Strategy-wise color coding
+    Statistics use every row; the plotted points are downsampled to the
+    sidebar's point budget.
     """
     if df.empty:
         tab.write(
@@ -138,12 +214,18 @@ def create_line_plot(
             df['Timestamp'], unit='s'
         )
     
-    # sort for rolling statistics
-    df = df.sort_values(by=[strategy_col, 'Timestamp'])
+    # sort for rolling statistics (stable, so ties keep insertion order)
+    df = df.sort_values(by=[strategy_col, 'Timestamp'], kind='stable')
 
-    df['MA'] = df.groupby(strategy_col)[metric_name].transform(rolling_mean)
-    df['P05'] = df.groupby(strategy_col)[metric_name].transform(rolling_p05)
-    df['P95'] = df.groupby(strategy_col)[metric_name].transform(rolling_p95)
+    # rolling statistics, computed incrementally per strategy
+    rolling_stats = get_rolling_stats()
+    df = df.join(pd.concat([
+        rolling_stats.update(
+            (metric_name, strategy_col, strategy), strategy_values
+        )
+        for strategy, strategy_values in df.groupby(strategy_col)[metric_name]
+    ]))
+    df = downsample(df, strategy_col, point_budget)
     
     # create a color-map
     unique_strategies = sorted(df[strategy_col].unique())
@@ -215,22 +297,22 @@ def create_line_plot(
     tab.plotly_chart(fig, use_container_width=True)
 
 # plots for each metric
-metrics_data = load_metrics()
+window = TIME_WINDOWS[window_label]
+window_start = None if window is None else time.time() - window
+metrics_df = get_metrics_frames().load(
+    start=window_start,
+    strategies=selected_strategies or None
+)
+metrics_df = metrics_df.assign(
+    Timestamp=pd.to_datetime(metrics_df['timestamp'], unit='s')
+).rename(columns={'strategy': 'Strategy'})
 
 # plot latency
 with tab1:
     st.header('Latency & Cache Analysis')
     
-    if 'latency' in metrics_data and metrics_data['latency']:
-        latency_df_raw = pd.DataFrame(
-            metrics_data['latency'], 
-            columns=['Strategy', 'Timestamp', 'latency']
-        )
-        latency_df_raw['Timestamp'] = pd.to_datetime(
-            latency_df_raw['Timestamp'], unit='s'
-        )
-        latency_df_raw = latency_df_raw.sort_values('Timestamp')
-
+    latency_df_raw = metrics_df[['Strategy', 'Timestamp', 'latency']].dropna()
+    if not latency_df_raw.empty:
         # using 'Strategy' column in raw df for box plot to show hits/misses
         col1, col2 = st.columns(2)
         with col1:
@@ -241,6 +323,29 @@ with tab1:
             create_line_plot(
                 'latency', st, latency_df_raw, strategy_col='Strategy'
             )
+
+        # hits/misses per cache tier
+        st.subheader('Cache Tiers')
+        cache_counts = cache_tier_counts(metrics_df)
+        if cache_counts.empty:
+            st.write('No cache tier data available.')
+        else:
+            st.dataframe(cache_counts)
+
+        # per-stage latency percentiles from the merged histograms
+        st.subheader('Stage Latency Percentiles')
+        stage_percentiles = get_stage_percentiles(
+            None if window_start is None else int(window_start) // 60 * 60,
+            tuple(selected_strategies) or None
+        )
+        if stage_percentiles.empty:
+            st.write('No stage timing data available.')
+        else:
+            st.dataframe(stage_percentiles)
+
+        # quality metrics are only computed for sampled requests
+        st.subheader('Quality Evaluation Cost')
+        st.dataframe(evaluation_costs(metrics_df))
     else:
          st.write('No latency data available.')
 
@@ -252,11 +357,8 @@ for metric_name, tab in zip(
 ):
     with tab:
         st.header(f'{metric_name.title()} Analysis')
-        if metric_name in metrics_data and metrics_data[metric_name]:
-            df_metric = pd.DataFrame(
-                metrics_data[metric_name],
-                columns=['Strategy', 'Timestamp', metric_name]
-            )
+        df_metric = metrics_df[['Strategy', 'Timestamp', metric_name]].dropna()
+        if not df_metric.empty:
             # 'BaseStrategy' -> aggregate hits/misses
             df_metric['BaseStrategy'] = df_metric['Strategy'].str.replace(
                 ' (Cache Hit)', '', regex=False
@@ -275,32 +377,31 @@ for metric_name, tab in zip(
             st.write(f'No {metric_name} data available.')
 
 
-# section for raw data
+# section for raw data (newest first, one page at a time)
 st.header('Raw Metrics Data')
-metrics = load_metrics()
-if any(metrics.values()):
-    # DataFrame with all metrics
-    data = []
-    num_entries = len(metrics.get('latency', []))
-    for i in range(num_entries):
-        row = {'Strategy': metrics['latency'][i][0],
-               'Timestamp': pd.to_datetime(metrics['latency'][i][1], unit='s'), # convert timestamp
-               'Latency': metrics['latency'][i][2],
-               'Precision': metrics['precision'][i][2],
-               'Recall': metrics['recall'][i][2],
-               'F1': metrics['f1'][i][2],
-               'BLEU': metrics['bleu'][i][2],
-               'ROUGE': metrics['rouge'][i][2]}
-        data.append(row)
-    
-    if data: # Check if data was populated
-        df = pd.DataFrame(data)
-        st.dataframe(df)
-    else:
-        st.write('No data available yet.')
+if not metrics_df.empty:
+    num_pages = max(1, -(-len(metrics_df) // RAW_PAGE_SIZE))
+    page = st.number_input(
+        f'Page (of {num_pages})', min_value=1, max_value=num_pages, value=1
+    )
+    end = len(metrics_df) - (page - 1) * RAW_PAGE_SIZE
+    page_df = metrics_df.iloc[max(0, end - RAW_PAGE_SIZE):end].iloc[::-1]
+    st.dataframe(page_df[[
+        'Strategy', 'Timestamp', 'latency', 'precision', 'recall', 'f1',
+        'bleu', 'rouge', 'cache_tier'
+    ]].rename(columns={
+        'latency': 'Latency',
+        'precision': 'Precision',
+        'recall': 'Recall',
+        'f1': 'F1',
+        'bleu': 'BLEU',
+        'rouge': 'ROUGE',
+        'cache_tier': 'Cache',
+    }))
 else:
     st.write('No data available yet.')
 
 # auto-refresh
-time.sleep(1)
-st.rerun()
\ No newline at end of file
+if refresh_seconds > 0:
+    time.sleep(refresh_seconds)
+    st.rerun()
\ No newline at end of file
@@ -0,0 +1,94 @@
+"""
+ResearchMatch In-Process Cache
+
+A small, thread-safe LRU cache with per-entry expiry. It serves as the
+first cache tier in front of Redis: hits are answered without a network
+round-trip or deserialization, and it keeps working when Redis is down.
+"""
+
+import time
+import threading
+from typing import Any
+from collections import OrderedDict
+
+
+class LocalCache:
+    """
+    Size-bounded LRU cache with a time-to-live for every entry.
+
+    Args:
+        max_size: Maximum number of entries kept
+        ttl: Seconds after which an entry expires
+    """
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        """
+        Look up a key, refreshing its recency on a hit.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None on a miss or expired entry
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                # expired
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: Any):
+        """
+        Insert or replace a key, evicting the least recently used entry
+        when the cache is full.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Remove every entry and reset the hit/miss counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hits, misses and current size
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+            }
@@ -0,0 +1,381 @@
+"""
+ResearchMatch OpenMetrics Exporter
+
+Counters and histograms for matcher performance, rendered in the
+OpenMetrics text format and served over HTTP at `/metrics` so a
+Prometheus-compatible scraper can poll them.
+
+Each metric is split into a fixed number of lock-striped shards. Threads
+are assigned a shard round-robin on their first update, so concurrent
+recorders rarely contend for the same lock, and the number of shards
+does not grow with the number of threads a server starts. A scrape sums
+the shards.
+"""
+
+import os
+import bisect
+import itertools
+import threading
+from typing import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+CONTENT_TYPE: str = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+RESULT_COUNT_BUCKETS: tuple[float, ...] = (0, 1, 2, 5, 10, 20, 50, 100)
+METRIC_SHARDS: int = max(1, int(os.environ.get('METRIC_SHARDS', 16)))
+
+# round-robin shard index of each thread, shared by all metrics
+_thread_shard = threading.local()
+_next_shard = itertools.count()
+
+
+def _shard_index() -> int:
+    index = getattr(_thread_shard, 'index', None)
+    if index is None:
+        index = _thread_shard.index = next(_next_shard) % METRIC_SHARDS
+    return index
+
+
+def _escape(value: str) -> str:
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('"', '\\"')
+        .replace('\n', '\\n')
+    )
+
+
+def _format_labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ''
+    pairs = ','.join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    )
+    return '{' + pairs + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _ShardedMetric:
+    """
+    Base for metrics whose state is kept in lock-striped dict shards.
+
+    Args:
+        name: Metric family name
+        documentation: Help text
+        labelnames: Names of the labels every sample carries
+    """
+    type_name = 'unknown'
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: tuple[str, ...] = ()
+        ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._shards = [
+            (threading.Lock(), {}) for _ in range(METRIC_SHARDS)
+        ]
+
+    def _shard(self) -> tuple[threading.Lock, dict]:
+        return self._shards[_shard_index()]
+
+    def _copy(self, shard: dict) -> dict:
+        return shard.copy()
+
+    def _snapshots(self) -> list[dict]:
+        snapshots = []
+        for lock, shard in self._shards:
+            with lock:
+                snapshots.append(self._copy(shard))
+        return snapshots
+
+    def _check_labels(self, values: tuple):
+        if len(values) != len(self.labelnames):
+            raise ValueError(
+                f'{self.name} expects labels {self.labelnames}, got {values}'
+            )
+
+    def render(self) -> Iterator[str]:
+        """
+        Render the metric family in the OpenMetrics text format.
+
+        Yields:
+            Lines of the exposition
+        """
+        yield f'# TYPE {self.name} {self.type_name}'
+        yield f'# HELP {self.name} {_escape(self.documentation)}'
+        yield from self._render_samples()
+
+    def _render_samples(self) -> Iterator[str]:
+        return iter(())
+
+
+class Counter(_ShardedMetric):
+    """
+    Monotonically increasing counter with labels.
+    """
+    type_name = 'counter'
+
+    def inc(self, *labelvalues, amount: float = 1):
+        """
+        Increase the counter.
+
+        Args:
+            labelvalues: One value per label name
+            amount: Non-negative increment
+        """
+        self._check_labels(labelvalues)
+        lock, shard = self._shard()
+        with lock:
+            shard[labelvalues] = shard.get(labelvalues, 0) + amount
+
+    def values(self) -> dict[tuple, float]:
+        """
+        Sum the counter over all threads.
+
+        Returns:
+            Label values -> total
+        """
+        totals = {}
+        for shard in self._snapshots():
+            for labelvalues, value in shard.items():
+                totals[labelvalues] = totals.get(labelvalues, 0) + value
+        return totals
+
+    def _render_samples(self) -> Iterator[str]:
+        for labelvalues, value in sorted(self.values().items()):
+            labels = _format_labels(self.labelnames, labelvalues)
+            yield f'{self.name}_total{labels} {_format_value(value)}'
+
+
+class Histogram(_ShardedMetric):
+    """
+    Histogram with fixed bucket upper bounds and labels.
+
+    Args:
+        name: Metric family name
+        documentation: Help text
+        labelnames: Names of the labels every sample carries
+        buckets: Increasing bucket upper bounds (+Inf is added)
+    """
+    type_name = 'histogram'
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: tuple[str, ...] = (),
+            buckets: tuple[float, ...] = LATENCY_BUCKETS
+        ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (float('inf'),)
+
+    def observe(self, *labelvalues, value: float):
+        """
+        Count an observation.
+
+        Args:
+            labelvalues: One value per label name
+            value: Observed value
+        """
+        self._check_labels(labelvalues)
+        bucket = bisect.bisect_left(self.buckets, value)
+        lock, shard = self._shard()
+        with lock:
+            state = shard.get(labelvalues)
+            if state is None:
+                state = shard[labelvalues] = [[0] * len(self.buckets), 0.0]
+            state[0][bucket] += 1
+            state[1] += value
+
+    def _copy(self, shard: dict) -> dict:
+        return {
+            labelvalues: (list(counts), total)
+            for labelvalues, (counts, total) in shard.items()
+        }
+
+    def values(self) -> dict[tuple, tuple[list[int], float]]:
+        """
+        Merge the histogram over all threads.
+
+        Returns:
+            Label values -> (per-bucket counts, sum of observations)
+        """
+        totals = {}
+        for shard in self._snapshots():
+            for labelvalues, (counts, total) in shard.items():
+                merged = totals.setdefault(
+                    labelvalues, [[0] * len(self.buckets), 0.0]
+                )
+                for i, count in enumerate(counts):
+                    merged[0][i] += count
+                merged[1] += total
+        return {key: (counts, total) for key, (counts, total) in totals.items()}
+
+    def _render_samples(self) -> Iterator[str]:
+        for labelvalues, (counts, total) in sorted(self.values().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(
+                    self.labelnames + ('le',),
+                    labelvalues + (_format_value(bound),)
+                )
+                yield f'{self.name}_bucket{labels} {cumulative}'
+            labels = _format_labels(self.labelnames, labelvalues)
+            yield f'{self.name}_count{labels} {cumulative}'
+            yield f'{self.name}_sum{labels} {_format_value(total)}'
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics rendered together.
+    """
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def counter(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: tuple[str, ...] = ()
+        ) -> Counter:
+        """
+        Create and register a counter.
+
+        Args:
+            name: Metric family name (without the `_total` suffix)
+            documentation: Help text
+            labelnames: Names of the labels every sample carries
+
+        Returns:
+            Registered counter
+        """
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: tuple[str, ...] = (),
+            buckets: tuple[float, ...] = LATENCY_BUCKETS
+        ) -> Histogram:
+        """
+        Create and register a histogram.
+
+        Args:
+            name: Metric family name
+            documentation: Help text
+            labelnames: Names of the labels every sample carries
+            buckets: Increasing bucket upper bounds
+
+        Returns:
+            Registered histogram
+        """
+        return self._register(
+            Histogram(name, documentation, labelnames, buckets)
+        )
+
+    def _register(self, metric: _ShardedMetric) -> _ShardedMetric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f'Metric {metric.name} is already registered')
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """
+        Render every registered metric.
+
+        Returns:
+            OpenMetrics text exposition, terminated by `# EOF`
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsExporter:
+    """
+    HTTP server exposing a registry at `/metrics` from a daemon thread.
+
+    Args:
+        registry: Metrics to serve
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+    """
+    def __init__(
+            self,
+            registry: MetricsRegistry,
+            host: str = '127.0.0.1',
+            port: int = 9464
+        ):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    def start(self) -> int:
+        """
+        Start serving in the background.
+
+        Returns:
+            Port the server is bound to
+        """
+        if self._server is not None:
+            return self.port
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name='metrics-exporter',
+            daemon=True
+        )
+        self._thread.start()
+        return self.port
+
+    def stop(self):
+        """
+        Stop serving.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,206 @@
+"""
+ResearchMatch Latency Histograms
+
+Mergeable latency histograms in the style of HdrHistogram: values (in
+nanoseconds) are counted in log-linear buckets, exact below 256 ns and
+with 128 sub-buckets per power of two above, so every recorded value is
+kept within 1% relative error at a fixed, small memory cost. Histograms
+from different processes or time intervals are merged by adding counts.
+"""
+
+import math
+import time
+import json
+import atexit
+import threading
+from typing import Any, Callable
+
+
+SUB_BUCKET_BITS: int = 7
+HISTOGRAM_INTERVAL_SECONDS: int = 10
+
+
+def bucket_index(value: int) -> int:
+    """
+    Map a value to its histogram bucket.
+
+    Args:
+        value: Non-negative integer value
+
+    Returns:
+        Bucket index
+    """
+    shift = max(0, value.bit_length() - 1 - SUB_BUCKET_BITS)
+    return (shift << SUB_BUCKET_BITS) + (value >> shift)
+
+
+def bucket_upper_bound(index: int) -> int:
+    """
+    Largest value counted in a bucket.
+
+    Args:
+        index: Bucket index
+
+    Returns:
+        Highest value equivalent to the bucket
+    """
+    shift = max(0, (index >> SUB_BUCKET_BITS) - 1)
+    mantissa = index - (shift << SUB_BUCKET_BITS)
+    return ((mantissa + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of integer latencies.
+
+    Args:
+        counts: Initial bucket counts (bucket index -> count)
+    """
+    def __init__(self, counts: dict[int, int] | None = None):
+        self.counts = dict(counts or {})
+        self.count = sum(self.counts.values())
+
+    def record(self, value: int, count: int = 1):
+        """
+        Count a value.
+
+        Args:
+            value: Latency in nanoseconds
+            count: Number of occurrences
+        """
+        index = bucket_index(max(0, int(value)))
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+
+    def merge(self, other: 'LatencyHistogram'):
+        """
+        Add the counts of another histogram to this one.
+
+        Args:
+            other: Histogram to merge in
+        """
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+
+    def quantile(self, q: float) -> int | None:
+        """
+        Get the value at a quantile.
+
+        Args:
+            q: Quantile in [0, 1]
+
+        Returns:
+            Highest value equivalent to the quantile's bucket, or None
+            for an empty histogram
+        """
+        if not self.count:
+            return None
+        rank = max(1, min(self.count, math.ceil(q * self.count)))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return bucket_upper_bound(index)
+        return bucket_upper_bound(max(self.counts))
+
+    def to_json(self) -> str:
+        """
+        Serialize the bucket counts.
+
+        Returns:
+            JSON list of [bucket index, count] pairs
+        """
+        return json.dumps(sorted(self.counts.items()), separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, payload: str) -> 'LatencyHistogram':
+        """
+        Load a histogram written by `to_json`.
+
+        Args:
+            payload: JSON list of [bucket index, count] pairs
+
+        Returns:
+            Histogram with the stored counts
+        """
+        return cls({index: count for index, count in json.loads(payload)})
+
+
+class HistogramCollector:
+    """
+    Aggregates stage latencies per strategy into one histogram per
+    stage and time interval, handing finished intervals to a sink.
+
+    Args:
+        sink: Callable receiving histogram records (strategy, stage,
+            timestamp, interval_seconds, count, buckets)
+        interval_seconds: Length of an aggregation interval
+    """
+    def __init__(
+            self,
+            sink: Callable[[dict[str, Any]], Any],
+            interval_seconds: int = HISTOGRAM_INTERVAL_SECONDS
+        ):
+        self.sink = sink
+        self.interval_seconds = interval_seconds
+        self._interval = None
+        self._histograms = {}
+        self._lock = threading.Lock()
+        # registered after the writer the sink feeds, so it runs first
+        atexit.register(self.flush)
+
+    def record(
+            self,
+            strategy: str,
+            stages: dict[str, int],
+            timestamp: float | None = None
+        ):
+        """
+        Count one latency per stage.
+
+        Args:
+            strategy: Strategy label
+            stages: Stage name -> latency in nanoseconds
+            timestamp: Time of the request (defaults to now)
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        interval = int(timestamp) // self.interval_seconds * self.interval_seconds
+        finished = []
+        with self._lock:
+            if self._interval is None or interval > self._interval:
+                finished = self._drain()
+                self._interval = interval
+            for stage, value in stages.items():
+                histogram = self._histograms.get((strategy, stage))
+                if histogram is None:
+                    histogram = self._histograms[(strategy, stage)] = (
+                        LatencyHistogram()
+                    )
+                histogram.record(value)
+        for record in finished:
+            self.sink(record)
+
+    def flush(self):
+        """
+        Hand the current, unfinished interval to the sink.
+        """
+        with self._lock:
+            finished = self._drain()
+        for record in finished:
+            self.sink(record)
+
+    def _drain(self) -> list[dict[str, Any]]:
+        records = [
+            {
+                'strategy': strategy,
+                'stage': stage,
+                'timestamp': self._interval,
+                'interval_seconds': self.interval_seconds,
+                'count': histogram.count,
+                'buckets': histogram.to_json(),
+            }
+            for (strategy, stage), histogram in self._histograms.items()
+        ]
+        self._histograms = {}
+        return records
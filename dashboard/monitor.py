@@ -6,25 +6,28 @@ of different matching strategies in the ResearchMatch application. It includes:
 
 - Real-time performance metric calculation
 - Redis-based caching system
-- Decorator for monitoring matching operations
-- Quality metrics computation (Precision, Recall, F1, BLEU, ROUGE)
+- OpenMetrics counters and histograms (requests, cache tiers, latency,
+  result counts, errors) served at `/metrics`
+- Decorator for monitoring matching operations, with per-stage timing
+  aggregated into latency histograms
+- Asynchronous, batched persistence of recorded metrics
+- Quality metrics computation (Precision, Recall, F1, BLEU, ROUGE) on a
+  sampled fraction of requests, inline or in a background worker pool
 
 The module integrates with Redis for caching and uses NLTK for text-based
-metric calculations.
+metric calculations. Both are loaded lazily: Redis is connected on the
+first monitored call and NLTK/ROUGE on the first metric computation, so
+importing this module stays cheap.
 """
 
 import os
 import sys
 import time
-import nltk
 import json
-import redis
+import inspect
 import threading
 from typing import Any
-from rouge import Rouge
 from functools import wraps
-from nltk.translate.bleu_score import sentence_bleu
-from nltk.translate.bleu_score import SmoothingFunction
 
 # adjust path to import from parent directory
 sys.path.append(
@@ -35,45 +38,268 @@ sys.path.append(
     )
 )
 
-from dashboard.utils import load_metrics, save_metrics
+from dashboard.cache import LocalCache
+from dashboard.writer import MetricsWriter
+from dashboard.quality import QualityEvaluator
+from dashboard.histogram import HistogramCollector
+from dashboard.spans import trace, span
+from dashboard.exporter import (
+    MetricsRegistry, MetricsExporter, RESULT_COUNT_BUCKETS
+)
+from dashboard.utils import append_metrics, append_histograms
 
 
-# download NLTK utils
-nltk.download('punkt')
 # lock for file access
 metrics_lock = threading.Lock()
+METRICS_QUEUE_SIZE: int = int(os.environ.get('METRICS_QUEUE_SIZE', 10000))
+METRICS_BATCH_SIZE: int = 500
+METRICS_FLUSH_SECONDS: float = 1.0
+QUALITY_EVAL_MODE: str = os.environ.get('QUALITY_EVAL_MODE', 'background')
+QUALITY_EVAL_SAMPLE_RATE: float = float(
+    os.environ.get('QUALITY_EVAL_SAMPLE_RATE', 1.0)
+)
+QUALITY_EVAL_WORKERS: int = int(os.environ.get('QUALITY_EVAL_WORKERS', 2))
+QUALITY_EVAL_MAX_PENDING: int = 1000
 NUM_MATCHES: int = 10
+CACHE_EXPIRATION_SECONDS: int = 3600     # 1 hr cache
+CACHE_FORMAT_VERSION: int = 1           # bump when the payload changes
+LOCAL_CACHE_SIZE: int = int(os.environ.get('LOCAL_CACHE_SIZE', 1024))
+LOCAL_CACHE_TTL_SECONDS: float = float(
+    os.environ.get('LOCAL_CACHE_TTL_SECONDS', 300)
+)
 try:
     redis_port = int(os.environ.get('REDIS_PORT'))
 except:
     redis_port = None
+# OpenMetrics endpoint, started on the first monitored call if set
+try:
+    exporter_port = int(os.environ.get('METRICS_EXPORTER_PORT'))
+except (TypeError, ValueError):
+    exporter_port = None
+EXPORTER_HOST: str = os.environ.get('METRICS_EXPORTER_HOST', '127.0.0.1')
+
+# counters and histograms for the OpenMetrics exporter
+registry = MetricsRegistry()
+requests_counter = registry.counter(
+    'researchmatch_requests',
+    'Matching queries served.',
+    ('strategy', 'mode')
+)
+cache_counter = registry.counter(
+    'researchmatch_cache_requests',
+    'Cache lookups per tier and result.',
+    ('tier', 'result')
+)
+latency_histogram = registry.histogram(
+    'researchmatch_request_latency_seconds',
+    'Matching latency per query.',
+    ('strategy', 'mode')
+)
+result_count_histogram = registry.histogram(
+    'researchmatch_result_count',
+    'Matches returned per query.',
+    ('strategy',),
+    RESULT_COUNT_BUCKETS
+)
+errors_counter = registry.counter(
+    'researchmatch_errors',
+    'Matching errors per strategy and kind.',
+    ('strategy', 'kind')
+)
+exporter_lock = threading.Lock()
+exporter = None
+
+# in-process cache tier, checked before redis
+local_cache = LocalCache(LOCAL_CACHE_SIZE, LOCAL_CACHE_TTL_SECONDS)
+
+# redis connection -- established on first use
+redis_lock = threading.Lock()
+redis_client = None
+redis_checked = False
+redis_stats = {'hits': 0, 'misses': 0}
+
+# BLEU/ROUGE scorers -- loaded on first metric computation
+_scorers = None
 
 
-try:    
-    # connect redis
-    redis_client = redis.Redis(
-        host='localhost',
-        port=redis_port,
-        db=0,
-        decode_responses=False
+def get_redis_client():
+    """
+    Connect to Redis on first use.
+    
+    Returns:
+        Redis client, or None if caching is disabled
+    """
+    global redis_client, redis_checked
+    if redis_checked:
+        return redis_client
+    with redis_lock:
+        if redis_checked:
+            return redis_client
+        try:
+            import redis
+            
+            # connect redis
+            client = redis.Redis(
+                host='localhost',
+                port=redis_port,
+                db=0,
+                decode_responses=False
+            )
+            client.ping()                   # test
+            print('Successfully connected to Redis.')
+            redis_client = client
+
+        except Exception as e:
+            print(
+                f'Warning: Could not connect to Redis at localhost:{redis_port}. Caching disabled. Error: {e}'
+            )
+        redis_checked = True
+    return redis_client
+
+
+def start_exporter(
+        port: int | None = None, host: str = EXPORTER_HOST
+    ) -> MetricsExporter | None:
+    """
+    Serve the OpenMetrics endpoint (`/metrics`), once per process.
+    
+    Args:
+        port: Port to bind (defaults to METRICS_EXPORTER_PORT)
+        host: Interface to bind
+        
+    Returns:
+        Running exporter, or None if no port is configured or binding
+        failed
+    """
+    global exporter
+    port = exporter_port if port is None else port
+    if exporter is not None or port is None:
+        return exporter
+    with exporter_lock:
+        if exporter is None:
+            try:
+                candidate = MetricsExporter(registry, host, port)
+                candidate.start()
+                print(
+                    f'Serving OpenMetrics at http://{host}:{candidate.port}/metrics'
+                )
+                exporter = candidate
+            except OSError as e:
+                print(
+                    f'Warning: Could not start metrics exporter on {host}:{port}. Error: {e}'
+                )
+    return exporter
+
+
+def record_error(strategy_name: str, kind: str):
+    """
+    Count a matching error for the exporter.
+    
+    Args:
+        strategy_name: Strategy the error happened in
+        kind: Error category (e.g. 'exception', 'llm')
+    """
+    errors_counter.inc(strategy_name, kind)
+
+
+def encode_matches(
+        matcher: Any, matches: list[dict[str, Any]]
+    ) -> str:
+    """
+    Serialize matches compactly for the Redis cache.
+    
+    Matchers that expose an `entry_index` (id of entry -> position in
+    `data`) are stored as a versioned list of entry indices; anything
+    else falls back to the full JSON profiles.
+    
+    Args:
+        matcher: Matcher state the matches come from (or the object the
+            decorated method is bound to)
+        matches: Matched entries
+        
+    Returns:
+        JSON payload
+    """
+    entry_index = getattr(matcher, 'entry_index', None)
+    if entry_index is not None:
+        try:
+            ids = [entry_index[id(match)] for match in matches]
+            return json.dumps(
+                {'v': CACHE_FORMAT_VERSION, 'ids': ids},
+                separators=(',', ':')
+            )
+        except KeyError:
+            pass
+    return json.dumps(
+        {'v': CACHE_FORMAT_VERSION, 'matches': matches},
+        separators=(',', ':')
     )
-    redis_client.ping()                 # test
-    print('Successfully connected to Redis.')
 
-    CACHE_ENABLED = True
-    CACHE_EXPIRATION_SECONDS = 3600     # 1 hr cache
 
-except Exception as e:
-    redis_client = None
-    print(
-        f'Warning: Could not connect to Redis at localhost:{redis_port}. Caching disabled. Error: {e}'
-    )    
-    CACHE_ENABLED = False
+def decode_matches(
+        matcher: Any, payload: bytes | str
+    ) -> list[dict[str, Any]] | None:
+    """
+    Rehydrate matches stored with `encode_matches`.
+    
+    Args:
+        matcher: Matcher state the cache key was built from (or the
+            object the decorated method is bound to)
+        payload: Cached JSON payload
+        
+    Returns:
+        Matched entries, or None if the payload is from another format
+        version or does not fit the loaded dataset
+    """
+    cached = json.loads(payload)
+    if not isinstance(cached, dict) or cached.get('v') != CACHE_FORMAT_VERSION:
+        return None
+    if 'ids' in cached:
+        data = getattr(matcher, 'data', None)
+        if data is None or any(
+            not 0 <= i < len(data) for i in cached['ids']
+        ):
+            return None
+        return [data[i] for i in cached['ids']]
+    return cached.get('matches')
+
+
+def get_cache_stats() -> dict[str, dict[str, int]]:
+    """
+    Get hit/miss counters of both cache tiers in this process.
+    
+    Returns:
+        Dictionary with 'local' and 'redis' counters
+    """
+    with redis_lock:
+        redis_counters = dict(redis_stats)
+    return {
+        'local': local_cache.stats(),
+        'redis': redis_counters,
+    }
+
+
+def get_scorers() -> tuple:
+    """
+    Load the BLEU and ROUGE scorers once per process.
+    
+    Returns:
+        Tuple of (sentence_bleu, smoothing function, Rouge instance)
+    """
+    global _scorers
+    if _scorers is None:
+        from rouge import Rouge
+        from nltk.translate.bleu_score import sentence_bleu
+        from nltk.translate.bleu_score import SmoothingFunction
+
+        _scorers = (sentence_bleu, SmoothingFunction().method1, Rouge())
+    return _scorers
 
 
 def calculate_metrics(
         query: str,
-        matches: list[dict[str, Any]]
+        matches: list[dict[str, Any]],
+        timings: dict[str, float] | None = None
     ) -> dict[str, float]:
     """
     Calculate performance metrics for matching results.
@@ -81,6 +307,9 @@ def calculate_metrics(
     Args:
         query: Search query string
         matches: List of matched researcher entries
+        timings: Optional dictionary receiving the seconds spent on each
+            metric group ('overlap_seconds', 'bleu_seconds',
+            'rouge_seconds')
         
     Returns:
         Dictionary containing the following metrics:
@@ -99,10 +328,12 @@ def calculate_metrics(
             'rouge': 0.0
         }
     
+    start = time.perf_counter()
+
     # get research areas from matches
     research_areas = []
     for match in matches:
-        areas = match.get('research_areas', {[]})
+        areas = match.get('research_areas', [])
         if isinstance(areas, dict):
             areas = areas.values()
             areas = [x for x in areas if x]
@@ -136,18 +367,27 @@ def calculate_metrics(
         else 0.0
     )
     
+    overlap_end = time.perf_counter()
+    sentence_bleu, smoothie, rouge = get_scorers()
+
     # BLEU score
     reference = [query.lower().split()]
     candidate = ' '.join(research_areas).lower().split()
-    smoothie = SmoothingFunction().method1
     bleu = sentence_bleu(
         reference, candidate, smoothing_function=smoothie
     )
+    bleu_end = time.perf_counter()
     
-    # ROUGE score
-    rouge = Rouge()
-    rouge_scores = rouge.get_scores(' '.join(research_areas), query)
-    rouge_l = rouge_scores[0]['rouge-l']['f']
+    # ROUGE score (undefined for an empty reference or hypothesis)
+    rouge_l = 0.0
+    if query_words and candidate:
+        rouge_scores = rouge.get_scores(' '.join(research_areas), query)
+        rouge_l = rouge_scores[0]['rouge-l']['f']
+
+    if timings is not None:
+        timings['overlap_seconds'] = overlap_end - start
+        timings['bleu_seconds'] = bleu_end - overlap_end
+        timings['rouge_seconds'] = time.perf_counter() - bleu_end
     
     return {
         'precision': precision,
@@ -158,6 +398,147 @@ def calculate_metrics(
     }
 
 
+def write_metrics(records: list[dict[str, Any]]):
+    """
+    Persist a batch of metrics records (runs on the writer thread).
+    
+    Args:
+        records: Records queued by `record_metrics`
+    """
+    with metrics_lock:
+        append_metrics(records)
+
+
+# metrics are persisted off the request path
+metrics_writer = MetricsWriter(
+    write_metrics,
+    max_queue_size=METRICS_QUEUE_SIZE,
+    batch_size=METRICS_BATCH_SIZE,
+    flush_interval=METRICS_FLUSH_SECONDS
+)
+
+
+def evaluate_quality(
+        results: list[tuple[str, list[dict[str, Any]]]]
+    ) -> dict[str, float]:
+    """
+    Average quality metrics over (query, matches) pairs and total the
+    time spent computing them.
+    
+    Args:
+        results: Queries with their matched entries
+        
+    Returns:
+        Dictionary with the averaged metrics from `calculate_metrics`
+        and the summed evaluation seconds per metric group
+    """
+    totals = {}
+    costs = {'overlap_seconds': 0.0, 'bleu_seconds': 0.0, 'rouge_seconds': 0.0}
+    for query, matches in results:
+        timings = {}
+        for name, value in calculate_metrics(query, matches, timings).items():
+            totals[name] = totals.get(name, 0.0) + value
+        for name, seconds in timings.items():
+            costs[name] += seconds
+    metrics = {name: value / len(results) for name, value in totals.items()}
+    metrics.update(costs)
+    return metrics
+
+
+def write_histograms(records: list[dict[str, Any]]):
+    """
+    Persist a batch of latency histogram records (runs on the writer
+    thread).
+    
+    Args:
+        records: Records handed over by `stage_histograms`
+    """
+    append_histograms(records)
+
+
+# stage latencies are aggregated in memory and persisted per interval
+histogram_writer = MetricsWriter(
+    write_histograms,
+    max_queue_size=METRICS_QUEUE_SIZE,
+    batch_size=METRICS_BATCH_SIZE,
+    flush_interval=METRICS_FLUSH_SECONDS
+)
+stage_histograms = HistogramCollector(histogram_writer.submit)
+
+
+def finish_record(record: dict[str, Any]):
+    """
+    Count the quality evaluation time of a finished record as the
+    'quality' stage and queue the record for writing.
+    
+    Args:
+        record: Metrics record handed over by `quality_evaluator`
+    """
+    if record.get('overlap_seconds') is not None:
+        seconds = sum(
+            record.get(name) or 0.0
+            for name in ('overlap_seconds', 'bleu_seconds', 'rouge_seconds')
+        )
+        stage_histograms.record(
+            record['strategy'], {'quality': int(seconds * 1e9)},
+            record['timestamp']
+        )
+    metrics_writer.submit(record)
+
+
+# quality metrics are computed for a sample of requests, by default
+# after the response has been returned
+quality_evaluator = QualityEvaluator(
+    evaluate_quality,
+    finish_record,
+    mode=QUALITY_EVAL_MODE,
+    sample_rate=QUALITY_EVAL_SAMPLE_RATE,
+    max_workers=QUALITY_EVAL_WORKERS,
+    max_pending=QUALITY_EVAL_MAX_PENDING
+)
+
+
+def record_metrics(
+        strategy_name: str,
+        start_time: float,
+        latency: float,
+        cache_tier: str = 'miss',
+        results: list[tuple[str, list[dict[str, Any]]]] | None = None,
+        stages: dict[str, int] | None = None
+    ):
+    """
+    Queue one set of metrics for the dashboard history.
+    
+    Quality metrics for `results` are computed according to the
+    `quality_evaluator` policy; records that are not sampled keep no
+    quality values. The record is then written asynchronously by
+    `metrics_writer`; if its queue is full the record is dropped instead
+    of blocking the caller.
+    
+    Args:
+        strategy_name: Strategy label shown on the dashboard
+        start_time: Time at which the operation started
+        latency: Measured latency in seconds
+        cache_tier: Cache tier that answered the request ('local',
+            'redis'), 'miss' if none did, or 'bypass' if not cached
+        results: (query, matches) pairs the quality metrics are
+            computed over
+        stages: Stage name -> nanoseconds, counted in the latency
+            histograms
+    """
+    if stages:
+        stage_histograms.record(strategy_name, stages, start_time)
+    quality_evaluator.submit(
+        {
+            'strategy': strategy_name,
+            'timestamp': int(start_time),
+            'latency': latency,
+            'cache_tier': cache_tier,
+        },
+        results or []
+    )
+
+
 def monitor_matching(strategy_name: str):
     """
     Decorator for monitoring matching operations.
@@ -166,138 +547,311 @@ def monitor_matching(strategy_name: str):
         strategy_name: Name of the matching strategy being monitored
         
     This decorator:
-    1. Measures query response time
-    2. Handles Redis caching (if enabled)
-    3. Calculates matching quality metrics
-    4. Records metrics for dashboard visualization
+    1. Measures query response time, broken down into stages (cache
+       lookup, the matcher's own spans, cache store) that feed latency
+       histograms per strategy and stage
+    2. Handles two-tier caching: an in-process LRU/TTL cache first,
+       then Redis (if enabled)
+    3. Records latency and the answering cache tier for dashboard
+       visualization
+    4. Hands the result to the quality evaluation policy, which
+       computes matching quality metrics for sampled requests
     
     The decorator can be applied to any matching function that accepts
-    a query parameter and returns a list of matches.
+    a query parameter and returns a list of matches. Coroutine functions
+    get an async wrapper that runs Redis round trips in a thread.
+    """
+    def _cache_key(args, kwargs):
+        query = kwargs.get('query', '')
+        if not query and len(args) > 1:
+            if isinstance(args[1], (str, list)):
+                query = args[1]
+        # convert list query to str for key
+        query_key_part = (
+            '|'.join(query) if isinstance(query, list) else query
+        )
+
+        # make cache key
+        N = kwargs.get('N', NUM_MATCHES)
+        sort_by_metric = kwargs.get('sort_by')
+        sort_by = sort_by_metric.name if sort_by_metric else 'None'
+        sort_reverse = kwargs.get('sort_reverse', True)
+        matcher = args[0] if args else None
+        # one snapshot for the key, decoding and encoding; see _store
+        state = getattr(matcher, 'state', matcher)
+        data_version = getattr(state, 'dataset_version', 'none')
+        cache_key = (
+            f'matcher_cache:v{CACHE_FORMAT_VERSION}:{strategy_name}:{data_version}:'
+            f'{query_key_part}:{N}:{sort_by}:{sort_reverse}'
+        )
+        return cache_key, matcher, state, query_key_part
+
+    def _lookup_local(cache_key):
+        # check in-process cache
+        matches = local_cache.get(cache_key)
+        if matches is not None:
+            matches = list(matches)
+        cache_counter.inc(
+            'local', 'hit' if matches is not None else 'miss'
+        )
+        return matches
+
+    def _lookup_redis(cache_key, state, redis_client):
+        from redis.exceptions import RedisError
+
+        matches = None
+        try:
+            # check hit
+            cached_result_json = redis_client.get(cache_key)
+            if cached_result_json:
+                # read cache
+                matches = decode_matches(state, cached_result_json)
+                if matches is not None:
+                    local_cache.set(cache_key, list(matches))
+        except RedisError as e:
+            print(
+                f'Redis Error during GET: {e}. Proceeding without cache.'
+            )
+        except json.JSONDecodeError as e:
+            print(
+                f'Error decoding cached JSON for key {cache_key}: {e}. Ignoring cache.'
+            )
+            matches = None
+        with redis_lock:
+            redis_stats['hits' if matches is not None else 'misses'] += 1
+        cache_counter.inc(
+            'redis', 'hit' if matches is not None else 'miss'
+        )
+        return matches
+
+    def _store(cache_key, matcher, state, matches, redis_client):
+        if getattr(matcher, 'state', matcher) is not state:
+            # a delta was applied while matching: the matches may come from
+            # the new dataset but the key names the old one
+            return
+        if matches is not None:
+            local_cache.set(cache_key, list(matches))
+        if redis_client is not None and matches is not None:
+            from redis.exceptions import RedisError
+
+            try:
+                matches_json = encode_matches(state, matches)
+                redis_client.setex(
+                    cache_key, CACHE_EXPIRATION_SECONDS, matches_json
+                )
+            except RedisError as e:
+                print(
+                    f'Redis Error during SETEX: {e}. Result not cached.'
+                )
+            except TypeError as e:
+                print(
+                    f'Error serializing matches to JSON for caching: {e}. Result not cached.'
+                )
+
+    def _run_cached(func, args, kwargs, start_ns):
+        cache_key, matcher, state, query_key_part = _cache_key(args, kwargs)
+
+        cache_tier = 'miss'
+        with span('cache_lookup'):
+            matches = _lookup_local(cache_key)
+            if matches is not None:
+                cache_tier = 'local'
+            redis_client = get_redis_client()
+            if matches is None and redis_client is not None:
+                matches = _lookup_redis(cache_key, state, redis_client)
+                if matches is not None:
+                    cache_tier = 'redis'
+
+        if matches is not None:
+            latency = (time.perf_counter_ns() - start_ns) / 1e9
+            print(
+                f'Cache hit ({cache_tier}) for {strategy_name} with query "{query_key_part[:30]}..."'
+            )
+            return matches, latency, cache_tier, query_key_part
+
+        # cache miss -- call matching function
+        with span('match'):
+            matches = func(*args, **kwargs)
+        
+        # latency == cache check (miss) + matching
+        latency = (time.perf_counter_ns() - start_ns) / 1e9
+
+        # cache result
+        with span('cache_store'):
+            _store(cache_key, matcher, state, matches, redis_client)
+        return matches, latency, cache_tier, query_key_part
+
+    async def _arun_cached(func, args, kwargs, start_ns):
+        # same as _run_cached, with Redis round trips kept off the loop
+        import asyncio
+
+        cache_key, matcher, state, query_key_part = _cache_key(args, kwargs)
+
+        cache_tier = 'miss'
+        with span('cache_lookup'):
+            matches = _lookup_local(cache_key)
+            if matches is not None:
+                cache_tier = 'local'
+            redis_client = get_redis_client()
+            if matches is None and redis_client is not None:
+                matches = await asyncio.to_thread(
+                    _lookup_redis, cache_key, state, redis_client
+                )
+                if matches is not None:
+                    cache_tier = 'redis'
+
+        if matches is not None:
+            latency = (time.perf_counter_ns() - start_ns) / 1e9
+            print(
+                f'Cache hit ({cache_tier}) for {strategy_name} with query "{query_key_part[:30]}..."'
+            )
+            return matches, latency, cache_tier, query_key_part
+
+        with span('match'):
+            matches = await func(*args, **kwargs)
+        latency = (time.perf_counter_ns() - start_ns) / 1e9
+
+        with span('cache_store'):
+            if redis_client is None:
+                _store(cache_key, matcher, state, matches, None)
+            else:
+                await asyncio.to_thread(
+                    _store, cache_key, matcher, state, matches, redis_client
+                )
+        return matches, latency, cache_tier, query_key_part
+
+    def _record(start_time, stages, matches, latency, cache_tier, query_key_part):
+        requests_counter.inc(strategy_name, 'single')
+        latency_histogram.observe(strategy_name, 'single', value=latency)
+        result_count_histogram.observe(
+            strategy_name, value=len(matches) if matches else 0
+        )
+
+        # log metrics
+        if matches is not None:
+            record_metrics(
+                f'{strategy_name} (Cache Hit)'
+                if cache_tier in ('local', 'redis') else strategy_name,
+                start_time, latency, cache_tier,
+                [(query_key_part, matches)], stages
+            )
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start_exporter()
+                with trace() as stages:
+                    start_time = time.time()
+                    start_ns = time.perf_counter_ns()
+                    try:
+                        (
+                            matches, latency, cache_tier, query_key_part
+                        ) = await _arun_cached(func, args, kwargs, start_ns)
+                    except Exception:
+                        record_error(strategy_name, 'exception')
+                        raise
+                    stages['total'] = time.perf_counter_ns() - start_ns
+
+                _record(
+                    start_time, stages, matches, latency, cache_tier,
+                    query_key_part
+                )
+                return matches
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start_exporter()
+            with trace() as stages:
+                start_time = time.time()
+                start_ns = time.perf_counter_ns()
+                try:
+                    matches, latency, cache_tier, query_key_part = _run_cached(
+                        func, args, kwargs, start_ns
+                    )
+                except Exception:
+                    record_error(strategy_name, 'exception')
+                    raise
+                stages['total'] = time.perf_counter_ns() - start_ns
+
+            _record(
+                start_time, stages, matches, latency, cache_tier, query_key_part
+            )
+            return matches
+        return wrapper
+    return decorator
+
+
+def monitor_batch_matching(strategy_name: str):
+    """
+    Decorator for monitoring batched matching operations.
+    
+    Args:
+        strategy_name: Name of the matching strategy being monitored
+        
+    This decorator:
+    1. Measures the response time of the whole batch
+    2. Records a single set of metrics per batch, labelled
+       '<strategy> (Batch)', with the per-query amortized latency (stage
+       histograms hold whole-batch times)
+    3. Hands the batch to the quality evaluation policy, which averages
+       matching quality metrics over the batch for sampled batches
+    
+    Batched calls bypass the Redis cache. The decorator can be applied
+    to any matching function that accepts a `queries` list and returns
+    one list of matches per query.
     """
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
             start_time = time.time()
             
-            query = kwargs.get('query', '')
-            if not query and len(args) > 1:
-                if isinstance(args[1], (str, list)):
-                    query = args[1]
-            # convert list query to str for key
-            query_key_part = (
-                '|'.join(query) if isinstance(query, list) else query
-            )
+            queries = kwargs.get('queries')
+            if queries is None and len(args) > 1:
+                queries = args[1]
+            queries = list(queries or [])
 
-            cache_hit = False
-            matches = None
-            latency = 0.0
-            metrics = {}
-            effective_strategy_name = strategy_name
-
-            if CACHE_ENABLED:
-                # make cache key
-                N = kwargs.get('N', NUM_MATCHES)
-                sort_by_metric = kwargs.get('sort_by')
-                sort_by = sort_by_metric.name if sort_by_metric else 'None'
-                sort_reverse = kwargs.get('sort_reverse', True)
-                cache_key = (
-                    f'matcher_cache:{strategy_name}:{query_key_part}:{N}:{sort_by}:{sort_reverse}'
-                )
-                
+            start_exporter()
+            with trace() as stages:
+                start_ns = time.perf_counter_ns()
                 try:
-                    # check hit
-                    cached_result_json = redis_client.get(cache_key)
-                    if cached_result_json:
-                        # read cache
-                        matches = json.loads(cached_result_json)
-                        
-                        latency = time.time() - start_time
-                        cache_hit = True
-                        
-                        effective_strategy_name = f'{strategy_name} (Cache Hit)'
-                        
-                        # cache-hit metrics
-                        metrics = calculate_metrics(query_key_part, matches) 
-                        
-                        print(
-                            f'Cache hit for {strategy_name} with query "{query_key_part[:30]}..."'
-                        )
-                except redis.exceptions.RedisError as e:
-                    print(
-                        f'Redis Error during GET: {e}. Proceeding without cache.'
+                    with span('match'):
+                        results = func(*args, **kwargs)
+                except Exception:
+                    record_error(strategy_name, 'exception')
+                    raise
+                stages['total'] = time.perf_counter_ns() - start_ns
+            latency = stages['total'] / 1e9
+
+            if results:
+                requests_counter.inc(
+                    strategy_name, 'batch', amount=len(results)
+                )
+                for matches in results:
+                    latency_histogram.observe(
+                        strategy_name, 'batch', value=latency / len(results)
                     )
-                except json.JSONDecodeError as e:
-                    print(
-                        f'Error decoding cached JSON for key {cache_key}: {e}. Ignoring cache.'
+                    result_count_histogram.observe(
+                        strategy_name, value=len(matches) if matches else 0
                     )
-                    matches = None
-                    cache_hit = False
-
-            # cache miss
-            if not cache_hit:
-                # call matching function
-                matches = func(*args, **kwargs)
-                
-                # total latency == cache check (miss) + matching
-                latency = time.time() - start_time 
-                
-                # get metrics
-                metrics = calculate_metrics(
-                    query_key_part, matches
-                )
-
-                # cache result
-                if CACHE_ENABLED and matches is not None:
-                    try:
-                        # make cache key
-                        N = kwargs.get('N', NUM_MATCHES)
-                        sort_by_metric = kwargs.get('sort_by')
-                        sort_by = sort_by_metric.name if sort_by_metric else 'None'
-                        sort_reverse = kwargs.get('sort_reverse', True)
-                        cache_key = (
-                            f'matcher_cache:{strategy_name}:{query_key_part}:{N}:{sort_by}:{sort_reverse}'
-                        )
-                        
-                        matches_json = json.dumps(matches)
-                        redis_client.setex(
-                            cache_key, CACHE_EXPIRATION_SECONDS, matches_json
-                        )
-                    except redis.exceptions.RedisError as e:
-                        print(
-                            f'Redis Error during SETEX: {e}. Result not cached.'
-                        )
-                    except TypeError as e:
-                        print(
-                            f'Error serializing matches to JSON for caching: {e}. Result not cached.'
+            
+            if results:
+                record_metrics(
+                    f'{strategy_name} (Batch)',
+                    start_time,
+                    latency / len(results),
+                    'bypass',
+                    [
+                        (
+                            '|'.join(query) if isinstance(query, list) else query,
+                            matches
                         )
-
-            # log metrics
-            if matches is not None:
-                with metrics_lock:
-                    metrics_history = load_metrics()
-                    timestamp = int(start_time)
-                    
-                    metrics_history['latency'].append([
-                        effective_strategy_name, timestamp, latency
-                    ])
-                    metrics_history['precision'].append([
-                        effective_strategy_name, timestamp, metrics.get('precision', 0.0)
-                    ])
-                    metrics_history['recall'].append([
-                        effective_strategy_name, timestamp, metrics.get('recall', 0.0)
-                    ])
-                    metrics_history['f1'].append([
-                        effective_strategy_name, timestamp, metrics.get('f1', 0.0)
-                    ])
-                    metrics_history['bleu'].append([
-                        effective_strategy_name, timestamp, metrics.get('bleu', 0.0)
-                    ])
-                    metrics_history['rouge'].append([
-                        effective_strategy_name, timestamp, metrics.get('rouge', 0.0)
-                    ])
-                    
-                    save_metrics(metrics_history)
+                        for query, matches in zip(queries, results)
+                    ],
+                    stages
+                )
             
-            return matches
+            return results
         return wrapper
-    return decorator 
\ No newline at end of file
+    return decorator
@@ -0,0 +1,174 @@
+"""
+ResearchMatch Quality Evaluation Policy
+
+Decides when matching quality metrics (precision, recall, F1, BLEU,
+ROUGE) are computed for a monitored request. Only a sampled fraction of
+requests is evaluated, either inline ('sync') or on a small worker pool
+after the response has been returned ('background'); 'off' records
+latency only. Requests that are not evaluated are recorded without
+quality values.
+"""
+
+import time
+import atexit
+import random
+import threading
+from typing import Any, Callable
+from concurrent.futures import ThreadPoolExecutor
+
+
+QUALITY_EVAL_MODES: tuple[str, ...] = ('sync', 'background', 'off')
+
+
+class QualityEvaluator:
+    """
+    Sampling evaluator that attaches quality metrics to metrics records.
+
+    Args:
+        evaluate: Callable computing quality metrics (and their costs)
+            for a list of (query, matches) pairs
+        sink: Callable receiving each finished record
+        mode: 'sync', 'background' or 'off'
+        sample_rate: Fraction of records that are evaluated
+        max_workers: Background worker threads
+        max_pending: Background evaluations queued before new records
+            are passed on unevaluated
+    """
+    def __init__(
+            self,
+            evaluate: Callable[[list[tuple[str, list]]], dict[str, float]],
+            sink: Callable[[dict[str, Any]], None],
+            mode: str = 'background',
+            sample_rate: float = 1.0,
+            max_workers: int = 2,
+            max_pending: int = 1000
+        ):
+        if mode not in QUALITY_EVAL_MODES:
+            raise ValueError(f'Unknown quality evaluation mode: {mode}')
+        self.evaluate = evaluate
+        self.sink = sink
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.evaluated = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.failed = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def submit(
+            self,
+            record: dict[str, Any],
+            results: list[tuple[str, list]]
+        ):
+        """
+        Evaluate a record according to the policy and pass it on.
+
+        Args:
+            record: Metrics record without quality values
+            results: (query, matches) pairs the record covers
+        """
+        if (
+            self.mode == 'off'
+            or
+            not results
+            or
+            random.random() >= self.sample_rate
+        ):
+            with self._lock:
+                self.skipped += 1
+            self.sink(record)
+            return
+
+        if self.mode == 'sync':
+            self._evaluate(record, results)
+            return
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.dropped += 1
+                queued = False
+            else:
+                self._pending += 1
+                queued = True
+        if not queued:
+            self.sink(record)
+            return
+        self._ensure_started().submit(self._evaluate_pending, record, results)
+
+    def flush(self, timeout: float | None = None):
+        """
+        Block until every background evaluation has finished.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._pending:
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            time.sleep(0.01)
+
+    def close(self):
+        """
+        Finish queued background evaluations and stop the workers.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def stats(self) -> dict[str, int]:
+        """
+        Get evaluator statistics.
+
+        Returns:
+            Dictionary with evaluated, skipped, dropped, failed and
+            pending counts
+        """
+        with self._lock:
+            return {
+                'evaluated': self.evaluated,
+                'skipped': self.skipped,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'pending': self._pending,
+            }
+
+    def _ensure_started(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix='quality-eval'
+                    )
+                    atexit.register(self.close)
+        return self._executor
+
+    def _evaluate_pending(
+            self,
+            record: dict[str, Any],
+            results: list[tuple[str, list]]
+        ):
+        try:
+            self._evaluate(record, results)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _evaluate(
+            self,
+            record: dict[str, Any],
+            results: list[tuple[str, list]]
+        ):
+        try:
+            record.update(self.evaluate(results))
+            with self._lock:
+                self.evaluated += 1
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+            print(f'Warning: Could not evaluate matching quality: {e}')
+        self.sink(record)
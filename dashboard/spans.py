@@ -0,0 +1,55 @@
+"""
+ResearchMatch Stage Timing
+
+Lightweight spans for breaking a monitored request into stages (cache
+lookup, preprocessing, vectorization, scoring, sorting, ...). A trace is
+started per request and carried in a context variable, so code deep in
+a matcher can time a stage with `span(...)` without any handle being
+passed around; outside a trace spans only cost a context lookup.
+Durations use the monotonic `perf_counter_ns` clock.
+"""
+
+import time
+from contextvars import ContextVar
+from contextlib import contextmanager
+
+
+_current_trace: ContextVar[dict[str, int] | None] = ContextVar(
+    'current_trace', default=None
+)
+
+
+@contextmanager
+def trace():
+    """
+    Collect the spans of one request.
+
+    Yields:
+        Dictionary filled with stage name -> nanoseconds; repeated
+        stages are summed
+    """
+    stages = {}
+    token = _current_trace.set(stages)
+    try:
+        yield stages
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def span(stage: str):
+    """
+    Time a stage of the current request.
+
+    Args:
+        stage: Stage name
+    """
+    stages = _current_trace.get()
+    if stages is None:
+        yield
+        return
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        stages[stage] = stages.get(stage, 0) + time.perf_counter_ns() - start
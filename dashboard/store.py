@@ -0,0 +1,350 @@
+"""
+ResearchMatch Metrics Store
+
+Append-only storage for matching metrics backed by SQLite. Each request
+is one row with a column per metric, indexed by time and strategy, so
+appending is O(batch) and readers can fetch just the time range and
+strategies they display. Old rows can be rolled up into per-interval
+aggregates to bound the table size.
+"""
+
+import os
+import json
+import sqlite3
+from typing import Any
+from contextlib import contextmanager
+
+
+METRIC_COLUMNS: tuple[str, ...] = (
+    'latency', 'precision', 'recall', 'f1', 'bleu', 'rouge'
+)
+# seconds spent computing the quality metrics of a row
+COST_COLUMNS: tuple[str, ...] = (
+    'overlap_seconds', 'bleu_seconds', 'rouge_seconds'
+)
+HISTOGRAM_COLUMNS: tuple[str, ...] = (
+    'strategy', 'stage', 'timestamp', 'interval_seconds', 'count', 'buckets'
+)
+ROW_COLUMNS: tuple[str, ...] = (
+    'strategy', 'timestamp', *METRIC_COLUMNS, 'cache_tier', 'samples',
+    *COST_COLUMNS
+)
+SCHEMA: str = '''
+CREATE TABLE IF NOT EXISTS metrics (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    strategy TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    latency REAL,
+    precision REAL,
+    recall REAL,
+    f1 REAL,
+    bleu REAL,
+    rouge REAL,
+    cache_tier TEXT,
+    samples INTEGER NOT NULL DEFAULT 1,
+    overlap_seconds REAL,
+    bleu_seconds REAL,
+    rouge_seconds REAL
+);
+CREATE INDEX IF NOT EXISTS metrics_timestamp
+    ON metrics (timestamp);
+CREATE INDEX IF NOT EXISTS metrics_strategy_timestamp
+    ON metrics (strategy, timestamp);
+CREATE TABLE IF NOT EXISTS latency_histograms (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    strategy TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    interval_seconds INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    buckets TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS latency_histograms_timestamp
+    ON latency_histograms (timestamp);
+'''
+
+
+class MetricsStore:
+    """
+    SQLite-backed append-only metrics table.
+
+    Args:
+        path: Database file
+        legacy_json_path: JSON metrics file imported once into a new,
+            empty database
+    """
+    def __init__(self, path: str, legacy_json_path: str | None = None):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+            # add columns introduced after the table was created
+            existing = {
+                row[1] for row in conn.execute('PRAGMA table_info(metrics)')
+            }
+            for name in COST_COLUMNS:
+                if name not in existing:
+                    conn.execute(f'ALTER TABLE metrics ADD COLUMN {name} REAL')
+            empty = conn.execute(
+                'SELECT NOT EXISTS (SELECT 1 FROM metrics)'
+            ).fetchone()[0]
+        if empty and legacy_json_path and os.path.exists(legacy_json_path):
+            self._import_legacy_json(legacy_json_path)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def append(self, records: list[dict[str, Any]]):
+        """
+        Append a batch of records in one transaction.
+
+        Args:
+            records: Records with 'strategy', 'timestamp', the metric
+                values and optionally 'cache_tier' and 'samples'
+        """
+        rows = [
+            (
+                record['strategy'],
+                int(record['timestamp']),
+                *(record.get(name) for name in METRIC_COLUMNS),
+                record.get('cache_tier'),
+                record.get('samples', 1),
+                *(record.get(name) for name in COST_COLUMNS),
+            ) for record in records
+        ]
+        with self._connect() as conn:
+            conn.executemany(
+                f'INSERT INTO metrics ({", ".join(ROW_COLUMNS)}) '
+                f'VALUES ({", ".join("?" * len(ROW_COLUMNS))})',
+                rows
+            )
+
+    def replace(self, records: list[dict[str, Any]]):
+        """
+        Replace the whole table with the given records.
+
+        Args:
+            records: Records in the format accepted by `append`
+        """
+        with self._connect() as conn:
+            conn.execute('DELETE FROM metrics')
+            self._bump_revision(conn)
+        self.append(records)
+
+    def query(
+            self,
+            start: float | None = None,
+            end: float | None = None,
+            strategies: list[str] | None = None,
+            after_id: int | None = None,
+            columns: tuple[str, ...] = ROW_COLUMNS
+        ) -> list[tuple]:
+        """
+        Read rows filtered by time range, strategy and row id.
+
+        Args:
+            start: Earliest timestamp (inclusive)
+            end: Latest timestamp (exclusive)
+            strategies: Strategies to include (None for all)
+            after_id: Only rows appended after this row id
+            columns: Columns to return
+
+        Returns:
+            Matching rows ordered by timestamp, then insertion order
+        """
+        conditions, params = [], []
+        if start is not None:
+            conditions.append('timestamp >= ?')
+            params.append(int(start))
+        if end is not None:
+            conditions.append('timestamp < ?')
+            params.append(int(end))
+        if strategies is not None:
+            conditions.append(
+                f'strategy IN ({", ".join("?" * len(strategies))})'
+            )
+            params.extend(strategies)
+        if after_id is not None:
+            conditions.append('id > ?')
+            params.append(after_id)
+        where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+        with self._connect() as conn:
+            return conn.execute(
+                f'SELECT {", ".join(columns)} FROM metrics {where} '
+                f'ORDER BY timestamp, id',
+                params
+            ).fetchall()
+
+    def append_histograms(self, records: list[dict[str, Any]]):
+        """
+        Append a batch of latency histogram records in one transaction.
+
+        Args:
+            records: Records with 'strategy', 'stage', 'timestamp' (start
+                of the interval), 'interval_seconds', 'count' and the
+                serialized 'buckets'
+        """
+        with self._connect() as conn:
+            conn.executemany(
+                f'INSERT INTO latency_histograms ({", ".join(HISTOGRAM_COLUMNS)}) '
+                f'VALUES ({", ".join("?" * len(HISTOGRAM_COLUMNS))})',
+                [
+                    tuple(record[name] for name in HISTOGRAM_COLUMNS)
+                    for record in records
+                ]
+            )
+
+    def query_histograms(
+            self,
+            start: float | None = None,
+            end: float | None = None,
+            strategies: list[str] | None = None
+        ) -> list[tuple]:
+        """
+        Read latency histogram records by interval start and strategy.
+
+        Args:
+            start: Earliest interval start (inclusive)
+            end: Latest interval start (exclusive)
+            strategies: Strategies to include (None for all)
+
+        Returns:
+            Rows of (strategy, stage, timestamp, interval_seconds, count,
+            buckets) ordered by interval start
+        """
+        conditions, params = [], []
+        if start is not None:
+            conditions.append('timestamp >= ?')
+            params.append(int(start))
+        if end is not None:
+            conditions.append('timestamp < ?')
+            params.append(int(end))
+        if strategies is not None:
+            conditions.append(
+                f'strategy IN ({", ".join("?" * len(strategies))})'
+            )
+            params.extend(strategies)
+        where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+        with self._connect() as conn:
+            return conn.execute(
+                f'SELECT {", ".join(HISTOGRAM_COLUMNS)} FROM latency_histograms '
+                f'{where} ORDER BY timestamp, id',
+                params
+            ).fetchall()
+
+    def revision(self) -> int:
+        """
+        Get the revision of the stored history. It changes whenever rows
+        are removed or rewritten (not on appends), so readers tailing
+        new rows know when to reload.
+
+        Returns:
+            Revision number
+        """
+        with self._connect() as conn:
+            return conn.execute('PRAGMA user_version').fetchone()[0]
+
+    def _bump_revision(self, conn: sqlite3.Connection):
+        revision = conn.execute('PRAGMA user_version').fetchone()[0]
+        conn.execute(f'PRAGMA user_version = {revision + 1}')
+
+    def strategies(self) -> list[str]:
+        """
+        List the strategies that have stored metrics.
+
+        Returns:
+            Sorted strategy names
+        """
+        with self._connect() as conn:
+            return [
+                row[0] for row in conn.execute(
+                    'SELECT DISTINCT strategy FROM metrics ORDER BY strategy'
+                )
+            ]
+
+    def rollup(self, before: float, bucket_seconds: int = 60) -> int:
+        """
+        Aggregate rows older than `before` into one row per strategy and
+        time bucket. Metric values are averaged, weighted by the number
+        of requests each row represents, which is kept in `samples`.
+
+        Args:
+            before: Roll up rows with a timestamp before this
+            bucket_seconds: Width of each aggregation bucket
+
+        Returns:
+            Number of raw rows that were replaced
+        """
+        # missing values (NULL) count towards neither sum
+        averages = {
+            name: f'SUM({name} * samples) / '
+                  f'SUM(CASE WHEN {name} IS NOT NULL THEN samples END)'
+            for name in (*METRIC_COLUMNS, *COST_COLUMNS)
+        }
+        with self._connect() as conn:
+            replaced = conn.execute(
+                'SELECT COUNT(*) FROM metrics WHERE timestamp < ?',
+                (int(before),)
+            ).fetchone()[0]
+            if not replaced:
+                return 0
+            conn.execute(f'''
+                CREATE TEMP TABLE rollup AS
+                SELECT strategy,
+                       (timestamp / :bucket) * :bucket AS timestamp,
+                       {", ".join(averages[name] for name in METRIC_COLUMNS)},
+                       'rollup' AS cache_tier,
+                       SUM(samples) AS samples,
+                       {", ".join(averages[name] for name in COST_COLUMNS)}
+                FROM metrics
+                WHERE timestamp < :before
+                GROUP BY strategy, timestamp / :bucket
+            ''', {'bucket': bucket_seconds, 'before': int(before)})
+            conn.execute(
+                'DELETE FROM metrics WHERE timestamp < ?', (int(before),)
+            )
+            conn.execute(
+                f'INSERT INTO metrics ({", ".join(ROW_COLUMNS)}) '
+                f'SELECT * FROM rollup'
+            )
+            conn.execute('DROP TABLE rollup')
+            self._bump_revision(conn)
+        return replaced
+
+    def _import_legacy_json(self, json_path: str):
+        """
+        Import a metrics file in the old parallel-lists JSON format.
+
+        Args:
+            json_path: Path of the JSON metrics file
+        """
+        with open(json_path, 'r') as f:
+            metrics = json.load(f)
+        latency = metrics.get('latency', [])
+        cache_tiers = metrics.get('cache_tier', [])
+        offset = len(latency) - len(cache_tiers)
+        records = []
+        for i, (strategy, timestamp, value) in enumerate(latency):
+            record = {
+                'strategy': strategy,
+                'timestamp': timestamp,
+                'latency': value,
+                'cache_tier': (
+                    cache_tiers[i - offset][2] if i >= offset else None
+                ),
+            }
+            for name in METRIC_COLUMNS[1:]:
+                values = metrics.get(name, [])
+                record[name] = values[i][2] if i < len(values) else None
+            records.append(record)
+        self.append(records)
+        print(f'Imported {len(records)} metrics records from {json_path}.')
@@ -5,59 +5,307 @@ This module provides utility functions for the ResearchMatch dashboard,
 including metric persistence and statistical calculations for visualization.
 
 The module handles:
-- Loading and saving performance metrics
+- Loading and saving performance metrics (optionally by time range and
+  strategy)
 - Computing rolling statistics for trend analysis
 - Calculating confidence intervals
 """
 
-import os
-import json
-import numpy as np
-import pandas as pd
+import time
+import threading
+from typing import TYPE_CHECKING, Any
+
+from dashboard.histogram import LatencyHistogram
+from dashboard.store import (
+    MetricsStore, METRIC_COLUMNS, COST_COLUMNS, ROW_COLUMNS
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 ROLLING_WINDOW: int = 1000
-METRICS_FILE = 'dashboard/matching_metrics.json'
+LATENCY_QUANTILES: dict[str, float] = {
+    'p50': 0.5, 'p95': 0.95, 'p99': 0.99, 'p999': 0.999
+}
+METRICS_DB: str = 'dashboard/matching_metrics.db'
+# legacy JSON metrics file, imported into a new database once
+METRICS_FILE: str = 'dashboard/matching_metrics.json'
+METRIC_NAMES: tuple[str, ...] = METRIC_COLUMNS
+_stores: dict[str, MetricsStore] = {}
+
+
+def get_metrics_store() -> MetricsStore:
+    """
+    Get the metrics store for the configured database path.
+
+    Returns:
+        Metrics store, opened (and created) on first use
+    """
+    store = _stores.get(METRICS_DB)
+    if store is None:
+        store = _stores.setdefault(
+            METRICS_DB, MetricsStore(METRICS_DB, METRICS_FILE)
+        )
+    return store
 
 
-def load_metrics() -> dict[str, list]:
+def load_metrics(
+        start: float | None = None,
+        end: float | None = None,
+        strategies: list[str] | None = None
+    ) -> dict[str, list]:
     """
-    Load performance metrics from the metrics file.
+    Load performance metrics from the metrics store.
+    
+    Args:
+        start: Earliest timestamp to load (None for no lower bound)
+        end: Timestamp to load up to, exclusive (None for no upper bound)
+        strategies: Strategies to load (None for all)
     
     Returns:
-        Dictionary containing lists of metrics:
+        Dictionary containing lists of [strategy, timestamp, value]:
         - latency: Query response times
         - precision: Matching precision scores
         - recall: Matching recall scores
         - f1: F1 scores
         - bleu: BLEU scores
         - rouge: ROUGE scores
+        - cache_tier: Cache tier that answered each request
+          ('local', 'redis', 'miss', 'bypass', 'rollup' for aggregated
+          rows, or None for records written before cache tiers were
+          tracked)
+    """
+    rows = get_metrics_store().query(start, end, strategies)
+    metrics = {name: [] for name in (*METRIC_NAMES, 'cache_tier')}
+    for row in rows:
+        strategy, timestamp = row[0], row[1]
+        for name, value in zip((*METRIC_NAMES, 'cache_tier'), row[2:]):
+            metrics[name].append([strategy, timestamp, value])
+    return metrics
+
+
+def load_metrics_frame(
+        start: float | None = None,
+        end: float | None = None,
+        strategies: list[str] | None = None
+    ) -> 'pd.DataFrame':
+    """
+    Load performance metrics as one row per request.
+    
+    Args:
+        start: Earliest timestamp to load (None for no lower bound)
+        end: Timestamp to load up to, exclusive (None for no upper bound)
+        strategies: Strategies to load (None for all)
+        
+    Returns:
+        DataFrame indexed by the store's row id with strategy,
+        timestamp, one column per metric,
+        cache_tier, samples (requests aggregated into the row) and the
+        seconds spent on each quality metric group (NaN when the row's
+        quality was not evaluated)
     """
-    if os.path.exists(METRICS_FILE):
-        with open(METRICS_FILE, 'r') as f:
-            return json.load(f)
-    return {
-        'latency': [],
-        'precision': [],
-        'recall': [],
-        'f1': [],
-        'bleu': [],
-        'rouge': []
-    }
+    rows = get_metrics_store().query(
+        start, end, strategies, columns=('id', *ROW_COLUMNS)
+    )
+    return _rows_to_frame(rows)
+
+
+def _rows_to_frame(rows: list[tuple]) -> 'pd.DataFrame':
+    import pandas as pd
+
+    df = pd.DataFrame.from_records(
+        rows, columns=['id', *ROW_COLUMNS], index='id'
+    )
+    # missing values come back as None; keep numeric columns float
+    return df.astype({name: float for name in (*METRIC_NAMES, *COST_COLUMNS)})
+
+
+class MetricsFrameCache:
+    """
+    Metrics DataFrame kept between dashboard refreshes.
+    
+    Each load only reads rows appended since the previous one (tracked
+    by row id) and drops rows that slid out of the time window. The
+    frame is read in full again when the strategies change, the window
+    grows, or the store's history was rewritten (e.g. rolled up).
+    """
+    def __init__(self):
+        self._frame = None
+        self._start = None
+        self._strategies = None
+        self._revision = None
+        self._lock = threading.Lock()
+
+    def load(
+            self,
+            start: float | None = None,
+            strategies: list[str] | None = None
+        ) -> 'pd.DataFrame':
+        """
+        Get metrics from `start` onwards, reading only new rows.
+        
+        Args:
+            start: Earliest timestamp to include (None for all)
+            strategies: Strategies to include (None for all)
+            
+        Returns:
+            DataFrame in the format of `load_metrics_frame`, shared
+            between callers (do not modify it in place)
+        """
+        import pandas as pd
+
+        store = get_metrics_store()
+        strategies = None if strategies is None else sorted(strategies)
+        with self._lock:
+            revision = store.revision()
+            if (
+                self._frame is None
+                or
+                revision != self._revision
+                or
+                strategies != self._strategies
+                or
+                (self._start is not None and (start is None or start < self._start))
+            ):
+                self._frame = load_metrics_frame(start, None, strategies)
+                self._start = start
+                self._strategies = strategies
+                self._revision = revision
+                return self._frame
+
+            # tail rows appended since the last load
+            last_id = self._frame.index.max() if len(self._frame) else 0
+            new = _rows_to_frame(store.query(
+                start, None, strategies,
+                after_id=int(last_id), columns=('id', *ROW_COLUMNS)
+            ))
+            frame = self._frame
+            if len(new):
+                late = (
+                    len(frame)
+                    and
+                    new['timestamp'].iloc[0] < frame['timestamp'].iloc[-1]
+                )
+                frame = pd.concat([frame, new])
+                if late:
+                    # rows written late, keep ordered by time then id
+                    frame = frame.sort_values('timestamp', kind='stable')
+
+            # drop rows that slid out of the window
+            if start is not None and len(frame):
+                frame = frame.iloc[frame['timestamp'].searchsorted(start):]
+            self._frame = frame
+            self._start = start
+            return frame
 
 
 def save_metrics(metrics: dict[str, list]):
     """
-    Save performance metrics to the metrics file.
+    Replace the stored metrics with the given history.
+    
+    Args:
+        metrics: Dictionary containing lists of performance metrics, in
+            the format returned by `load_metrics`
+    """
+    cache_tiers = metrics.get('cache_tier', [])
+    records = []
+    for i, (strategy, timestamp, latency) in enumerate(metrics['latency']):
+        record = {
+            'strategy': strategy,
+            'timestamp': timestamp,
+            'latency': latency,
+            'cache_tier': cache_tiers[i][2] if i < len(cache_tiers) else None,
+        }
+        for name in METRIC_NAMES[1:]:
+            record[name] = metrics[name][i][2]
+        records.append(record)
+    get_metrics_store().replace(records)
+
+
+def append_metrics(records: list[dict]):
+    """
+    Append a batch of metrics records to the metrics store.
+    
+    Args:
+        records: Records with 'strategy', 'timestamp', 'cache_tier' and
+            one value per metric (latency, precision, recall, f1, bleu,
+            rouge)
+    """
+    get_metrics_store().append(records)
+
+
+def append_histograms(records: list[dict]):
+    """
+    Append a batch of latency histogram records to the metrics store.
+    
+    Args:
+        records: Histogram records from `HistogramCollector`
+    """
+    get_metrics_store().append_histograms(records)
+
+
+def load_latency_percentiles(
+        start: float | None = None,
+        end: float | None = None,
+        strategies: list[str] | None = None
+    ) -> 'pd.DataFrame':
+    """
+    Merge the stored latency histograms of a time range and report
+    percentiles per strategy and stage.
     
     Args:
-        metrics: Dictionary containing lists of performance metrics
+        start: Earliest interval start to load (None for no lower bound)
+        end: Interval start to load up to, exclusive (None for no upper
+            bound)
+        strategies: Strategies to load (None for all)
+        
+    Returns:
+        DataFrame indexed by (Strategy, Stage) with the request count
+        and p50/p95/p99/p999 latencies in milliseconds
+    """
+    import pandas as pd
+
+    merged = {}
+    for strategy, stage, _, _, _, buckets in get_metrics_store().query_histograms(
+            start, end, strategies
+        ):
+        histogram = merged.setdefault((strategy, stage), LatencyHistogram())
+        histogram.merge(LatencyHistogram.from_json(buckets))
+
+    rows = [
+        {
+            'Strategy': strategy,
+            'Stage': stage,
+            'Count': histogram.count,
+            **{
+                f'{name} (ms)': histogram.quantile(q) / 1e6
+                for name, q in LATENCY_QUANTILES.items()
+            },
+        }
+        for (strategy, stage), histogram in sorted(merged.items())
+    ]
+    columns = ['Strategy', 'Stage', 'Count', *(
+        f'{name} (ms)' for name in LATENCY_QUANTILES
+    )]
+    return pd.DataFrame(rows, columns=columns).set_index(['Strategy', 'Stage'])
+
+
+def rollup_metrics(older_than: float, bucket_seconds: int = 60) -> int:
+    """
+    Aggregate old metrics into one row per strategy and time bucket.
+    
+    Args:
+        older_than: Age in seconds beyond which rows are rolled up
+        bucket_seconds: Width of each aggregation bucket
+        
+    Returns:
+        Number of rows that were rolled up
     """
-    with open(METRICS_FILE, 'w') as f:
-        json.dump(metrics, f)
+    return get_metrics_store().rollup(time.time() - older_than, bucket_seconds)
 
 
-def rolling_mean(x: pd.DataFrame, window: int=ROLLING_WINDOW):
+def rolling_mean(x: 'pd.DataFrame', window: int=ROLLING_WINDOW):
     """
     Calculate rolling mean over a window of values.
     
@@ -71,7 +319,28 @@ def rolling_mean(x: pd.DataFrame, window: int=ROLLING_WINDOW):
     return x.rolling(window, min_periods=1).mean()
 
 
-def rolling_p05(x: pd.DataFrame, window: int=ROLLING_WINDOW):
+def rolling_quantile(
+        x: 'pd.DataFrame', q: float, window: int=ROLLING_WINDOW
+    ):
+    """
+    Calculate a rolling quantile over a window of values.
+    
+    Uses pandas' sorted-window implementation, which updates the window
+    incrementally instead of sorting it again for every row; values
+    match `np.percentile` (linear interpolation).
+    
+    Args:
+        x: Input data series
+        q: Quantile in [0, 1]
+        window: Size of the rolling window
+        
+    Returns:
+        Series containing rolling quantile values
+    """
+    return x.rolling(window, min_periods=1).quantile(q, interpolation='linear')
+
+
+def rolling_p05(x: 'pd.DataFrame', window: int=ROLLING_WINDOW):
     """
     Calculate rolling 5th percentile over a window.
     
@@ -82,12 +351,10 @@ def rolling_p05(x: pd.DataFrame, window: int=ROLLING_WINDOW):
     Returns:
         Series containing rolling 5th percentile values
     """
-    return x.rolling(
-        window, min_periods=1
-    ).apply(lambda w: np.percentile(w, 5), raw=True)
+    return rolling_quantile(x, 0.05, window)
 
 
-def rolling_p95(x: pd.DataFrame, window: int=ROLLING_WINDOW):
+def rolling_p95(x: 'pd.DataFrame', window: int=ROLLING_WINDOW):
     """
     Calculate rolling 95th percentile over a window.
     
@@ -98,6 +365,208 @@ def rolling_p95(x: pd.DataFrame, window: int=ROLLING_WINDOW):
     Returns:
         Series containing rolling 95th percentile values
     """
-    return x.rolling(
-        window, min_periods=1
-    ).apply(lambda w: np.percentile(w, 95), raw=True)
\ No newline at end of file
+    return rolling_quantile(x, 0.95, window)
+
+
+class RollingStatsCache:
+    """
+    Rolling mean, 5th and 95th percentile per series, kept between
+    dashboard refreshes.
+    
+    Series are identified by a key (e.g. metric and strategy) and their
+    index (the store's row ids). When a series only grew since the last
+    update, statistics are computed for the new rows alone, using the
+    preceding `window - 1` values as context. Rows dropped from the
+    front (a sliding time window) keep the statistics already computed
+    for the remaining rows; any other change (e.g. a longer time window)
+    recomputes the series.
+    
+    Args:
+        window: Size of the rolling window
+    """
+    def __init__(self, window: int=ROLLING_WINDOW):
+        self.window = window
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def update(self, key: Any, values: 'pd.Series') -> 'pd.DataFrame':
+        """
+        Get rolling statistics for a series, processing only new rows.
+        
+        Args:
+            key: Series identifier
+            values: Full series in display order
+            
+        Returns:
+            DataFrame aligned with `values` with 'MA', 'P05' and 'P95'
+            columns
+        """
+        import pandas as pd
+
+        with self._lock:
+            cached = self._stats.get(key)
+            done = 0
+            if cached is not None and len(values):
+                # rows trimmed from the front since the last update
+                offset = cached.index.get_indexer(values.index[:1])[0]
+                if offset >= 0:
+                    cached = cached.iloc[offset:]
+                    if (
+                        len(values) >= len(cached)
+                        and
+                        values.index[:len(cached)].equals(cached.index)
+                    ):
+                        done = len(cached)
+            if done and done == len(values):
+                self._stats[key] = cached
+                return cached
+
+            # earlier rows still inside the window of the first new row
+            start = max(0, done - (self.window - 1))
+            context = values.iloc[start:]
+            stats = pd.DataFrame({
+                'MA': rolling_mean(context, self.window),
+                'P05': rolling_p05(context, self.window),
+                'P95': rolling_p95(context, self.window),
+            }).iloc[done - start:]
+            if done:
+                stats = pd.concat([cached, stats])
+            self._stats[key] = stats
+            return stats
+
+    def clear(self):
+        """
+        Drop all cached statistics.
+        """
+        with self._lock:
+            self._stats.clear()
+
+
+def downsample(
+        df: 'pd.DataFrame', group_col: str, max_points: int
+    ) -> 'pd.DataFrame':
+    """
+    Thin a DataFrame to roughly `max_points` rows, spread evenly over
+    the groups. Every group keeps evenly spaced rows plus its last row.
+    
+    Args:
+        df: Rows in display order
+        group_col: Column identifying a plotted series
+        max_points: Total row budget
+        
+    Returns:
+        Downsampled DataFrame (the input if it is within budget)
+    """
+    if len(df) <= max_points:
+        return df
+    groups = df.groupby(group_col, sort=False)[group_col]
+    budget = max(1, max_points // max(1, groups.ngroups))
+    sizes = groups.transform('size')
+    position = groups.cumcount()
+    stride = (-(-sizes // budget)).clip(lower=1)
+    keep = (position % stride == 0) | (position == sizes - 1)
+    return df[keep]
+
+
+def box_stats(
+        df: 'pd.DataFrame', group_col: str, metric_name: str
+    ) -> 'pd.DataFrame':
+    """
+    Compute box-plot statistics per group, so box plots can be drawn
+    without sending every point to the browser.
+    
+    Args:
+        df: Rows with the group and metric columns
+        group_col: Column identifying a box
+        metric_name: Column holding the values
+        
+    Returns:
+        DataFrame indexed by group with q1, median, q3, mean and the
+        Tukey fences (most extreme values within 1.5 IQR of the box)
+    """
+    import pandas as pd
+
+    values = df.groupby(group_col)[metric_name]
+    stats = pd.DataFrame({
+        'q1': values.quantile(0.25),
+        'median': values.median(),
+        'q3': values.quantile(0.75),
+        'mean': values.mean(),
+    })
+    iqr = stats['q3'] - stats['q1']
+    low = df[group_col].map(stats['q1'] - 1.5 * iqr)
+    high = df[group_col].map(stats['q3'] + 1.5 * iqr)
+    within = df[metric_name].where(
+        (df[metric_name] >= low) & (df[metric_name] <= high)
+    )
+    fences = within.groupby(df[group_col])
+    stats['lowerfence'] = fences.min()
+    stats['upperfence'] = fences.max()
+    return stats
+
+
+def cache_tier_counts(metrics_df: 'pd.DataFrame') -> 'pd.DataFrame':
+    """
+    Summarize per-tier cache hits and misses for each strategy.
+    
+    Args:
+        metrics_df: Metrics with 'Strategy' (or 'strategy') and
+            'cache_tier' columns, as loaded by `load_metrics_frame`
+        
+    Returns:
+        DataFrame indexed by strategy with hit/miss counts per tier.
+        A request missing the local tier falls through to Redis, so
+        local misses are Redis hits plus Redis misses.
+    """
+    import pandas as pd
+
+    strategy_col = 'Strategy' if 'Strategy' in metrics_df else 'strategy'
+    df = metrics_df[metrics_df['cache_tier'].isin(['local', 'redis', 'miss'])]
+    strategies = df[strategy_col].str.replace(
+        ' (Cache Hit)', '', regex=False
+    )
+    counts = pd.crosstab(strategies, df['cache_tier']).reindex(
+        columns=['local', 'redis', 'miss'], fill_value=0
+    )
+    counts.index.name = 'Strategy'
+    return pd.DataFrame({
+        'Local Hits': counts['local'],
+        'Local Misses': counts['redis'] + counts['miss'],
+        'Redis Hits': counts['redis'],
+        'Redis Misses': counts['miss'],
+        'Local Hit Rate': counts['local'] / counts.sum(axis=1),
+    })
+
+
+def evaluation_costs(metrics_df: 'pd.DataFrame') -> 'pd.DataFrame':
+    """
+    Summarize how often quality metrics were computed for each strategy
+    and what they cost.
+    
+    Args:
+        metrics_df: Metrics with 'Strategy' (or 'strategy') and the
+            evaluation cost columns, as loaded by `load_metrics_frame`
+        
+    Returns:
+        DataFrame indexed by strategy with the number of evaluated rows,
+        the evaluated share of rows and the mean milliseconds spent per
+        metric group
+    """
+    import pandas as pd
+
+    strategy_col = 'Strategy' if 'Strategy' in metrics_df else 'strategy'
+    strategies = metrics_df[strategy_col].str.replace(
+        ' (Cache Hit)', '', regex=False
+    )
+    costs = metrics_df[list(COST_COLUMNS)].groupby(strategies)
+    evaluated = costs['overlap_seconds'].count()
+    mean_ms = costs.mean() * 1000
+    summary = pd.DataFrame({
+        'Evaluated': evaluated,
+        'Evaluated Share': evaluated / costs.size(),
+        'Overlap (ms)': mean_ms['overlap_seconds'],
+        'BLEU (ms)': mean_ms['bleu_seconds'],
+        'ROUGE (ms)': mean_ms['rouge_seconds'],
+    })
+    summary.index.name = 'Strategy'
+    return summary
@@ -0,0 +1,155 @@
+"""
+ResearchMatch Background Metrics Writer
+
+Moves metric persistence off the request path. Records are pushed onto a
+bounded in-memory queue and a background thread drains them in batches,
+so each request only pays for a non-blocking enqueue. When the queue is
+full new records are dropped (and counted) rather than slowing requests
+down, and pending records are flushed when the process exits.
+"""
+
+import time
+import queue
+import atexit
+import threading
+from typing import Any, Callable
+
+
+class MetricsWriter:
+    """
+    Batching writer draining a bounded queue on a background thread.
+
+    Args:
+        sink: Callable persisting a list of records in one operation
+        max_queue_size: Records buffered before new ones are dropped
+        batch_size: Maximum records handed to the sink at once
+        flush_interval: Seconds a batch may wait to fill up before it
+            is written
+    """
+    def __init__(
+            self,
+            sink: Callable[[list[dict[str, Any]]], None],
+            max_queue_size: int = 10000,
+            batch_size: int = 500,
+            flush_interval: float = 1.0
+        ):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._closed = False
+        # registered up front so components feeding the writer, which
+        # register their own shutdown later, are closed before it
+        atexit.register(self.close)
+
+    def submit(self, record: dict[str, Any]) -> bool:
+        """
+        Enqueue a record without blocking.
+
+        Args:
+            record: Metrics record
+
+        Returns:
+            True if the record was queued, False if it was dropped
+        """
+        if self._closed:
+            self.dropped += 1
+            return False
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def flush(self, timeout: float | None = None):
+        """
+        Block until every queued record has been handed to the sink.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+        """
+        if self._thread is None:
+            return
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            time.sleep(0.01)
+
+    def close(self, timeout: float | None = 5.0):
+        """
+        Stop accepting records, flush what is queued and stop the thread.
+
+        Args:
+            timeout: Maximum seconds to wait for the flush
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(None)       # wake the writer
+            self._thread.join(timeout)
+
+    def stats(self) -> dict[str, int]:
+        """
+        Get writer statistics.
+
+        Returns:
+            Dictionary with written, dropped, failed and queued counts
+        """
+        return {
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'queued': self._queue.qsize(),
+        }
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='metrics-writer', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        stop = False
+        while not stop:
+            items = [self._queue.get()]
+            # collect a batch for up to flush_interval seconds
+            deadline = time.monotonic() + self.flush_interval
+            while len(items) < self.batch_size and items[-1] is not None:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        items.append(self._queue.get(timeout=remaining))
+                    else:
+                        items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            # None is the shutdown sentinel queued by close()
+            batch = [record for record in items if record is not None]
+            stop = len(batch) < len(items)
+            self._write(batch)
+            for _ in items:
+                self._queue.task_done()
+
+    def _write(self, batch: list[dict[str, Any]]):
+        if not batch:
+            return
+        try:
+            self.sink(batch)
+            self.written += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            print(f'Error writing {len(batch)} metrics records: {e}')
@@ -2,26 +2,37 @@
 LLM_evals/evaluate_llms.py
 Compare cached LLM answers (data/llm_results.json) with Perplexity ground truth
 and save results/plots under LLM_evals/{data,plots}.
+
+Perplexity answers are stored in data/perplexity_outputs.jsonl keyed by a
+hash of model + prompt, so reruns (e.g. after changing `clean_topics`) only
+query professors without a stored answer. Missing answers are fetched
+concurrently through the 'perplexity' provider (`PERPLEXITY_MAX_CONCURRENCY`,
+`--rpm`), and metrics for every professor and model are computed at once.
 """
 from __future__ import annotations
-import os, json, re, argparse
+import os, sys, json, re, time, asyncio, hashlib, argparse
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 from tqdm import tqdm
-from sklearn.metrics import precision_score, recall_score, f1_score
 
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-from openai import OpenAI
 from dotenv import load_dotenv
 load_dotenv()
 
+# adjust path to import from parent directory
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from matching.providers import get_provider
+
 # ──────────────────────────────── 0. Paths & folders ────────────────────── #
 BASE_DIR   = Path(__file__).resolve().parent      # LLM_evals/
 DATA_DIR   = BASE_DIR / "data"
 PLOTS_DIR  = BASE_DIR / "plots"
+GT_FILE    = DATA_DIR / "perplexity_outputs.jsonl"
 DATA_DIR.mkdir(parents=True,  exist_ok=True)
 PLOTS_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -55,13 +66,9 @@ def clean_topics(raw: str | list[str]) -> list[str]:
     return sorted(set(out))
 
 # ───────────────────────────── 2. Perplexity client ─────────────────────── #
-PPLX_API_KEY = os.getenv("PPLX_API_KEY")
-if not PPLX_API_KEY:
-    raise RuntimeError("Please set PPLX_API_KEY!")
-
-client_pplx = OpenAI(api_key=PPLX_API_KEY,
-                     base_url="https://api.perplexity.ai")
-PPLX_MODEL = "sonar"
+PPLX_MODEL  = "sonar"
+PPLX_SYSTEM = "Be precise and concise."
+PPLX_RPM    = float(os.getenv("PPLX_REQUESTS_PER_MINUTE", 50))
 
 def build_prompt(prof: str) -> str:
     """
@@ -78,6 +85,35 @@ def build_prompt(prof: str) -> str:
             "by commas. Respond in the form:\n"
             "Research Areas: topic1, topic2, …")
 
+def prompt_hash(prompt: str, model: str = PPLX_MODEL) -> str:
+    """
+    Key of a stored Perplexity answer.
+    
+    Args:
+        prompt: Prompt sent to Perplexity
+        model: Perplexity model
+        
+    Returns:
+        Hex digest of model, system message and prompt
+    """
+    text = "\n".join((model, PPLX_SYSTEM, prompt))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+def get_pplx_provider():
+    """
+    Perplexity provider, created on first use so that importing this module
+    (e.g. for plotting) does not need an API key.
+    
+    Returns:
+        Chat provider for Perplexity
+    """
+    provider = get_provider("perplexity")
+    if provider is None:
+        raise RuntimeError("Perplexity is disabled in offline mode (RESEARCHMATCH_OFFLINE)")
+    if getattr(provider, "api_key", True) is None and not os.getenv("PERPLEXITY_BASE_URL"):
+        raise RuntimeError("Please set PPLX_API_KEY!")
+    return provider
+
 def call_perplexity(prompt: str) -> str:
     """
     Call Perplexity API with prompt.
@@ -88,17 +124,100 @@ def call_perplexity(prompt: str) -> str:
     Returns:
         API response text
     """
-    rsp = client_pplx.chat.completions.create(
+    return get_pplx_provider().complete(
         model=PPLX_MODEL,
         temperature=0.0,
         messages=[
-            {"role":"system","content":"Be precise and concise."},
+            {"role":"system","content":PPLX_SYSTEM},
             {"role":"user","content":prompt},
         ]
     )
-    return rsp.choices[0].message.content
 
-# ───────────────────────────── 3. Metrics helpers ───────────────────────── #
+# ───────────────────────────── 3. Ground truth store ────────────────────── #
+def load_ground_truth(path: Path = GT_FILE) -> dict[str, dict]:
+    """
+    Load stored Perplexity answers.
+    
+    Args:
+        path: JSONL file of {professor, prompt, perplexity_raw} rows
+        
+    Returns:
+        Dictionary mapping prompt hashes to rows; later rows win
+    """
+    rows = {}
+    if not path.exists():
+        return rows
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+                # rows written before the hash was stored were all "sonar"
+                key = row.get("prompt_hash") or prompt_hash(
+                    row["prompt"], row.get("model", "sonar"))
+            except (ValueError, KeyError):
+                continue                                      # torn last line
+            rows[key] = row
+    return rows
+
+async def fetch_ground_truth(profs: list[str], store: dict[str, dict],
+                             path: Path = GT_FILE,
+                             rpm: float = PPLX_RPM) -> list[str]:
+    """
+    Query Perplexity for every professor without a stored answer.
+    
+    Requests run concurrently, bounded by the provider's concurrency limit
+    and started at most `rpm` times a minute. Answers are appended to
+    `path` as they arrive, so interrupted runs resume.
+    
+    Args:
+        profs: Professor names
+        store: Stored answers from `load_ground_truth`, updated in place
+        path: JSONL file answers are appended to
+        rpm: Requests started per minute (0 disables pacing)
+        
+    Returns:
+        Professors whose Perplexity call failed
+    """
+    missing = list(dict.fromkeys(p for p in profs
+                                 if prompt_hash(build_prompt(p)) not in store))
+    if not missing:
+        return []
+    provider = get_pplx_provider()
+    interval = 60.0 / rpm if rpm > 0 else 0.0
+    next_start = [time.monotonic()]
+    failed = []
+
+    async def fetch(prof: str, f, bar):
+        # reserve the next start slot, then wait for it
+        start = max(next_start[0], time.monotonic())
+        next_start[0] = start + interval
+        await asyncio.sleep(start - time.monotonic())
+        prompt = build_prompt(prof)
+        try:
+            raw = await provider.acomplete(
+                model=PPLX_MODEL,
+                temperature=0.0,
+                messages=[
+                    {"role":"system","content":PPLX_SYSTEM},
+                    {"role":"user","content":prompt},
+                ]
+            )
+        except Exception as e:
+            print("Perplexity call failed for", prof, "→", repr(e))
+            failed.append(prof)
+        else:
+            row = {"professor":prof, "prompt":prompt, "perplexity_raw":raw,
+                   "model":PPLX_MODEL, "prompt_hash":prompt_hash(prompt)}
+            f.write(json.dumps(row, ensure_ascii=False) + "\n"); f.flush()
+            store[row["prompt_hash"]] = row
+        bar.update()
+
+    with path.open("a", encoding="utf-8") as f, \
+            tqdm(total=len(missing), desc="Perplexity") as bar:
+        await asyncio.gather(*(fetch(p, f, bar) for p in missing))
+    return failed
+
+# ───────────────────────────── 4. Metrics helpers ───────────────────────── #
 def jaccard(a:set[str], b:set[str]) -> float:
     """
     Calculate Jaccard similarity between two sets.
@@ -112,86 +231,95 @@ def jaccard(a:set[str], b:set[str]) -> float:
     """
     return len(a & b) / max(len(a | b), 1)
 
-def compute_metrics(gt: list[str], pred: list[str]):
+def _ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    """num / den, 0 where den is 0 (sklearn's zero_division=0)."""
+    return np.divide(num, den, out=np.zeros(len(num)), where=den > 0)
+
+def compute_metrics(pairs: pd.DataFrame) -> pd.DataFrame:
     """
-    Compute evaluation metrics between ground truth and predictions.
+    Compute evaluation metrics for many (ground truth, prediction) pairs.
+    
+    Topic lists are exploded into one long table per side and intersected
+    with a single join, so every professor and model is scored at once.
     
     Args:
-        gt: Ground truth topics
-        pred: Predicted topics
+        pairs: DataFrame with "gt" and "pred" columns of topic lists
         
     Returns:
-        Dictionary of metrics
-    """
-    lab       = sorted(set(gt + pred))
-    gt_bin    = [t in gt   for t in lab]
-    pred_bin  = [t in pred for t in lab]
-    return {
-        "jaccard"  : jaccard(set(gt), set(pred)),
-        "precision": precision_score(gt_bin, pred_bin, zero_division=0),
-        "recall"   : recall_score(gt_bin, pred_bin, zero_division=0),
-        "f1"       : f1_score(gt_bin, pred_bin, zero_division=0),
-    }
+        DataFrame (same index) with jaccard, precision, recall and f1
+    """
+    def long(col: str) -> pd.DataFrame:
+        topics = pairs[col].explode().dropna()
+        return pd.DataFrame({"pair": topics.index, "topic": topics.values}) \
+                 .drop_duplicates()
+    both = (long("gt").merge(long("pred"), on=["pair", "topic"])
+                      .groupby("pair").size()
+                      .reindex(pairs.index, fill_value=0).to_numpy(float))
+    n_gt   = pairs["gt"].str.len().to_numpy(float)
+    n_pred = pairs["pred"].str.len().to_numpy(float)
+    return pd.DataFrame({
+        "jaccard"  : both / np.maximum(n_gt + n_pred - both, 1),
+        "precision": _ratio(both, n_pred),
+        "recall"   : _ratio(both, n_gt),
+        "f1"       : _ratio(2 * both, n_gt + n_pred),
+    }, index=pairs.index)
 
-# ───────────────────────────── 4. Main evaluation ───────────────────────── #
-def main(results_file: Path, limit: int | None):
+# ───────────────────────────── 5. Main evaluation ───────────────────────── #
+def main(results_file: Path, limit: int | None, rpm: float = PPLX_RPM,
+         gt_file: Path = GT_FILE):
     """
     Main evaluation function.
     
     Args:
         results_file: Path to results JSON file
         limit: Maximum number of professors to evaluate
+        rpm: Perplexity requests started per minute
+        gt_file: JSONL file of stored Perplexity answers
         
     Returns:
         DataFrame with evaluation results
     """
-    records = json.loads(results_file.read_text())
-    rows, gt_rows, metrics_data = [], [], []
+    records = json.loads(results_file.read_text())[:limit]
+    store   = load_ground_truth(gt_file)
+    failed  = asyncio.run(fetch_ground_truth([r["name"] for r in records],
+                                             store, gt_file, rpm))
+    if failed:
+        print(f"{len(failed)} Perplexity calls failed; rerun to retry them.")
 
-    for rec in tqdm(records[:limit], desc="Scoring"):
+    # One row per (professor, model) answer with stored ground truth
+    pairs, scored = [], []
+    for i, rec in enumerate(records):
         prof   = rec["name"]
-        prompt = build_prompt(prof)
-
-        try:
-            gt_raw  = call_perplexity(prompt)
-            gt_list = clean_topics(gt_raw.split(":", 1)[-1])
-            gt_rows.append({"professor":prof, "prompt":prompt,
-                            "perplexity_raw":gt_raw})
-        except Exception as e:
-            print("Perplexity call failed for", prof, "→", e)
+        stored = store.get(prompt_hash(build_prompt(prof)))
+        if stored is None:
             continue
-
-        # Calculate metrics for each model
-        model_metrics = {}
+        gt_raw  = stored["perplexity_raw"]
+        gt_list = clean_topics(gt_raw.split(":", 1)[-1])
+        scored.append((i, prof))
         for model, answer in rec["research_areas"].items():
             if not answer:
                 continue                                      # skip empty list
-            pred_list = clean_topics(answer)
-            metrics   = compute_metrics(gt_list, pred_list)
-            
-            # Store metrics for this model
-            model_metrics[model] = {
-                "precision": metrics["precision"],
-                "recall": metrics["recall"],
-                "f1": metrics["f1"],
-                "jaccard": metrics["jaccard"],
-                "predicted_topics": pred_list,
-                "ground_truth_topics": gt_list
-            }
-            
-            rows.append({
-                "professor": prof,
-                "model":     model,
-                **metrics,
-                "gt_raw":    gt_raw,
-                "pred_raw":  ", ".join(answer),
-            })
-
-        # Add metrics to metrics data
-        metrics_data.append({
-            "professor": prof,
-            "metrics": model_metrics
-        })
+            pairs.append({"record":i, "professor":prof, "model":model,
+                          "gt":gt_list, "pred":clean_topics(answer),
+                          "gt_raw":gt_raw, "pred_raw":", ".join(answer)})
+    pairs = pd.DataFrame(pairs, columns=["record", "professor", "model", "gt",
+                                         "pred", "gt_raw", "pred_raw"])
+    pairs = pairs.join(compute_metrics(pairs))
+
+    # Per-professor metrics, in dataset order (empty when every model
+    # answer is empty)
+    model_metrics = {
+        i: {row.model: {"precision": row.precision,
+                        "recall": row.recall,
+                        "f1": row.f1,
+                        "jaccard": row.jaccard,
+                        "predicted_topics": row.pred,
+                        "ground_truth_topics": row.gt}
+            for row in group.itertuples()}
+        for i, group in pairs.groupby("record", sort=False)
+    }
+    metrics_data = [{"professor": prof, "metrics": model_metrics.get(i, {})}
+                    for i, prof in scored]
 
     # Save metrics to separate file
     metrics_file = DATA_DIR / "metrics.json"
@@ -199,16 +327,14 @@ def main(results_file: Path, limit: int | None):
         json.dump(metrics_data, f, indent=2)
 
     # Save evaluation results
-    pd.DataFrame(rows).to_parquet(DATA_DIR / "evaluation_results.parquet",
-                                  index=False)
-    with (DATA_DIR / "perplexity_outputs.jsonl").open("w", encoding="utf‑8") as f:
-        for item in gt_rows:
-            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+    rows = pairs[["professor", "model", "jaccard", "precision", "recall", "f1",
+                  "gt_raw", "pred_raw"]]
+    rows.to_parquet(DATA_DIR / "evaluation_results.parquet", index=False)
 
     print("✓ Saved data files under", DATA_DIR)
-    return pd.DataFrame(rows)
+    return rows
 
-# ───────────────────────────── 5. Plotting helpers ──────────────────────── #
+# ───────────────────────────── 6. Plotting helpers ──────────────────────── #
 def plot_results(df: pd.DataFrame):
     """
     Generate evaluation plots.
@@ -239,7 +365,7 @@ def plot_results(df: pd.DataFrame):
     plt.savefig(PLOTS_DIR / "heatmap_f1.png", dpi=200); plt.close()
     print("✓ Saved plots under", PLOTS_DIR)
 
-# ───────────────────────────── 6. CLI entry‑point ───────────────────────── #
+# ───────────────────────────── 7. CLI entry‑point ───────────────────────── #
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--results",
@@ -248,7 +374,14 @@ if __name__ == "__main__":
                         help="Cached model answers (JSON)")
     parser.add_argument("--limit", type=int, default=None,
                         help="Evaluate only the first N professors")
+    parser.add_argument("--ground-truth", default=GT_FILE, type=Path,
+                        help="Stored Perplexity answers (JSONL)")
+    parser.add_argument("--rpm", type=float, default=PPLX_RPM,
+                        help="Perplexity requests per minute (0 = unlimited)")
+    parser.add_argument("--plot", action="store_true",
+                        help="Also save plots under LLM_evals/plots")
     args = parser.parse_args()
 
-    df_metrics = main(args.results, args.limit)
-    # plot_results(df_metrics)
+    df_metrics = main(args.results, args.limit, args.rpm, args.ground_truth)
+    if args.plot:
+        plot_results(df_metrics)
@@ -0,0 +1,39 @@
+"""
+ResearchMatch matching package.
+
+Importing the package is cheap: matcher classes are resolved lazily on
+first attribute access, and each strategy only loads its heavy
+dependencies (NLTK, scikit-learn, gensim, OpenAI) when it is first
+instantiated.
+
+Set `RESEARCHMATCH_OFFLINE=1` to run without network access: missing
+NLTK resources are never downloaded and LLM strategies are disabled.
+"""
+
+import os
+import importlib
+
+
+OFFLINE: bool = os.environ.get(
+    'RESEARCHMATCH_OFFLINE', ''
+).lower() in ('1', 'true', 'yes')
+
+_LAZY_ATTRIBUTES: dict[str, str] = {
+    'Matcher': 'matching.matchers',
+    'TFIDFMatcher': 'matching.matchers',
+    'Word2VecMatcher': 'matching.matchers',
+    'KeywordMatcher': 'matching.matchers',
+    'DeepseekMatcher': 'matching.matchers',
+    'Preprocessor': 'matching.preprocessors',
+    'CitationSorter': 'matching.sorters',
+    'SortMetric': 'matching.sorters',
+}
+
+__all__ = ['OFFLINE', *_LAZY_ATTRIBUTES]
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    module = importlib.import_module(_LAZY_ATTRIBUTES[name])
+    return getattr(module, name)
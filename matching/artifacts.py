@@ -0,0 +1,267 @@
+"""
+On-disk index artifacts for matchers.
+
+An index directory holds one sub-directory per matching strategy plus a
+`manifest.json` recording the artifact format version, the version of
+the dataset it was built from and the current sub-directory of each
+strategy. Arrays are stored as `.npy` files so they can be memory-mapped
+on load; worker processes mapping the same files share a single copy of
+the pages.
+
+Every build writes into a fresh sub-directory and switches the manifest
+to it last, so rebuilding a live index never rewrites files that running
+workers have mapped.
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import numpy as np
+import scipy.sparse as sp
+from typing import Any
+
+
+INDEX_FORMAT_VERSION: int = 1
+INDEX_PATH: str = 'index'
+MANIFEST_NAME: str = 'manifest'
+
+
+def dataset_version(raw_data: bytes) -> str:
+    """
+    Compute a version identifier for a dataset.
+
+    Args:
+        raw_data: Raw bytes of the dataset file
+
+    Returns:
+        Short content hash of the dataset
+    """
+    return hashlib.sha256(raw_data).hexdigest()[:16]
+
+
+def save_json(directory: str, name: str, obj: Any):
+    """
+    Save a JSON document inside an artifact directory.
+
+    Args:
+        directory: Artifact directory
+        name: File name without extension
+        obj: JSON-serializable object
+    """
+    path = os.path.join(directory, f'{name}.json')
+    with open(f'{path}.tmp', 'w') as f:
+        json.dump(obj, f)
+    os.replace(f'{path}.tmp', path)
+
+
+def load_json(directory: str, name: str) -> Any:
+    """
+    Load a JSON document from an artifact directory.
+
+    Args:
+        directory: Artifact directory
+        name: File name without extension
+
+    Returns:
+        Decoded JSON object
+    """
+    with open(os.path.join(directory, f'{name}.json'), 'r') as f:
+        return json.load(f)
+
+
+def save_array(directory: str, name: str, array: np.ndarray):
+    """
+    Save a dense array inside an artifact directory.
+
+    Args:
+        directory: Artifact directory
+        name: File name without extension
+        array: Array to save
+    """
+    path = os.path.join(directory, f'{name}.npy')
+    with open(f'{path}.tmp', 'wb') as f:
+        np.save(f, np.ascontiguousarray(array), allow_pickle=False)
+    os.replace(f'{path}.tmp', path)
+
+
+def load_array(
+        directory: str, name: str, mmap_mode: str | None = 'r'
+    ) -> np.ndarray:
+    """
+    Load a dense array from an artifact directory.
+
+    Args:
+        directory: Artifact directory
+        name: File name without extension
+        mmap_mode: NumPy memory-map mode, or None to read into memory
+
+    Returns:
+        Loaded (memory-mapped) array
+    """
+    return np.load(
+        os.path.join(directory, f'{name}.npy'),
+        mmap_mode=mmap_mode,
+        allow_pickle=False
+    )
+
+
+def save_sparse(directory: str, name: str, matrix: sp.spmatrix):
+    """
+    Save a sparse CSR matrix as its component arrays.
+
+    Args:
+        directory: Artifact directory
+        name: Prefix for the component files
+        matrix: Sparse matrix to save
+    """
+    matrix = sp.csr_matrix(matrix)
+    save_array(directory, f'{name}_data', matrix.data)
+    save_array(directory, f'{name}_indices', matrix.indices)
+    save_array(directory, f'{name}_indptr', matrix.indptr)
+    save_array(directory, f'{name}_shape', np.array(matrix.shape))
+
+
+def load_sparse(
+        directory: str, name: str, mmap_mode: str | None = 'r'
+    ) -> sp.csr_matrix:
+    """
+    Load a sparse CSR matrix from its component arrays.
+
+    Args:
+        directory: Artifact directory
+        name: Prefix of the component files
+        mmap_mode: NumPy memory-map mode, or None to read into memory
+
+    Returns:
+        Sparse CSR matrix backed by the loaded arrays
+    """
+    shape = tuple(load_array(directory, f'{name}_shape', None))
+    return sp.csr_matrix(
+        (
+            load_array(directory, f'{name}_data', mmap_mode),
+            load_array(directory, f'{name}_indices', mmap_mode),
+            load_array(directory, f'{name}_indptr', mmap_mode),
+        ),
+        shape=shape,
+        copy=False
+    )
+
+
+def create_index_dir(index_path: str, strategy: str) -> str:
+    """
+    Create a fresh artifact directory for a strategy build.
+
+    Args:
+        index_path: Root index directory
+        strategy: Strategy name
+
+    Returns:
+        Path to the new (empty) artifact directory
+    """
+    directory = os.path.join(
+        index_path, f'{strategy}-{time.time_ns():x}-{os.getpid()}'
+    )
+    os.makedirs(directory)
+    return directory
+
+
+def register_index_dir(
+        index_path: str,
+        strategy: str,
+        version: str,
+        num_entries: int,
+        directory: str | None = None
+    ):
+    """
+    Record a fully written strategy directory in the index manifest.
+
+    The manifest is reset whenever the dataset version changes, so
+    artifacts from different datasets are never mixed. Builds of the
+    strategy older than the one just replaced are deleted; the replaced
+    one is kept for workers that are still loading it.
+
+    Args:
+        index_path: Root index directory
+        strategy: Strategy name
+        version: Dataset version the artifacts are built from
+        num_entries: Number of dataset entries
+        directory: Artifact directory from `create_index_dir` (defaults
+            to the legacy `<index_path>/<strategy>`)
+    """
+    try:
+        manifest = load_json(index_path, MANIFEST_NAME)
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifest = {}
+    previous = manifest.get('directories', {}).get(strategy)
+    if (
+        manifest.get('format_version') != INDEX_FORMAT_VERSION
+        or
+        manifest.get('dataset_version') != version
+    ):
+        manifest = {
+            'format_version': INDEX_FORMAT_VERSION,
+            'dataset_version': version,
+            'num_entries': num_entries,
+            'strategies': [],
+            'directories': {},
+        }
+    if strategy not in manifest['strategies']:
+        manifest['strategies'].append(strategy)
+    current = os.path.basename(directory or strategy)
+    manifest.setdefault('directories', {})[strategy] = current
+    save_json(index_path, MANIFEST_NAME, manifest)
+
+    for name in os.listdir(index_path):
+        if (
+            name.startswith(f'{strategy}-') and name not in (current, previous)
+            and os.path.isdir(os.path.join(index_path, name))
+        ):
+            shutil.rmtree(os.path.join(index_path, name), ignore_errors=True)
+
+
+def open_index_dir(
+        index_path: str,
+        strategy: str,
+        version: str
+    ) -> str | None:
+    """
+    Locate a usable artifact directory for a strategy.
+
+    Args:
+        index_path: Root index directory
+        strategy: Strategy sub-directory name
+        version: Dataset version the caller was loaded with
+
+    Returns:
+        Path to the strategy artifact directory, or None if the index is
+        missing, stale or was written by another format version
+    """
+    try:
+        manifest = load_json(index_path, MANIFEST_NAME)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(
+            f'Warning: Could not read index manifest in {index_path}: {e}. Rebuilding {strategy} index.'
+        )
+        return None
+
+    if manifest.get('format_version') != INDEX_FORMAT_VERSION:
+        print(
+            f'Warning: Index in {index_path} has format version {manifest.get("format_version")}, expected {INDEX_FORMAT_VERSION}. Rebuilding {strategy} index.'
+        )
+        return None
+    if manifest.get('dataset_version') != version:
+        print(
+            f'Warning: Index in {index_path} was built from another dataset version. Rebuilding {strategy} index.'
+        )
+        return None
+    if strategy not in manifest.get('strategies', []):
+        print(
+            f'Warning: Index in {index_path} has no {strategy} artifacts. Rebuilding {strategy} index.'
+        )
+        return None
+
+    return os.path.join(
+        index_path, manifest.get('directories', {}).get(strategy, strategy)
+    )
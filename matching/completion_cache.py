@@ -0,0 +1,224 @@
+"""
+Persistent cache for LLM completions.
+
+Completions are stored in SQLite under a fingerprint of everything that
+determines them (model, sampling parameters, the candidate list shown to
+the model and the normalized query), so a completion is reused across
+processes and restarts, and by requests that differ only in how many
+results they keep or how they are sorted. The cache is bounded by entry
+count and total size, evicting the least recently used entries.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+
+
+LLM_CACHE_PATH: str = os.environ.get('LLM_CACHE_PATH', 'llm_cache.db')
+LLM_CACHE_MAX_ENTRIES: int = int(os.environ.get('LLM_CACHE_MAX_ENTRIES', 10000))
+LLM_CACHE_MAX_BYTES: int = int(
+    os.environ.get('LLM_CACHE_MAX_BYTES', 64 * 1024 * 1024)
+)
+FINGERPRINT_VERSION: int = 2    # bump when the prompt or normalization changes
+# quotes and brackets around the query, and sentence punctuation after it;
+# symbols that are part of terms ('c++', 'c#', '.net') are kept
+LEADING_PUNCTUATION: str = '\'"`([{'
+TRAILING_PUNCTUATION: str = '\'"`)]}.,;:!?'
+SCHEMA: str = '''
+CREATE TABLE IF NOT EXISTS completions (
+    fingerprint TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    content TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS completions_last_used
+    ON completions (last_used);
+'''
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a query so trivially different spellings share a
+    fingerprint (case, whitespace and surrounding punctuation).
+
+    Only spellings that mean the same go together: symbols inside the
+    query are kept, so 'C++ compilers', 'C# compilers' and 'C compilers'
+    stay distinct, as they are in the prompt.
+
+    Args:
+        query: Search query string
+
+    Returns:
+        Normalized query
+    """
+    query = ' '.join(query.casefold().split())
+    return query.lstrip(LEADING_PUNCTUATION).rstrip(TRAILING_PUNCTUATION).strip()
+
+
+def prompt_fingerprint(
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        candidates: str,
+        query: str
+    ) -> str:
+    """
+    Fingerprint the inputs of a completion.
+
+    Args:
+        model: Model name
+        temperature: Sampling temperature
+        max_tokens: Completion token limit
+        candidates: Candidate list shown to the model
+        query: Search query string
+
+    Returns:
+        Hex digest identifying the completion
+    """
+    candidate_hash = hashlib.sha256(candidates.encode('utf-8')).hexdigest()
+    payload = json.dumps([
+        FINGERPRINT_VERSION, model, temperature, max_tokens,
+        candidate_hash, normalize_query(query)
+    ])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class CompletionCache:
+    """
+    SQLite-backed LRU cache of completion texts.
+
+    Args:
+        path: Database file
+        max_entries: Maximum number of completions kept
+        max_bytes: Maximum total size of the kept completion texts
+    """
+    def __init__(
+            self,
+            path: str = LLM_CACHE_PATH,
+            max_entries: int = LLM_CACHE_MAX_ENTRIES,
+            max_bytes: int = LLM_CACHE_MAX_BYTES
+        ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, fingerprint: str) -> str | None:
+        """
+        Look up a completion, refreshing its recency on a hit.
+
+        Args:
+            fingerprint: Completion fingerprint
+
+        Returns:
+            Completion text, or None on a miss
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT content FROM completions WHERE fingerprint = ?',
+                (fingerprint,)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    'UPDATE completions SET last_used = ? WHERE fingerprint = ?',
+                    (time.time(), fingerprint)
+                )
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return None if row is None else row[0]
+
+    def set(self, fingerprint: str, model: str, content: str):
+        """
+        Store a completion, evicting the least recently used ones when
+        a size limit is exceeded.
+
+        Args:
+            fingerprint: Completion fingerprint
+            model: Model that produced the completion
+            content: Completion text
+        """
+        now = time.time()
+        size = len(content.encode('utf-8'))
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO completions '
+                '(fingerprint, model, content, size, created, last_used) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (fingerprint, model, content, size, now, now)
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        count, total = conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions'
+        ).fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        evict, freed = 0, 0
+        for (size,) in conn.execute(
+            'SELECT size FROM completions ORDER BY last_used'
+        ):
+            if count - evict <= self.max_entries and total - freed <= self.max_bytes:
+                break
+            evict += 1
+            freed += size
+        conn.execute(
+            'DELETE FROM completions WHERE fingerprint IN ('
+            'SELECT fingerprint FROM completions ORDER BY last_used LIMIT ?)',
+            (evict,)
+        )
+
+    def clear(self):
+        """
+        Remove every completion and reset the hit/miss counters.
+        """
+        with self._connect() as conn:
+            conn.execute('DELETE FROM completions')
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hits, misses, entries and bytes
+        """
+        with self._connect() as conn:
+            entries, size = conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions'
+            ).fetchone()
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': entries,
+                'bytes': size,
+            }
@@ -0,0 +1,148 @@
+"""
+Concurrency helpers for the asyncio matcher interface.
+
+CPU-bound matchers run on a shared thread pool (NumPy and SciPy release
+the GIL in the scoring kernels), while LLM-backed matchers await their
+provider directly. Calls to a provider are bounded by a per-provider
+semaphore and identical in-flight requests are coalesced into one.
+"""
+
+import os
+import asyncio
+import weakref
+import threading
+from typing import Any, Awaitable, Callable, Hashable
+from concurrent.futures import ThreadPoolExecutor
+
+
+MATCH_POOL_WORKERS: int = int(
+    os.environ.get('MATCH_POOL_WORKERS', min(32, (os.cpu_count() or 1) + 4))
+)
+LLM_MAX_CONCURRENCY: int = int(os.environ.get('LLM_MAX_CONCURRENCY', 16))
+LLM_TIMEOUT_SECONDS: float = float(os.environ.get('LLM_TIMEOUT_SECONDS', 30))
+
+_executor = None
+_executor_lock = threading.Lock()
+# event loop -> provider name -> semaphore
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def get_match_executor() -> ThreadPoolExecutor:
+    """
+    Get the pool CPU-bound matches are offloaded to, creating it on
+    first use.
+
+    Returns:
+        Shared thread pool
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=MATCH_POOL_WORKERS,
+                    thread_name_prefix='match'
+                )
+    return _executor
+
+
+async def run_in_pool(func: Callable, *args, **kwargs) -> Any:
+    """
+    Run a blocking call on the match pool from the event loop.
+
+    Args:
+        func: Blocking callable
+        args: Positional arguments
+        kwargs: Keyword arguments
+
+    Returns:
+        Result of the call
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_match_executor(), lambda: func(*args, **kwargs)
+    )
+
+
+def provider_semaphore(
+        provider: str, limit: int = LLM_MAX_CONCURRENCY
+    ) -> asyncio.Semaphore:
+    """
+    Get the semaphore bounding concurrent calls to a provider on the
+    running event loop.
+
+    Args:
+        provider: Provider name
+        limit: Maximum concurrent calls (used when first created)
+
+    Returns:
+        Semaphore shared by every matcher using the provider
+    """
+    loop = asyncio.get_running_loop()
+    semaphores = _semaphores.get(loop)
+    if semaphores is None:
+        # a semaphore that has been waited on references its loop, so the
+        # weak keys alone do not release loops closed by asyncio.run
+        for closed in [other for other in _semaphores if other.is_closed()]:
+            del _semaphores[closed]
+        semaphores = _semaphores[loop] = {}
+    semaphore = semaphores.get(provider)
+    if semaphore is None:
+        semaphore = semaphores[provider] = asyncio.Semaphore(limit)
+    return semaphore
+
+
+class InflightRequests:
+    """
+    Coalesces identical concurrent requests: the first caller for a key
+    starts the request and later callers await the same result until it
+    completes.
+    """
+    def __init__(self):
+        self._tasks = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def run(
+            self,
+            key: Hashable,
+            factory: Callable[[], Awaitable[Any]]
+        ) -> Any:
+        """
+        Await the in-flight request for a key, starting it if needed.
+
+        Args:
+            key: Request identity
+            factory: Callable creating the request coroutine
+
+        Returns:
+            Result of the request
+        """
+        loop = asyncio.get_running_loop()
+        task = self._tasks.get(key)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(factory())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.started += 1
+        else:
+            self.coalesced += 1
+        # a cancelled caller must not cancel the request for the others
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+
+    def stats(self) -> dict[str, int]:
+        """
+        Get coalescing statistics.
+
+        Returns:
+            Dictionary with started, coalesced and in-flight counts
+        """
+        return {
+            'started': self.started,
+            'coalesced': self.coalesced,
+            'inflight': len(self._tasks),
+        }
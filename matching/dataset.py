@@ -0,0 +1,158 @@
+"""
+Dataset deltas for incremental refreshes.
+
+A refresh that finds only a few changed profiles describes the change as a
+delta instead of a new dataset:
+
+    {
+        "base_version": <dataset_version of the previous results.json>,
+        "version": <dataset_version of the new results.json>,
+        "order": [<record key of every new entry, in dataset order>],
+        "upserts": [<new or changed entries>],
+        "removed": [<record keys of dropped entries>]
+    }
+
+Entries are identified by their profile link (falling back to their name)
+and compared by a hash of their canonical JSON. Deltas are stored as
+`<base_version>.json` in a delta directory, so a matcher holding any
+version can follow the chain of deltas up to the newest dataset.
+"""
+
+import os
+import json
+import hashlib
+from typing import Any
+
+
+DELTA_PATH: str = os.environ.get('RESEARCHMATCH_DELTA_PATH', 'deltas')
+
+
+def record_key(entry: dict[str, Any]) -> str:
+    """
+    Stable identity of a dataset entry.
+
+    Args:
+        entry: Professor data entry
+
+    Returns:
+        Profile link of the entry, or its name if it has none
+    """
+    profile_link = (entry.get('link') or {}).get('profile_link')
+    return profile_link or entry.get('name') or ''
+
+
+def record_hash(entry: dict[str, Any]) -> str:
+    """
+    Content hash of a dataset entry, independent of key order.
+
+    Args:
+        entry: Professor data entry
+
+    Returns:
+        Short hash of the canonical JSON of the entry
+    """
+    canonical = json.dumps(entry, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def compute_delta(
+        old_records: list[dict[str, Any]],
+        new_records: list[dict[str, Any]],
+        base_version: str,
+        version: str
+    ) -> dict[str, Any]:
+    """
+    Describe how a dataset changed.
+
+    Args:
+        old_records: Entries of the previous dataset
+        new_records: Entries of the new dataset
+        base_version: Version of the previous dataset
+        version: Version of the new dataset
+
+    Returns:
+        Delta turning the previous dataset into the new one
+    """
+    old_hashes = {record_key(entry): record_hash(entry) for entry in old_records}
+    new_keys = [record_key(entry) for entry in new_records]
+    return {
+        'base_version': base_version,
+        'version': version,
+        'order': new_keys,
+        'upserts': [
+            entry for key, entry in zip(new_keys, new_records)
+            if old_hashes.get(key) != record_hash(entry)
+        ],
+        'removed': sorted(set(old_hashes) - set(new_keys)),
+    }
+
+
+def apply_delta(
+        records: list[dict[str, Any]],
+        delta: dict[str, Any]
+    ) -> tuple[list[dict[str, Any]], list[int]]:
+    """
+    Apply a delta to the entries of its base dataset.
+
+    Args:
+        records: Entries of the delta's base dataset
+        delta: Delta from `compute_delta`
+
+    Returns:
+        Tuple of (new entries, source of each new entry), where the source
+        is the entry's position in `records`, or -1 for upserted entries
+    """
+    positions = {record_key(entry): i for i, entry in enumerate(records)}
+    upserts = {record_key(entry): entry for entry in delta['upserts']}
+    data, sources = [], []
+    for key in delta['order']:
+        if key in upserts:
+            data.append(upserts[key])
+            sources.append(-1)
+        elif key in positions:
+            data.append(records[positions[key]])
+            sources.append(positions[key])
+        else:
+            raise ValueError(f"Delta references unknown entry '{key}'")
+    return data, sources
+
+
+def save_delta(delta: dict[str, Any], delta_path: str = DELTA_PATH) -> str:
+    """
+    Write a delta to a delta directory.
+
+    Args:
+        delta: Delta from `compute_delta`
+        delta_path: Delta directory
+
+    Returns:
+        Path of the written delta
+    """
+    os.makedirs(delta_path, exist_ok=True)
+    path = os.path.join(delta_path, f"{delta['base_version']}.json")
+    with open(f'{path}.tmp', 'w') as f:
+        json.dump(delta, f)
+    os.replace(f'{path}.tmp', path)
+    return path
+
+
+def load_delta(
+        base_version: str,
+        delta_path: str = DELTA_PATH
+    ) -> dict[str, Any] | None:
+    """
+    Load the delta starting from a dataset version.
+
+    Args:
+        base_version: Dataset version the delta applies to
+        delta_path: Delta directory
+
+    Returns:
+        The delta, or None if there is none
+    """
+    path = os.path.join(delta_path, f'{base_version}.json')
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
@@ -1,38 +1,152 @@
 import os
 import json
-import numpy as np
-from typing import Any
-from openai import OpenAI
+import asyncio
+from typing import Any, TYPE_CHECKING
 from abc import ABC, abstractmethod
 
 from matching.preprocessors import Preprocessor
 from matching.vectorizers import (
     TFIDFVectorizer, Word2VecVectorizer
 )
+from .artifacts import (
+    INDEX_PATH,
+    dataset_version,
+    create_index_dir,
+    register_index_dir,
+    open_index_dir,
+)
+from .scorers import CosineScorer, OverlapScorer
+from .dataset import apply_delta
+from .completion_cache import (
+    LLM_CACHE_PATH, CompletionCache, prompt_fingerprint
+)
 from .sorters import CitationSorter, SortMetric
-from dashboard.monitor import monitor_matching
+from .concurrency import InflightRequests, run_in_pool
+from dashboard.monitor import (
+    monitor_matching, monitor_batch_matching, record_error
+)
+from dashboard.spans import span
+
+if TYPE_CHECKING:
+    from .providers import ChatProvider
 
 
 NUM_MATCHES: int = 10
 MAX_TOKENS: int = 150
 TEMPERATURE: float = 0.2
 PROMPT_RESEARCHER_LIMIT: int = 100
+RERANK_CANDIDATES: int = int(os.environ.get('RERANK_CANDIDATES', 30))
+RANK_TOKENS_PER_NAME: int = 8
 DATA_PATH: str = 'public/results.json'
 
 
+class MatcherState:
+    """
+    Everything a query reads: the entries, their positions, the dataset
+    version and the strategy's fitted structures.
+    
+    States are not modified once built. `Matcher.apply_delta` builds a new
+    state and swaps it in with a single assignment, so a query that reads
+    `matcher.state` once sees one consistent dataset even while a delta is
+    being applied.
+    
+    Args:
+        data: Professor data entries
+        dataset_version: Version of the dataset the entries come from
+        vectorizer: Fitted vectorizer, if the strategy has one
+        scorer: Scorer over the entries, if the strategy has one
+        name_index: Normalized name -> entry, if the strategy matches names
+        entry_index: Entry identity -> position (computed from `data`
+            when not given)
+    """
+    __slots__ = (
+        'data', 'dataset_version', 'vectorizer', 'scorer', 'name_index',
+        'entry_index',
+    )
+
+    def __init__(
+            self, data: list[dict[str, Any]],
+            dataset_version: str,
+            vectorizer: Any = None,
+            scorer: Any = None,
+            name_index: dict[str, dict[str, Any]] | None = None,
+            entry_index: dict[int, int] | None = None
+        ):
+        self.data = data
+        self.dataset_version = dataset_version
+        self.vectorizer = vectorizer
+        self.scorer = scorer
+        self.name_index = name_index
+        # entry identity -> position, used to cache matches as indices
+        self.entry_index = entry_index if entry_index is not None else {
+            id(entry): i for i, entry in enumerate(data)
+        }
+
+    def replace(self, **changes: Any) -> 'MatcherState':
+        """
+        Copy of the state with some fields changed.
+        
+        Args:
+            changes: Field name -> new value
+            
+        Returns:
+            New state
+        """
+        fields = {
+            name: getattr(self, name) for name in self.__slots__
+        }
+        if 'data' in changes:
+            fields['entry_index'] = None
+        fields.update(changes)
+        return MatcherState(**fields)
+
+
 class Matcher(ABC):
     """
     Abstract base class for implementing different matching algorithms.
     Provides common functionality for processing and matching research areas.
+    
+    Strategies with a fitted model set `index_name`; their artifacts can be
+    written with `save_index` and are loaded from `index_path` instead of
+    being refit when present and built from the same dataset.
+    
+    The dataset and fitted structures live in one `MatcherState`; matching
+    methods read `self.state` once per call and use only that snapshot.
     """
+    index_name: str | None = None
+
     def __init__(
-            self, data_path: str = DATA_PATH
+            self, data_path: str = DATA_PATH,
+            index_path: str | None = None
         ):
-        with open(data_path, 'r') as f:
-            self.data = json.load(f)
+        with open(data_path, 'rb') as f:
+            raw_data = f.read()
+        self.state = MatcherState(
+            json.loads(raw_data), dataset_version(raw_data)
+        )
+        self.index_path = index_path
         self.preprocessor = Preprocessor()
-        self.vectorizer = None
         self.citation_sorter = CitationSorter()
+
+    @property
+    def data(self) -> list[dict[str, Any]]:
+        return self.state.data
+
+    @property
+    def dataset_version(self) -> str:
+        return self.state.dataset_version
+
+    @property
+    def entry_index(self) -> dict[int, int]:
+        return self.state.entry_index
+
+    @property
+    def vectorizer(self) -> Any:
+        return self.state.vectorizer
+
+    @property
+    def scorer(self) -> Any:
+        return self.state.scorer
     
     @abstractmethod
     def get_matches(
@@ -50,6 +164,167 @@ class Matcher(ABC):
         """
         pass
 
+    async def aget_matches(
+            self, query: str = '',
+            N: int = NUM_MATCHES,
+            sort_by: SortMetric = None,
+            sort_reverse: bool = True
+        ) -> list[dict[str, Any]]:
+        """
+        Get matches for a given query from an event loop.
+        
+        The default runs `get_matches` on the shared match pool so
+        CPU-bound strategies do not block the loop; strategies backed
+        by a remote service override this with a native coroutine.
+        
+        Args:
+            query: Search query string
+            N: Number of matches to return
+            sort_by: Metric to sort results by
+            sort_reverse: Whether to sort in descending order
+            
+        Returns:
+            List of matched professor entries
+        """
+        return await run_in_pool(
+            self.get_matches,
+            query=query, N=N, sort_by=sort_by, sort_reverse=sort_reverse
+        )
+
+    def get_matches_many(
+            self, queries: list[str],
+            N: int = NUM_MATCHES,
+            sort_by: SortMetric = None,
+            sort_reverse: bool = True
+        ) -> list[list[dict[str, Any]]]:
+        """
+        Get matches for several queries.
+        
+        Strategies that can score queries together override this; the
+        default simply runs each query through `get_matches`.
+        
+        Args:
+            queries: Search query strings
+            N: Number of matches to return per query
+            sort_by: Metric to sort results by
+            sort_reverse: Whether to sort in descending order
+            
+        Returns:
+            List of matched professor entries for each query
+        """
+        return [
+            self.get_matches(
+                query=query, N=N, sort_by=sort_by, sort_reverse=sort_reverse
+            ) for query in queries
+        ]
+
+    def save_index(self, index_path: str = INDEX_PATH):
+        """
+        Persist the fitted model and entry index to disk.
+        
+        Args:
+            index_path: Root index directory
+        """
+        state = self.state
+        if self.index_name is None or state.scorer is None:
+            raise NotImplementedError(
+                f'{type(self).__name__} has no index to save.'
+            )
+        index_dir = create_index_dir(index_path, self.index_name)
+        if state.vectorizer is not None:
+            state.vectorizer.save(index_dir)
+        state.scorer.save(index_dir)
+        register_index_dir(
+            index_path, self.index_name, state.dataset_version, len(state.data),
+            index_dir
+        )
+
+    def apply_delta(self, delta: dict[str, Any]):
+        """
+        Update the matcher to a refreshed dataset without refitting.
+        
+        Only new and changed entries are vectorized, with the current
+        model (terms unknown to it are ignored until the next full build).
+        The new state is built aside and swapped in with one assignment,
+        so queries in flight keep using the state they started with.
+        Saved index artifacts are not updated.
+        
+        Args:
+            delta: Delta from `matching.dataset.compute_delta`
+        
+        Raises:
+            ValueError: If the delta does not start from this matcher's
+                dataset version
+        """
+        state = self.state
+        if delta['base_version'] != state.dataset_version:
+            raise ValueError(
+                f"Delta applies to dataset {delta['base_version']}, "
+                f'matcher holds {state.dataset_version}'
+            )
+        data, sources = apply_delta(state.data, delta)
+        changed = [entry for entry, source in zip(data, sources) if source < 0]
+        update = self._update_index(state, data, sources, changed)
+        self.state = state.replace(
+            data=data, dataset_version=delta['version'], **update
+        )
+
+    def _update_index(
+            self, state: MatcherState, data: list[dict[str, Any]],
+            sources: list[int], changed: list[dict[str, Any]]
+        ) -> dict[str, Any]:
+        """
+        Rebuild the strategy's query structures for a changed dataset.
+        
+        Args:
+            state: Current state
+            data: Entries of the new dataset
+            sources: For each new entry, its current position, or -1
+            changed: New and changed entries, in order
+            
+        Returns:
+            `MatcherState` field name -> updated value
+        """
+        return {}
+
+    def _open_index(self, index_name: str | None = None) -> str | None:
+        """
+        Locate saved artifacts for this strategy.
+        
+        Args:
+            index_name: Strategy whose artifacts to locate (defaults to
+                this matcher's own)
+        
+        Returns:
+            Artifact directory, or None if the model has to be fit
+        """
+        index_name = index_name or self.index_name
+        if self.index_path is None or index_name is None:
+            return None
+        return open_index_dir(
+            self.index_path, index_name, self.dataset_version
+        )
+
+    def _tfidf_model(self) -> tuple[TFIDFVectorizer, CosineScorer]:
+        """
+        Load the TF-IDF vectorizer and scorer from the index, or fit
+        them on the research areas of every entry.
+        
+        Returns:
+            Vectorizer and scorer
+        """
+        index_dir = self._open_index('tfidf')
+        if index_dir is not None:
+            return (
+                TFIDFVectorizer.load(index_dir), CosineScorer.load(index_dir)
+            )
+
+        corpus = ([
+            self._get_research_areas_text(entry) for entry in self.data
+        ])
+        vectorizer = TFIDFVectorizer(corpus)
+        return vectorizer, CosineScorer(vectorizer.vectorize_many(corpus))
+
     def _get_research_areas_text(
             self, entry: dict[str, Any]
         ) -> str:
@@ -80,20 +355,23 @@ class Matcher(ABC):
         )
     
     def _format_researcher_list_for_prompt(
-            self, max_entries: int = PROMPT_RESEARCHER_LIMIT
+            self, max_entries: int = PROMPT_RESEARCHER_LIMIT,
+            entries: list[dict[str, Any]] | None = None
         ) -> str:
         """
         Formats a subset of researcher data for the LLM prompt.
         
         Args:
             max_entries: Maximum number of entries to include
+            entries: Entries to format (defaults to the whole dataset)
             
         Returns:
             Formatted string of researcher data
         """
         formatted_list = []
+        entries = self.data if entries is None else entries
         
-        entries_to_format = self.data[:max_entries]
+        entries_to_format = entries[:max_entries]
         for i, entry in enumerate(entries_to_format):
             name = entry.get('name', f'Researcher {i+1}')
             areas = self._get_research_areas_text(entry)
@@ -102,9 +380,9 @@ class Matcher(ABC):
             else:
                 formatted_list.append(f'- {name}: (No listed research areas)')
         
-        if len(self.data) > max_entries:
+        if len(entries) > max_entries:
             formatted_list.append(
-                f'\n... and {len(self.data) - max_entries} more researchers.'
+                f'\n... and {len(entries) - max_entries} more researchers.'
             )
         
         return '\n'.join(formatted_list)
@@ -114,19 +392,23 @@ class TFIDFMatcher(Matcher):
     """
     Matcher implementation using TF-IDF vectorization.
     """
+    index_name = 'tfidf'
+
     def __init__(
-            self, data_path: str = DATA_PATH
+            self, data_path: str = DATA_PATH,
+            index_path: str | None = None
         ):
-        super().__init__(data_path)
-        corpus = ([
-            self._get_research_areas_text(entry) for entry in self.data
-        ])
-        self.vectorizer = TFIDFVectorizer(corpus)
-        self.entry_vectors = {
-            i: self.vectorizer.vectorize(
-                self._get_research_areas_text(entry)
-            ) for i, entry in enumerate(self.data)
-        }
+        super().__init__(data_path, index_path)
+        vectorizer, scorer = self._tfidf_model()
+        self.state = self.state.replace(vectorizer=vectorizer, scorer=scorer)
+    
+    def _update_index(
+            self, state: MatcherState, data: list[dict[str, Any]],
+            sources: list[int], changed: list[dict[str, Any]]
+        ) -> dict[str, Any]:
+        texts = [self._get_research_areas_text(entry) for entry in changed]
+        new_rows = state.vectorizer.vectorize_many(texts) if texts else None
+        return {'scorer': state.scorer.updated(sources, new_rows)}
     
     @monitor_matching('TF-IDF')
     def get_matches(
@@ -147,46 +429,103 @@ class TFIDFMatcher(Matcher):
         Returns:
             List of matched professor entries
         """
+        state = self.state
         if not query:
-            return self.data[:N]
+            return state.data[:N]
         else:
-            query_vector = self.vectorizer.vectorize(query)
-            similarities = []
-            for i, entry_vector in self.entry_vectors.items():
-                if np.any(entry_vector):
-                    similarity = np.dot(query_vector, entry_vector) / (
-                        np.linalg.norm(query_vector) * np.linalg.norm(entry_vector)
-                    )
-                    similarities.append((i, similarity))
-            
-            similarities.sort(key=lambda x: x[1], reverse=True)
-            top_indices = [i for i, _ in similarities[:N]]
-            matches = [self.data[i] for i in top_indices]
+            with span('vectorize'):
+                query_vector = state.vectorizer.vectorize_many([query])
+            with span('score'):
+                top_matches = state.scorer.top_n(query_vector, N)
+            matches = [state.data[i] for i, _ in top_matches]
         
         if sort_by is not None:
-            matches = self.citation_sorter.sort_entries(
-                matches, sort_by, sort_reverse
-            )
+            with span('sort'):
+                matches = self.citation_sorter.sort_entries(
+                    matches, sort_by, sort_reverse
+                )
         
         return matches
 
+    @monitor_batch_matching('TF-IDF')
+    def get_matches_many(
+            self, queries: list[str],
+            N: int = NUM_MATCHES,
+            sort_by: SortMetric = None,
+            sort_reverse: bool = True
+        ) -> list[list[dict[str, Any]]]:
+        """
+        Get matches for several queries using TF-IDF similarity.
+        
+        All non-empty queries are vectorized together and scored against
+        the entry matrix with a single matrix-matrix product.
+        
+        Args:
+            queries: Search query strings
+            N: Number of matches to return per query
+            sort_by: Metric to sort results by
+            sort_reverse: Whether to sort in descending order
+            
+        Returns:
+            List of matched professor entries for each query
+        """
+        state = self.state
+        results = [state.data[:N] for _ in queries]
+        scored = [i for i, query in enumerate(queries) if query]
+        if not scored:
+            return results
+
+        with span('vectorize'):
+            query_matrix = state.vectorizer.vectorize_many(
+                [queries[i] for i in scored]
+            )
+        with span('score'):
+            top_matches_many = state.scorer.top_n_many(query_matrix, N)
+        for i, top_matches in zip(scored, top_matches_many):
+            matches = [state.data[j] for j, _ in top_matches]
+            if sort_by is not None:
+                with span('sort'):
+                    matches = self.citation_sorter.sort_entries(
+                        matches, sort_by, sort_reverse
+                    )
+            results[i] = matches
+        
+        return results
+
 
 class Word2VecMatcher(Matcher):
     """
     Matcher implementation using Word2Vec embeddings.
     """
+    index_name = 'word2vec'
+
     def __init__(
-            self, data_path: str = DATA_PATH
+            self, data_path: str = DATA_PATH,
+            index_path: str | None = None
         ):
-        super().__init__(data_path)
+        super().__init__(data_path, index_path)
+        index_dir = self._open_index()
+        if index_dir is not None:
+            self.state = self.state.replace(
+                vectorizer=Word2VecVectorizer.load(index_dir),
+                scorer=CosineScorer.load(index_dir),
+            )
+            return
+
         corpus = ([
             self._get_research_areas_text(entry) for entry in self.data
         ])
-        self.vectorizer = Word2VecVectorizer(corpus)
-        self.entry_vectors = {
-            i: self.vectorizer.vectorize(self._get_research_areas_text(entry))
-            for i, entry in enumerate(self.data)
-        }
+        vectorizer = Word2VecVectorizer(corpus)
+        scorer = CosineScorer(vectorizer.vectorize_many(corpus), epsilon=1e-3)
+        self.state = self.state.replace(vectorizer=vectorizer, scorer=scorer)
+    
+    def _update_index(
+            self, state: MatcherState, data: list[dict[str, Any]],
+            sources: list[int], changed: list[dict[str, Any]]
+        ) -> dict[str, Any]:
+        texts = [self._get_research_areas_text(entry) for entry in changed]
+        new_rows = state.vectorizer.vectorize_many(texts) if texts else None
+        return {'scorer': state.scorer.updated(sources, new_rows)}
     
     @monitor_matching('Word2Vec')
     def get_matches(
@@ -207,45 +546,102 @@ class Word2VecMatcher(Matcher):
         Returns:
             List of matched professor entries
         """
+        state = self.state
         if not query:
-            return self.data[:N]
+            return state.data[:N]
         else:
-            query_vector = self.vectorizer.vectorize(query)
-            similarities = []
-            for i, entry_vector in self.entry_vectors.items():
-                if np.any(entry_vector):
-                    similarity = np.dot(query_vector, entry_vector) / (
-                        (np.linalg.norm(query_vector) * np.linalg.norm(entry_vector))
-                        + 1e-3
-                    )
-                    similarities.append((i, similarity))
-            
-            similarities.sort(key=lambda x: x[1], reverse=True)
-            top_indices = [i for i, _ in similarities[:N]]
-            matches = [self.data[i] for i in top_indices]
+            with span('vectorize'):
+                query_vector = state.vectorizer.vectorize(query)
+            with span('score'):
+                top_matches = state.scorer.top_n(query_vector, N)
+            matches = [state.data[i] for i, _ in top_matches]
         
         if sort_by is not None:
-            matches = self.citation_sorter.sort_entries(
-                matches, sort_by, sort_reverse
-            )
+            with span('sort'):
+                matches = self.citation_sorter.sort_entries(
+                    matches, sort_by, sort_reverse
+                )
         
         return matches
 
+    @monitor_batch_matching('Word2Vec')
+    def get_matches_many(
+            self, queries: list[str],
+            N: int = NUM_MATCHES,
+            sort_by: SortMetric = None,
+            sort_reverse: bool = True
+        ) -> list[list[dict[str, Any]]]:
+        """
+        Get matches for several queries using Word2Vec similarity.
+        
+        All non-empty queries are vectorized together and scored against
+        the entry matrix with a single matrix-matrix product.
+        
+        Args:
+            queries: Search query strings
+            N: Number of matches to return per query
+            sort_by: Metric to sort results by
+            sort_reverse: Whether to sort in descending order
+            
+        Returns:
+            List of matched professor entries for each query
+        """
+        state = self.state
+        results = [state.data[:N] for _ in queries]
+        scored = [i for i, query in enumerate(queries) if query]
+        if not scored:
+            return results
+
+        with span('vectorize'):
+            query_matrix = state.vectorizer.vectorize_many(
+                [queries[i] for i in scored]
+            )
+        with span('score'):
+            top_matches_many = state.scorer.top_n_many(query_matrix, N)
+        for i, top_matches in zip(scored, top_matches_many):
+            matches = [state.data[j] for j, _ in top_matches]
+            if sort_by is not None:
+                with span('sort'):
+                    matches = self.citation_sorter.sort_entries(
+                        matches, sort_by, sort_reverse
+                    )
+            results[i] = matches
+        
+        return results
+
 
 class KeywordMatcher(Matcher):
     """
     Matcher implementation using keyword matching.
     """
+    index_name = 'keyword'
+
     def __init__(
-            self, data_path: str = DATA_PATH
+            self, data_path: str = DATA_PATH,
+            index_path: str | None = None
         ):
-        super().__init__(data_path)
+        super().__init__(data_path, index_path)
+        index_dir = self._open_index()
+        if index_dir is not None:
+            self.state = self.state.replace(scorer=OverlapScorer.load(index_dir))
+            return
         
-        self.entry_keywords = {}
-        for i, entry in enumerate(self.data):
+        entry_keywords = []
+        for entry in self.data:
             text = self._get_research_areas_text(entry)
             processed_text = self.preprocessor.preprocess(text)
-            self.entry_keywords[i] = set(processed_text)
+            entry_keywords.append(set(processed_text))
+        self.state = self.state.replace(scorer=OverlapScorer(entry_keywords))
+
+    def _update_index(
+            self, state: MatcherState, data: list[dict[str, Any]],
+            sources: list[int], changed: list[dict[str, Any]]
+        ) -> dict[str, Any]:
+        new_keywords = [
+            set(self.preprocessor.preprocess(self._get_research_areas_text(entry)))
+            for entry in changed
+        ]
+        return {'scorer': state.scorer.updated(sources, new_keywords)}
 
     @monitor_matching('KeywordMatch')
     def get_matches(
@@ -267,6 +663,7 @@ class KeywordMatcher(Matcher):
         Returns:
             List of matched professor entries
         """
+        state = self.state
         if isinstance(query, list):
             query_text = ' '.join(query)
         else:
@@ -275,50 +672,313 @@ class KeywordMatcher(Matcher):
         if not query_text:
             if sort_by is not None:
                 return self.citation_sorter.sort_entries(
-                    self.data, sort_by, sort_reverse
+                    state.data, sort_by, sort_reverse
                 )[:N]
             else:
-                return self.data[:N]
+                return state.data[:N]
 
-        processed_query = self.preprocessor.preprocess(query_text)
+        with span('preprocess'):
+            processed_query = self.preprocessor.preprocess(query_text)
         query_keywords = set(processed_query)
 
         if not query_keywords:
             return []
 
-        scores = []
-        for i, entry_keyword_set in self.entry_keywords.items():
-            overlap = len(
-                query_keywords.intersection(entry_keyword_set)
-            )
-            if overlap > 0:
-                scores.append((i, overlap))
-        
-        scores.sort(key=lambda x: x[1], reverse=True)
-        
-        top_indices = [i for i, _ in scores[:N]]
-        matches = [self.data[i] for i in top_indices]
+        with span('score'):
+            top_matches = state.scorer.top_n(query_keywords, N)
+        matches = [state.data[i] for i, _ in top_matches]
         
         if sort_by is not None:
-            matches = self.citation_sorter.sort_entries(
-                matches, sort_by, sort_reverse
-            )
+            with span('sort'):
+                matches = self.citation_sorter.sort_entries(
+                    matches, sort_by, sort_reverse
+                )
         
         return matches
 
+    @monitor_batch_matching('KeywordMatch')
+    def get_matches_many(
+        self,
+        queries: list[str | list[str]],
+        N: int = NUM_MATCHES,
+        sort_by: SortMetric = None,
+        sort_reverse: bool = True
+    ) -> list[list[dict[str, Any]]]:
+        """
+        Get matches for several queries using keyword overlap.
+        
+        All queries with keywords are scored together with a single
+        sparse matrix-matrix product against the entry-term matrix.
+        
+        Args:
+            queries: Search query strings or lists of strings
+            N: Number of matches to return per query
+            sort_by: Metric to sort results by
+            sort_reverse: Whether to sort in descending order
+            
+        Returns:
+            List of matched professor entries for each query
+        """
+        state = self.state
+        results = []
+        scored, query_keywords = [], []
+        for i, query in enumerate(queries):
+            query_text = ' '.join(query) if isinstance(query, list) else query
+            if not query_text:
+                if sort_by is not None:
+                    results.append(self.citation_sorter.sort_entries(
+                        state.data, sort_by, sort_reverse
+                    )[:N])
+                else:
+                    results.append(state.data[:N])
+                continue
+            results.append([])
+            with span('preprocess'):
+                keywords = set(self.preprocessor.preprocess(query_text))
+            if keywords:
+                scored.append(i)
+                query_keywords.append(keywords)
+
+        with span('score'):
+            top_matches_many = state.scorer.top_n_many(query_keywords, N)
+        for i, top_matches in zip(scored, top_matches_many):
+            matches = [state.data[j] for j, _ in top_matches]
+            if sort_by is not None:
+                with span('sort'):
+                    matches = self.citation_sorter.sort_entries(
+                        matches, sort_by, sort_reverse
+                    )
+            results[i] = matches
+        
+        return results
+
 
 class DeepseekMatcher(Matcher):
     """
     Matcher implementation using DeepSeek LLM.
+    
+    Matching is retrieve-then-rerank: TF-IDF retrieves the top
+    `candidates` entries for the query from the whole dataset and only
+    those are sent to the LLM to rerank. Completions are cached on disk
+    by prompt fingerprint, so repeated queries, other N values and other
+    sort orders reuse one completion.
+    
+    Completions come from a provider (see `matching/providers.py`), the
+    DeepSeek API unless configured otherwise. `get_matches` blocks on
+    the provider; `aget_matches` awaits it, bounded by the provider's
+    concurrency limit and timeout, and coalesces identical in-flight
+    queries.
+    
+    Args:
+        data_path: Dataset JSON file
+        index_path: Root index directory; the TF-IDF index is reused for
+            retrieval when present
+        candidates: Entries retrieved for the LLM to rerank (at least N)
+        cache_path: SQLite file caching completions by prompt
+            fingerprint (None disables the cache)
+        provider: Completion provider (defaults to the shared
+            'deepseek' provider; None offline)
     """
+    provider_name: str = 'deepseek'
+    model: str = 'deepseek-chat'
+
     def __init__(
-            self, data_path: str = DATA_PATH
+            self, data_path: str = DATA_PATH,
+            index_path: str | None = None,
+            candidates: int = RERANK_CANDIDATES,
+            cache_path: str | None = LLM_CACHE_PATH,
+            provider: 'ChatProvider | None' = None
         ):
-        super().__init__(data_path)
-        self.client = OpenAI(
-            api_key=os.environ.get('DEEPSEEK_API_KEY'),
-            base_url='https://api.deepseek.com'
+        super().__init__(data_path, index_path)
+        self.candidates = candidates
+        self.completion_cache = (
+            CompletionCache(cache_path) if cache_path else None
+        )
+        # the state's vectorizer and scorer are the TF-IDF retriever
+        vectorizer, scorer = self._tfidf_model()
+        self.state = self.state.replace(
+            vectorizer=vectorizer, scorer=scorer,
+            name_index=self._build_name_index(self.data),
+        )
+        self._inflight = None
+        if provider is None:
+            from matching.providers import get_provider
+
+            provider = get_provider(self.provider_name)
+        self.provider = provider
+        if self.provider is None:
+            print('Offline mode enabled. DeepseekMatcher only serves cached completions.')
+
+    def _update_index(
+            self, state: MatcherState, data: list[dict[str, Any]],
+            sources: list[int], changed: list[dict[str, Any]]
+        ) -> dict[str, Any]:
+        texts = [self._get_research_areas_text(entry) for entry in changed]
+        new_rows = state.vectorizer.vectorize_many(texts) if texts else None
+        return {
+            'scorer': state.scorer.updated(sources, new_rows),
+            'name_index': self._build_name_index(data),
+        }
+
+    @staticmethod
+    def _normalize_name(name: str | None) -> str:
+        return ' '.join(str(name or '').split()).casefold()
+
+    @classmethod
+    def _build_name_index(
+            cls, data: list[dict[str, Any]]
+        ) -> dict[str, dict[str, Any]]:
+        # normalized name -> entry; later duplicates win
+        return {
+            cls._normalize_name(entry.get('name')): entry
+            for entry in data if entry.get('name')
+        }
+
+    def _retrieve(
+            self, state: MatcherState, query: str, N: int
+        ) -> list[dict[str, Any]]:
+        """
+        Retrieve the candidate entries the LLM reranks.
+        
+        Args:
+            state: Matcher state to retrieve from
+            query: Search query string
+            N: Number of matches that will be asked for
+            
+        Returns:
+            Up to max(candidates, N) entries, most similar first
+        """
+        with span('retrieve'):
+            query_vector = state.vectorizer.vectorize_many([query])
+            top_matches = state.scorer.top_n(
+                query_vector, max(self.candidates, N)
+            )
+        return [state.data[i] for i, _ in top_matches]
+
+    def _build_request(
+            self, state: MatcherState, query: str, N: int
+        ) -> dict[str, Any]:
+        """
+        Build the completion request asking the LLM to rank the
+        candidates retrieved for a query.
+        
+        The ranking covers every candidate, so one completion serves
+        any N up to the number of candidates and any sort order.
+        
+        Args:
+            state: Matcher state to retrieve candidates from
+            query: Search query string
+            N: Number of matches that will be kept
+            
+        Returns:
+            Dictionary with the chat 'messages', 'max_tokens' and the
+            completion 'fingerprint'
+        """
+        candidates = self._retrieve(state, query, N)
+        with span('prompt'):
+            researcher_context = self._format_researcher_list_for_prompt(
+                max_entries=len(candidates), entries=candidates
+            )
+
+        prompt = (
+            f'Here is a list of researchers and their research areas:\n\n'
+            f'{researcher_context}\n\n'
+            f'Based ONLY on this provided list rank the researchers by how relevant '
+            f'their research areas are to the following query: "{query}".\n\n'
+            f'List only names, most relevant first, separated by commas.'
         )
+        max_tokens = max(MAX_TOKENS, RANK_TOKENS_PER_NAME * len(candidates))
+        return {
+            'messages': [
+                {
+                    'role': 'system',
+                    'content': 'You are an AI assistant helping match researchers to queries based on their research areas.'
+                },
+                {
+                    'role': 'user',
+                    'content': prompt
+                }
+            ],
+            'max_tokens': max_tokens,
+            'fingerprint': prompt_fingerprint(
+                self.model, TEMPERATURE, max_tokens, researcher_context, query
+            ),
+        }
+
+    def _cached_completion(self, request: dict[str, Any]) -> str | None:
+        if self.completion_cache is None:
+            return None
+        with span('llm_cache'):
+            return self.completion_cache.get(request['fingerprint'])
+
+    def _cache_completion(self, request: dict[str, Any], content: str):
+        # empty answers are not worth keeping
+        if self.completion_cache is not None and content and content.strip():
+            self.completion_cache.set(request['fingerprint'], self.model, content)
+
+    def _complete(self, request: dict[str, Any]) -> str | None:
+        """
+        Get the completion for a request from the cache or the API.
+        
+        Args:
+            request: Request built by `_build_request`
+            
+        Returns:
+            Completion text, or None when it is not cached and no
+            provider is configured
+        """
+        content = self._cached_completion(request)
+        if content is not None:
+            return content
+        if self.provider is None:
+            return None
+        with span('llm'):
+            content = self.provider.complete(
+                request['messages'],
+                model=self.model,
+                max_tokens=request['max_tokens'],
+                temperature=TEMPERATURE,
+            )
+        self._cache_completion(request, content)
+        return content
+
+    def _parse_names(
+            self, state: MatcherState, content: str, query: str, N: int
+        ) -> list[dict[str, Any]]:
+        """
+        Map the names in an LLM response to dataset entries.
+        
+        Args:
+            state: Matcher state the candidates came from
+            content: Response text
+            query: Search query string
+            N: Number of matches asked for
+            
+        Returns:
+            Matched professor entries in response order
+        """
+        matched_names = ([
+            name.strip() for name in content.split(',') if name.strip()
+        ])
+        
+        if not matched_names:
+            print(
+                f'DeepseekMatcher: LLM did not return any names for query "{query}".'
+            )
+            record_error('DeepseekLLM', 'empty_response')
+            return []
+
+        matches = []
+        for name in matched_names:
+            entry = state.name_index.get(self._normalize_name(name))
+            if entry is not None:
+                matches.append(entry)
+        
+        if len(matches) < N and len(matches) < len(state.data):
+            print(
+                f'Found only {len(matches)}/{N} requested researchers matching LLM output.'
+            )
+        return matches
 
     @monitor_matching('DeepseekLLM')
     def get_matches(
@@ -343,69 +1003,128 @@ class DeepseekMatcher(Matcher):
         if not query:
             print('DeepseekMatcher requires a query.')
             return []
-        if not self.client:
-            print('Deepseek client not initialized. Cannot get matches.')
-            return []
 
-        researcher_context = self._format_researcher_list_for_prompt(
-            max_entries=PROMPT_RESEARCHER_LIMIT
-        )
-
-        prompt = (
-            f'Here is a list of researchers and their research areas:\n\n'
-            f'{researcher_context}\n\n'
-            f'Based ONLY on this provided list identify names of top {N} researchers '
-            f'whose research areas are most relevant to the following query: "{query}".\n\n'
-            f'List only names separated by commas.'
-        )
+        state = self.state
+        request = self._build_request(state, query, N)
 
         try:
-            response = self.client.chat.completions.create(
-                model='deepseek-chat',
-                messages=[
-                    {
-                        'role': 'system',
-                        'content': 'You are an AI assistant helping match researchers to queries based on their research areas.'
-                    },
-                    {
-                        'role': 'user',
-                        'content': prompt
-                    }
-                ],
-                max_tokens=MAX_TOKENS,
-                temperature=TEMPERATURE,
-            )
-            
-            content = response.choices[0].message.content
-            matched_names = ([
-                name.strip() for name in content.split(',') if name.strip()
-            ])
-            
-            if not matched_names:
-                print(
-                    f'DeepseekMatcher: LLM did not return any names for query "{query}".'
-                )
+            content = self._complete(request)
+            if content is None:
+                print('No Deepseek provider configured. Cannot get matches.')
+                record_error('DeepseekLLM', 'client_unavailable')
                 return []
+            matches = self._parse_names(state, content, query, N)
+
+        except Exception as e:
+            print(f'Error calling Deepseek API or parsing response: {e}')
+            record_error('DeepseekLLM', 'llm')
+            return []
+
+        return self._finish_matches(matches, N, sort_by, sort_reverse)
 
-            name_to_entry = {
-                entry.get('name'): entry for entry in self.data
-            }
-            matches = ([
-                name_to_entry[name] for name in matched_names if name in name_to_entry
-            ])
+    def _finish_matches(
+            self, matches: list[dict[str, Any]],
+            N: int,
+            sort_by: SortMetric,
+            sort_reverse: bool
+        ) -> list[dict[str, Any]]:
+        """
+        Keep the N best ranked matches and apply the requested sort.
+        
+        Args:
+            matches: Matches in LLM rank order
+            N: Number of matches to return
+            sort_by: Metric to sort results by
+            sort_reverse: Whether to sort in descending order
             
-            if len(matches) < N and len(matches) < len(self.data):
-                print(
-                    f'Found only {len(matches)}/{N} requested researchers matching LLM output.'
+        Returns:
+            List of matched professor entries
+        """
+        matches = matches[:N]
+        if sort_by is not None:
+            with span('sort'):
+                matches = self.citation_sorter.sort_entries(
+                    matches, sort_by, sort_reverse
                 )
+        return matches
+
+    @monitor_matching('DeepseekLLM')
+    async def aget_matches(
+        self,
+        query: str = '',
+        N: int = NUM_MATCHES,
+        sort_by: SortMetric = None,
+        sort_reverse: bool = True
+    ) -> list[dict[str, Any]]:
+        """
+        Get matches using DeepSeek LLM without blocking the event loop.
+        
+        Args:
+            query: Search query string
+            N: Number of matches to return
+            sort_by: Metric to sort results by
+            sort_reverse: Whether to sort in descending order
+            
+        Returns:
+            List of matched professor entries
+        """
+        if not query:
+            print('DeepseekMatcher requires a query.')
+            return []
+        if self._inflight is None:
+            self._inflight = InflightRequests()
+
+        state = self.state
+        # retrieval and prompt formatting are CPU-bound; to_thread keeps
+        # the span context of the request
+        request = await asyncio.to_thread(self._build_request, state, query, N)
 
+        try:
+            # concurrent callers sharing a fingerprint share one completion
+            content = await self._inflight.run(
+                request['fingerprint'], lambda: self._acomplete(request)
+            )
+            if content is None:
+                print('No Deepseek provider configured. Cannot get matches.')
+                record_error('DeepseekLLM', 'client_unavailable')
+                return []
+            matches = self._parse_names(state, content, query, N)
+        except asyncio.TimeoutError:
+            print(f'Deepseek API timed out for query "{query[:30]}..."')
+            record_error('DeepseekLLM', 'timeout')
+            return []
         except Exception as e:
             print(f'Error calling Deepseek API or parsing response: {e}')
+            record_error('DeepseekLLM', 'llm')
             return []
 
-        if sort_by is not None:
-            matches = self.citation_sorter.sort_entries(
-                matches, sort_by, sort_reverse
-            )
+        return self._finish_matches(matches, N, sort_by, sort_reverse)
 
-        return matches[:N]
+    async def _acomplete(self, request: dict[str, Any]) -> str | None:
+        """
+        Get the completion for a request from the cache or, under the
+        provider's concurrency limit, the API.
+        
+        Args:
+            request: Request built by `_build_request`
+            
+        Returns:
+            Completion text, or None when it is not cached and no
+            provider is configured
+        """
+        if self.completion_cache is not None:
+            content = await asyncio.to_thread(self._cached_completion, request)
+            if content is not None:
+                return content
+        if self.provider is None:
+            return None
+        with span('llm'):
+            content = await self.provider.acomplete(
+                request['messages'],
+                model=self.model,
+                max_tokens=request['max_tokens'],
+                temperature=TEMPERATURE,
+            )
+        if self.completion_cache is not None:
+            await asyncio.to_thread(self._cache_completion, request, content)
+        return content
@@ -1,40 +1,162 @@
 import re
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
+import threading
+from functools import lru_cache
 
-# download NLTK utils
-nltk.download('punkt')
-nltk.download('punkt_tab')
-nltk.download('stopwords')
+from matching import OFFLINE
+
+
+# NLTK resource name -> path checked before downloading
+NLTK_RESOURCES: dict[str, str] = {
+    'punkt': 'tokenizers/punkt',
+    'punkt_tab': 'tokenizers/punkt_tab',
+    'stopwords': 'corpora/stopwords',
+}
+PREPROCESS_CACHE_SIZE: int = 4096
+NON_WORD_PATTERN = re.compile(r'[^\w\s]')
+# words NLTK's Treebank tokenizer splits even without punctuation
+TREEBANK_SPLITS: dict[str, tuple[str, ...]] = {
+    'cannot': ('can', 'not'),
+    'gimme': ('gim', 'me'),
+    'gonna': ('gon', 'na'),
+    'gotta': ('got', 'ta'),
+    'lemme': ('lem', 'me'),
+    'wanna': ('wan', 'na'),
+}
+_nltk_lock = threading.Lock()
+_nltk_checked = set()
+
+
+def ensure_nltk_resources(
+        resources: tuple[str, ...] = tuple(NLTK_RESOURCES),
+        offline: bool = OFFLINE
+    ):
+    """
+    Make sure the given NLTK data is installed.
+
+    Each resource is checked once per process. Resources already present
+    locally are never downloaded again; in offline mode missing resources
+    are only reported.
+
+    Args:
+        resources: Names of the NLTK resources needed
+        offline: Never touch the network
+    """
+    if _nltk_checked.issuperset(resources):
+        return
+    with _nltk_lock:
+        import nltk
+
+        for resource in resources:
+            if resource in _nltk_checked:
+                continue
+            try:
+                nltk.data.find(NLTK_RESOURCES[resource])
+            except LookupError:
+                if offline:
+                    print(
+                        f'Warning: NLTK resource "{resource}" is missing and offline mode is enabled.'
+                    )
+                else:
+                    nltk.download(resource)
+            _nltk_checked.add(resource)
 
 
 class Preprocessor:
     """
     Text preprocessing utility for cleaning and tokenizing research area text.
+
+    Args:
+        tokenizer: 'fast' splits the cleaned text with a precompiled
+            pattern and reproduces the NLTK output exactly (cleaned text
+            holds no punctuation, so only a few Treebank word splits
+            apply); 'nltk' runs `nltk.word_tokenize`
+        cache_size: Number of preprocessed texts kept in the LRU cache
+            (0 disables caching)
     """
-    def __init__(self):
-        self.stop_words = set(stopwords.words('english'))
-        
+    def __init__(
+            self,
+            tokenizer: str = 'fast',
+            cache_size: int = PREPROCESS_CACHE_SIZE
+        ):
+        if tokenizer not in ('fast', 'nltk'):
+            raise ValueError(f'Unknown tokenizer: {tokenizer}')
+        self.tokenizer = tokenizer
+
+        if tokenizer == 'nltk':
+            ensure_nltk_resources()
+            from nltk.tokenize import word_tokenize
+            self.tokenize = word_tokenize
+        else:
+            ensure_nltk_resources(('stopwords',))
+            self.tokenize = self._fast_tokenize
+        from nltk.corpus import stopwords
+
+        self.stop_words = frozenset(stopwords.words('english'))
+        self._cached_preprocess = lru_cache(maxsize=cache_size)(
+            self._preprocess
+        )
+
+    def _fast_tokenize(self, text: str) -> list[str]:
+        """
+        Tokenize punctuation-free text like NLTK's Treebank tokenizer.
+
+        Args:
+            text: Lowercased text without punctuation
+
+        Returns:
+            List of tokens
+        """
+        tokens = []
+        for token in text.split():
+            split = TREEBANK_SPLITS.get(token)
+            if split is None:
+                tokens.append(token)
+            else:
+                tokens.extend(split)
+        return tokens
+
+    def _preprocess(self, text: str) -> tuple[str, ...]:
+        # raw -> lowercase -> alpha-numerical
+        text = NON_WORD_PATTERN.sub('', text.lower())
+        # tokenize
+        tokens = self.tokenize(text)
+        # remove stopwords and short tokens
+        return tuple(
+            token for token in tokens
+            if token not in self.stop_words and len(token) > 2
+        )
+
     def preprocess(self, text: str) -> list[str]:
         """
         Preprocess text by tokenizing, removing stopwords, and cleaning.
-        
+
         Args:
             text: Input text to preprocess
-            
+
         Returns:
             List of cleaned and tokenized words
         """
         if not text:
             return []
-        # raw -> lowercase -> alpha-numerical
-        text = re.sub(r'[^\w\s]', '', text.lower())
-        # tokenize
-        tokens = word_tokenize(text)
-        # remove stopwords and short tokens
-        tokens = ([
-            token for token in tokens 
-            if token not in self.stop_words and len(token) > 2
-        ])
-        return tokens
\ No newline at end of file
+        return list(self._cached_preprocess(text))
+
+    def cache_info(self) -> dict[str, int]:
+        """
+        Get preprocessing cache statistics.
+
+        Returns:
+            Dictionary with cache hits, misses, current size and capacity
+        """
+        info = self._cached_preprocess.cache_info()
+        return {
+            'hits': info.hits,
+            'misses': info.misses,
+            'size': info.currsize,
+            'max_size': info.maxsize,
+        }
+
+    def cache_clear(self):
+        """
+        Empty the preprocessing cache and reset its counters.
+        """
+        self._cached_preprocess.cache_clear()
@@ -0,0 +1,544 @@
+"""
+Chat completion providers for LLM-backed strategies and scripts.
+
+A provider hides where completions come from: an OpenAI-compatible API
+(DeepSeek, OpenAI, a local Ollama server, or the stand-in server in
+`matching/standin.py`), or recorded completions replayed in-process.
+Every provider offers a blocking `complete` and an async `acomplete`
+that is bounded by the provider's concurrency limit and a timeout.
+
+Providers are configured from the environment:
+
+- `<NAME>_BASE_URL` points a provider ('deepseek', 'openai', 'ollama' or
+  'perplexity') at another endpoint, e.g.
+  `DEEPSEEK_BASE_URL=http://127.0.0.1:8089/v1` for the stand-in server
+- `<NAME>_MAX_CONCURRENCY` bounds the provider's async completions in
+  flight
+- `<NAME>_MAX_RETRIES` lets the API client retry failed requests
+  (`LLM_MAX_RETRIES`, default 0: failures and timeouts reach the caller,
+  and a hanging request takes one timeout, not one per attempt)
+- `LLM_REPLAY_PATH` replaces every provider with one replaying the
+  recorded completions in that JSONL file, shaped by `LLM_REPLAY_LATENCY`
+  (see `LatencyModel.parse`), `LLM_REPLAY_FAILURE_RATE`,
+  `LLM_REPLAY_TIMEOUT_RATE` and `LLM_REPLAY_SEED`
+"""
+
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+import threading
+from typing import Any
+from abc import ABC, abstractmethod
+
+from matching import OFFLINE
+from matching.concurrency import (
+    LLM_MAX_CONCURRENCY, LLM_TIMEOUT_SECONDS, provider_semaphore
+)
+
+
+# name -> (default base URL, API key environment variable, timeout,
+# default max concurrency)
+PROVIDER_ENDPOINTS: dict[str, tuple[str | None, str | None, float, int]] = {
+    'deepseek': (
+        'https://api.deepseek.com', 'DEEPSEEK_API_KEY',
+        LLM_TIMEOUT_SECONDS, LLM_MAX_CONCURRENCY
+    ),
+    'openai': (None, 'OPENAI_API_KEY', LLM_TIMEOUT_SECONDS, LLM_MAX_CONCURRENCY),
+    # local generation is slow on CPU-only machines and a single server
+    # only runs a few requests in parallel
+    'ollama': ('http://localhost:11434/v1', None, 300.0, 2),
+    # ground truth for llm_evals; the API allows about 50 requests a minute
+    'perplexity': (
+        'https://api.perplexity.ai', 'PPLX_API_KEY', LLM_TIMEOUT_SECONDS, 4
+    ),
+}
+LLM_MAX_RETRIES: int = int(os.environ.get('LLM_MAX_RETRIES', 0))
+LLM_REPLAY_PATH: str | None = os.environ.get('LLM_REPLAY_PATH') or None
+LLM_REPLAY_LATENCY: str = os.environ.get('LLM_REPLAY_LATENCY', 'fixed:0')
+LLM_REPLAY_FAILURE_RATE: float = float(
+    os.environ.get('LLM_REPLAY_FAILURE_RATE', 0.0)
+)
+LLM_REPLAY_TIMEOUT_RATE: float = float(
+    os.environ.get('LLM_REPLAY_TIMEOUT_RATE', 0.0)
+)
+LLM_REPLAY_SEED: int = int(os.environ.get('LLM_REPLAY_SEED', 0))
+# completion fields of recorded JSONL files, in order of preference
+COMPLETION_FIELDS: tuple[str, ...] = (
+    'completion', 'response', 'output', 'perplexity_raw'
+)
+CANDIDATE_LINE = re.compile(r'^- (.+?): ', re.MULTILINE)
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+class ProviderError(Exception):
+    """
+    Raised when a provider fails to produce a completion.
+    """
+
+
+class ChatProvider(ABC):
+    """
+    Source of chat completions.
+
+    Args:
+        name: Provider name, which also keys its concurrency limit
+        timeout: Seconds an async completion may take
+        max_concurrency: Async completions in flight at once
+    """
+    def __init__(
+            self,
+            name: str,
+            timeout: float = LLM_TIMEOUT_SECONDS,
+            max_concurrency: int = LLM_MAX_CONCURRENCY
+        ):
+        self.name = name
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+
+    @abstractmethod
+    def complete(
+            self,
+            messages: list[dict[str, str]],
+            model: str,
+            max_tokens: int | None = None,
+            temperature: float | None = None
+        ) -> str:
+        """
+        Get a completion, blocking until it arrives.
+
+        Args:
+            messages: Chat messages
+            model: Model name
+            max_tokens: Completion token limit
+            temperature: Sampling temperature
+
+        Returns:
+            Completion text
+        """
+        pass
+
+    @abstractmethod
+    async def _acomplete(
+            self,
+            messages: list[dict[str, str]],
+            model: str,
+            max_tokens: int | None,
+            temperature: float | None
+        ) -> str:
+        pass
+
+    async def acomplete(
+            self,
+            messages: list[dict[str, str]],
+            model: str,
+            max_tokens: int | None = None,
+            temperature: float | None = None
+        ) -> str:
+        """
+        Get a completion from an event loop, waiting for a free slot
+        under the provider's concurrency limit.
+
+        Args:
+            messages: Chat messages
+            model: Model name
+            max_tokens: Completion token limit
+            temperature: Sampling temperature
+
+        Returns:
+            Completion text
+
+        Raises:
+            asyncio.TimeoutError: The completion took longer than the
+                provider's timeout
+        """
+        async with provider_semaphore(self.name, self.max_concurrency):
+            return await asyncio.wait_for(
+                self._acomplete(messages, model, max_tokens, temperature),
+                self.timeout
+            )
+
+
+class OpenAIProvider(ChatProvider):
+    """
+    Provider for OpenAI-compatible chat completion APIs. Clients are
+    created on first use; the async client is tied to the event loop it
+    was created on and pools its connections.
+
+    Args:
+        name: Provider name
+        base_url: API base URL (None uses the OpenAI default)
+        api_key: API key (None reads it from the environment)
+        timeout: Seconds a completion may take
+        max_concurrency: Async completions in flight at once
+        max_retries: Retries of the API client after a failed request
+    """
+    def __init__(
+            self,
+            name: str,
+            base_url: str | None = None,
+            api_key: str | None = None,
+            timeout: float = LLM_TIMEOUT_SECONDS,
+            max_concurrency: int = LLM_MAX_CONCURRENCY,
+            max_retries: int = LLM_MAX_RETRIES
+        ):
+        super().__init__(name, timeout, max_concurrency)
+        self.base_url = base_url
+        self.api_key = api_key
+        self.max_retries = max_retries
+        self._client = None
+        self._async_client = None
+        self._async_client_loop = None
+        self._lock = threading.Lock()
+
+    def _client_kwargs(self) -> dict[str, Any]:
+        return {
+            # local servers (Ollama, the stand-in) accept any key
+            'api_key': self.api_key or 'not-needed',
+            'base_url': self.base_url,
+            'timeout': self.timeout,
+            # the client retries twice by default, hiding failures and
+            # multiplying the time a hanging request takes
+            'max_retries': self.max_retries,
+        }
+
+    def _get_client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from openai import OpenAI
+
+                    self._client = OpenAI(**self._client_kwargs())
+        return self._client
+
+    def _get_async_client(self):
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            from openai import AsyncOpenAI
+
+            self._async_client = AsyncOpenAI(**self._client_kwargs())
+            self._async_client_loop = loop
+        return self._async_client
+
+    @staticmethod
+    def _request(messages, model, max_tokens, temperature) -> dict[str, Any]:
+        request = {'model': model, 'messages': messages}
+        if max_tokens is not None:
+            request['max_tokens'] = max_tokens
+        if temperature is not None:
+            request['temperature'] = temperature
+        return request
+
+    def complete(
+            self,
+            messages: list[dict[str, str]],
+            model: str,
+            max_tokens: int | None = None,
+            temperature: float | None = None
+        ) -> str:
+        response = self._get_client().chat.completions.create(
+            **self._request(messages, model, max_tokens, temperature)
+        )
+        return response.choices[0].message.content
+
+    async def _acomplete(self, messages, model, max_tokens, temperature) -> str:
+        response = await self._get_async_client().chat.completions.create(
+            **self._request(messages, model, max_tokens, temperature)
+        )
+        return response.choices[0].message.content
+
+
+class LatencyModel:
+    """
+    Distribution of simulated completion latencies.
+
+    Args:
+        kind: 'fixed', 'uniform' or 'lognormal'
+        params: Seconds for 'fixed'; low and high for 'uniform'; median
+            and sigma (of the underlying normal) for 'lognormal'
+    """
+    KINDS: tuple[str, ...] = ('fixed', 'uniform', 'lognormal')
+
+    def __init__(self, kind: str = 'fixed', params: tuple[float, ...] = (0.0,)):
+        if kind not in self.KINDS:
+            raise ValueError(f'Unknown latency distribution: {kind}')
+        self.kind = kind
+        self.params = tuple(params)
+
+    @classmethod
+    def parse(cls, spec: str) -> 'LatencyModel':
+        """
+        Parse a latency specification such as 'fixed:0.2',
+        'uniform:0.1,0.5' or 'lognormal:0.8,0.5'.
+
+        Args:
+            spec: Distribution name and comma-separated parameters
+
+        Returns:
+            Latency model
+        """
+        kind, _, params = spec.partition(':')
+        return cls(kind.strip(), tuple(
+            float(p) for p in params.split(',') if p.strip()
+        ) or (0.0,))
+
+    def sample(self, rng: random.Random) -> float:
+        """
+        Draw a latency.
+
+        Args:
+            rng: Random source
+
+        Returns:
+            Latency in seconds
+        """
+        if self.kind == 'uniform':
+            return rng.uniform(*self.params[:2])
+        if self.kind == 'lognormal':
+            median, sigma = (self.params + (0.5,))[:2]
+            return median * rng.lognormvariate(0.0, sigma)
+        return self.params[0]
+
+
+def load_recorded_completions(path: str) -> list[dict[str, str]]:
+    """
+    Load recorded completions from a JSONL file.
+
+    Each line needs a 'prompt' and a completion field ('completion',
+    'response', 'output' or 'perplexity_raw'); a 'professor' field lets
+    prompts about the same professor replay the recording.
+
+    Args:
+        path: JSONL file
+
+    Returns:
+        Records with 'prompt', 'completion' and optionally 'professor'
+    """
+    records = []
+    with open(path, 'r') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            raw = json.loads(line)
+            completion = next(
+                (raw[field] for field in COMPLETION_FIELDS if raw.get(field)),
+                None
+            )
+            if completion is None:
+                continue
+            records.append({
+                'prompt': raw.get('prompt', ''),
+                'completion': completion,
+                'professor': raw.get('professor'),
+            })
+    return records
+
+
+def _normalize_prompt(prompt: str) -> str:
+    return ' '.join(prompt.split())
+
+
+class ReplayProvider(ChatProvider):
+    """
+    Offline provider answering from recorded completions, with simulated
+    latency and failures. Answers are deterministic for a prompt:
+
+    1. a recording of the same prompt is replayed
+    2. a ranking prompt listing candidates ('- Name: areas' lines) is
+       answered with the candidate names in listed order
+    3. a recording for a professor named in the prompt is replayed
+    4. otherwise a recording is picked by prompt hash
+
+    Args:
+        records: Recorded completions (see `load_recorded_completions`)
+        latency: Simulated latency distribution
+        failure_rate: Fraction of calls that raise a `ProviderError`
+        timeout_rate: Fraction of calls that hang for `hang_seconds`
+        hang_seconds: Duration of a hanging call
+        seed: Seed of the latency and failure draws
+        name: Provider name, which also keys its concurrency limit
+        timeout: Seconds an async completion may take
+        max_concurrency: Async completions in flight at once
+    """
+    def __init__(
+            self,
+            records: list[dict[str, str]],
+            latency: LatencyModel | None = None,
+            failure_rate: float = 0.0,
+            timeout_rate: float = 0.0,
+            hang_seconds: float = 3600.0,
+            seed: int = 0,
+            name: str = 'replay',
+            timeout: float = LLM_TIMEOUT_SECONDS,
+            max_concurrency: int = LLM_MAX_CONCURRENCY
+        ):
+        super().__init__(name, timeout, max_concurrency)
+        self.records = records
+        self.latency = latency or LatencyModel()
+        self.failure_rate = failure_rate
+        self.timeout_rate = timeout_rate
+        self.hang_seconds = hang_seconds
+        self.calls = 0
+        self.failures = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._by_prompt = {
+            _normalize_prompt(record['prompt']): record['completion']
+            for record in records if record['prompt']
+        }
+        self._by_professor = {
+            record['professor']: record['completion']
+            for record in records if record.get('professor')
+        }
+
+    @classmethod
+    def from_jsonl(cls, path: str, **kwargs) -> 'ReplayProvider':
+        """
+        Create a provider replaying a JSONL file of recordings.
+
+        Args:
+            path: JSONL file
+            kwargs: Other `ReplayProvider` arguments
+
+        Returns:
+            Replay provider
+        """
+        return cls(load_recorded_completions(path), **kwargs)
+
+    def respond(self, messages: list[dict[str, str]]) -> str:
+        """
+        Pick the answer to a prompt, without latency or failures.
+
+        Args:
+            messages: Chat messages
+
+        Returns:
+            Completion text
+        """
+        prompt = next(
+            (m['content'] for m in reversed(messages) if m.get('role') == 'user'),
+            ''
+        )
+        completion = self._by_prompt.get(_normalize_prompt(prompt))
+        if completion is not None:
+            return completion
+        candidates = CANDIDATE_LINE.findall(prompt)
+        if len(candidates) > 1:
+            return ', '.join(candidates)
+        for professor, completion in self._by_professor.items():
+            if professor in prompt:
+                return completion
+        if not self.records:
+            return ''
+        digest = hashlib.sha256(prompt.encode('utf-8')).digest()
+        return self.records[
+            int.from_bytes(digest[:8], 'big') % len(self.records)
+        ]['completion']
+
+    def draw(self) -> tuple[float, str | None]:
+        """
+        Draw the behaviour of one call.
+
+        Returns:
+            Delay in seconds and the outcome: None to answer, 'failure'
+            to fail after the delay or 'timeout' to hang
+        """
+        with self._lock:
+            self.calls += 1
+            delay = self.latency.sample(self._rng)
+            outcome = self._rng.random()
+            if outcome < self.timeout_rate:
+                return self.hang_seconds, 'timeout'
+            if outcome < self.timeout_rate + self.failure_rate:
+                self.failures += 1
+                return delay, 'failure'
+            return delay, None
+
+    def complete(
+            self,
+            messages: list[dict[str, str]],
+            model: str,
+            max_tokens: int | None = None,
+            temperature: float | None = None
+        ) -> str:
+        delay, outcome = self.draw()
+        if outcome == 'timeout':
+            # blocking clients give up after their timeout
+            time.sleep(min(delay, self.timeout))
+            raise TimeoutError(f'Simulated timeout from {self.name}')
+        time.sleep(delay)
+        if outcome is not None:
+            raise ProviderError(f'Simulated {outcome} from {self.name}')
+        return self.respond(messages)
+
+    async def _acomplete(self, messages, model, max_tokens, temperature) -> str:
+        delay, outcome = self.draw()
+        await asyncio.sleep(delay)
+        if outcome is not None:
+            raise ProviderError(f'Simulated {outcome} from {self.name}')
+        return self.respond(messages)
+
+    def stats(self) -> dict[str, int]:
+        """
+        Get replay statistics.
+
+        Returns:
+            Dictionary with call and failure counts
+        """
+        with self._lock:
+            return {'calls': self.calls, 'failures': self.failures}
+
+
+def get_provider(name: str) -> ChatProvider | None:
+    """
+    Get the shared provider for a name, configured from the environment.
+
+    Args:
+        name: Provider name ('deepseek', 'openai', 'ollama' or 'perplexity')
+
+    Returns:
+        Provider, or None in offline mode unless completions are
+        replayed
+    """
+    provider = _providers.get(name)
+    if provider is not None:
+        return provider
+    with _providers_lock:
+        provider = _providers.get(name)
+        if provider is None:
+            base_url, key_variable, timeout, max_concurrency = PROVIDER_ENDPOINTS.get(
+                name, (None, None, LLM_TIMEOUT_SECONDS, LLM_MAX_CONCURRENCY)
+            )
+            max_concurrency = int(os.environ.get(
+                f'{name.upper()}_MAX_CONCURRENCY', max_concurrency
+            ))
+            if LLM_REPLAY_PATH:
+                provider = ReplayProvider.from_jsonl(
+                    LLM_REPLAY_PATH,
+                    latency=LatencyModel.parse(LLM_REPLAY_LATENCY),
+                    failure_rate=LLM_REPLAY_FAILURE_RATE,
+                    timeout_rate=LLM_REPLAY_TIMEOUT_RATE,
+                    seed=LLM_REPLAY_SEED,
+                    name=name,
+                    max_concurrency=max_concurrency,
+                )
+            elif OFFLINE:
+                return None
+            else:
+                provider = OpenAIProvider(
+                    name,
+                    base_url=os.environ.get(f'{name.upper()}_BASE_URL', base_url),
+                    api_key=os.environ.get(key_variable) if key_variable else None,
+                    timeout=timeout,
+                    max_concurrency=max_concurrency,
+                    max_retries=int(os.environ.get(
+                        f'{name.upper()}_MAX_RETRIES', LLM_MAX_RETRIES
+                    )),
+                )
+            _providers[name] = provider
+    return provider
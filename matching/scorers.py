@@ -0,0 +1,488 @@
+import heapq
+import numpy as np
+import scipy.sparse as sp
+
+from matching.artifacts import (
+    save_json, load_json,
+    save_array, load_array,
+    save_sparse, load_sparse,
+)
+
+
+# queries scored per matrix-matrix product (bounds the dense score block)
+QUERY_CHUNK_SIZE: int = 256
+
+
+def select_top_n(
+        scores: np.ndarray,
+        N: int,
+        candidates: np.ndarray | None = None
+    ) -> list[tuple[int, float]]:
+    """
+    Select the N highest scoring entries without fully sorting.
+
+    Args:
+        scores: Scores for every entry
+        N: Number of entries to select
+        candidates: Optional entry indices to restrict the selection to
+
+    Returns:
+        List of (entry index, score) pairs, best first. Ties are
+        broken by entry index, matching a stable descending sort.
+    """
+    if candidates is None:
+        candidates = np.arange(len(scores))
+    if N <= 0 or len(candidates) == 0:
+        return []
+
+    candidate_scores = scores[candidates]
+    if N < len(candidates):
+        # partial selection -> keep everything tied with the N-th best
+        kth_score = np.partition(candidate_scores, -N)[-N]
+        keep = candidate_scores >= kth_score
+        candidates = candidates[keep]
+        candidate_scores = candidate_scores[keep]
+
+    order = np.lexsort((candidates, -candidate_scores))[:N]
+    return [
+        (int(candidates[i]), float(candidate_scores[i])) for i in order
+    ]
+
+
+class CosineScorer:
+    """
+    Cosine similarity scoring over a pre-normalized entry matrix.
+
+    Entries are stored as the rows of a single L2-normalized matrix
+    (sparse CSR or contiguous dense), so scoring a query is one
+    matrix-vector product followed by a partial top-N selection.
+
+    Args:
+        entry_matrix: Matrix with one vector per entry
+        epsilon: Smoothing term added to the norm product, i.e.
+            similarity = q.e / (|q||e| + epsilon)
+    """
+    def __init__(
+            self,
+            entry_matrix: np.ndarray | sp.spmatrix,
+            epsilon: float = 0.0
+        ):
+        self.epsilon = epsilon
+        if sp.issparse(entry_matrix):
+            entry_matrix = sp.csr_matrix(entry_matrix, dtype=np.float64)
+            norms = np.sqrt(
+                np.asarray(entry_matrix.multiply(entry_matrix).sum(axis=1))
+            ).ravel()
+            inverse_norms = np.divide(
+                1.0, norms, out=np.zeros_like(norms), where=norms > 0
+            )
+            self.entry_matrix = sp.diags(inverse_norms) @ entry_matrix
+            self.entry_matrix = self.entry_matrix.tocsr()
+        else:
+            entry_matrix = np.asarray(entry_matrix, dtype=np.float32)
+            norms = np.linalg.norm(entry_matrix, axis=1)
+            inverse_norms = np.divide(
+                1.0, norms, out=np.zeros_like(norms), where=norms > 0
+            )
+            self.entry_matrix = np.ascontiguousarray(
+                entry_matrix * inverse_norms[:, None]
+            )
+        self.norms = norms
+        # entries without any signal are never returned
+        self.candidates = np.flatnonzero(norms > 0)
+
+    def save(self, directory: str):
+        """
+        Save the scorer to an artifact directory.
+
+        Args:
+            directory: Artifact directory
+        """
+        is_sparse = sp.issparse(self.entry_matrix)
+        if is_sparse:
+            save_sparse(directory, 'entry_matrix', self.entry_matrix)
+        else:
+            save_array(directory, 'entry_matrix', self.entry_matrix)
+        save_array(directory, 'norms', self.norms)
+        save_json(directory, 'scorer', {
+            'epsilon': self.epsilon, 'sparse': is_sparse
+        })
+
+    @classmethod
+    def load(
+            cls, directory: str, mmap_mode: str | None = 'r'
+        ) -> 'CosineScorer':
+        """
+        Load a scorer saved with `save`, memory-mapping its matrices.
+
+        Args:
+            directory: Artifact directory
+            mmap_mode: NumPy memory-map mode, or None to read into memory
+
+        Returns:
+            Loaded scorer
+        """
+        config = load_json(directory, 'scorer')
+        scorer = cls.__new__(cls)
+        scorer.epsilon = config['epsilon']
+        if config['sparse']:
+            scorer.entry_matrix = load_sparse(
+                directory, 'entry_matrix', mmap_mode
+            )
+        else:
+            scorer.entry_matrix = load_array(
+                directory, 'entry_matrix', mmap_mode
+            )
+        scorer.norms = load_array(directory, 'norms', mmap_mode)
+        scorer.candidates = np.flatnonzero(scorer.norms > 0)
+        return scorer
+
+    def updated(
+            self,
+            sources: list[int],
+            new_rows: np.ndarray | sp.spmatrix | None
+        ) -> 'CosineScorer':
+        """
+        Build a scorer for a changed dataset, reusing the normalized rows
+        of unchanged entries.
+
+        Args:
+            sources: For each entry of the new dataset, its row in this
+                scorer, or -1 for the next row of `new_rows`
+            new_rows: Vectors of the new and changed entries, in order
+
+        Returns:
+            New scorer; this one is left untouched
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        new_positions = np.flatnonzero(sources < 0)
+        entry_matrix, norms = self.entry_matrix, np.asarray(self.norms)
+        if len(new_positions):
+            fresh = CosineScorer(new_rows, self.epsilon)
+            if sp.issparse(entry_matrix):
+                entry_matrix = sp.vstack(
+                    [entry_matrix, fresh.entry_matrix], format='csr'
+                )
+            else:
+                entry_matrix = np.vstack([entry_matrix, fresh.entry_matrix])
+            norms = np.concatenate([norms, fresh.norms])
+            sources = sources.copy()
+            sources[new_positions] = (
+                len(self.norms) + np.arange(len(new_positions))
+            )
+
+        scorer = CosineScorer.__new__(CosineScorer)
+        scorer.epsilon = self.epsilon
+        if sp.issparse(entry_matrix):
+            scorer.entry_matrix = sp.csr_matrix(entry_matrix)[sources]
+        else:
+            scorer.entry_matrix = np.ascontiguousarray(entry_matrix[sources])
+        scorer.norms = norms[sources]
+        scorer.candidates = np.flatnonzero(scorer.norms > 0)
+        return scorer
+
+    def score(self, query_vector: np.ndarray | sp.spmatrix) -> np.ndarray:
+        """
+        Compute cosine similarities between a query and every entry.
+
+        Args:
+            query_vector: Query vector (dense 1-D array or sparse row)
+
+        Returns:
+            Array of similarities, one per entry
+        """
+        if not sp.issparse(query_vector):
+            query_vector = np.asarray(query_vector).reshape(1, -1)
+        return self.score_many(query_vector)[0]
+
+    def top_n(
+            self, query_vector: np.ndarray | sp.spmatrix, N: int
+        ) -> list[tuple[int, float]]:
+        """
+        Get the N entries most similar to a query.
+
+        Args:
+            query_vector: Query vector (dense 1-D array or sparse row)
+            N: Number of entries to return
+
+        Returns:
+            List of (entry index, similarity) pairs, best first
+        """
+        return select_top_n(
+            self.score(query_vector), N, self.candidates
+        )
+
+    def score_many(
+            self, query_matrix: np.ndarray | sp.spmatrix
+        ) -> np.ndarray:
+        """
+        Compute cosine similarities for several queries at once.
+
+        Args:
+            query_matrix: Matrix with one query vector per row
+
+        Returns:
+            Array of shape (num_queries, num_entries)
+        """
+        if sp.issparse(query_matrix):
+            query_matrix = sp.csr_matrix(query_matrix, dtype=np.float64)
+            query_norms = np.sqrt(
+                np.asarray(query_matrix.multiply(query_matrix).sum(axis=1))
+            ).ravel()
+        else:
+            query_matrix = np.atleast_2d(
+                np.asarray(query_matrix, dtype=self.entry_matrix.dtype)
+            )
+            query_norms = np.linalg.norm(query_matrix, axis=1)
+        inverse_norms = np.divide(
+            1.0, query_norms,
+            out=np.zeros_like(query_norms, dtype=np.float64),
+            where=query_norms > 0
+        )
+
+        similarities = query_matrix @ self.entry_matrix.T
+        if sp.issparse(similarities):
+            similarities = similarities.toarray()
+        similarities = np.asarray(similarities) * inverse_norms[:, None]
+        if self.epsilon:
+            scale = np.outer(query_norms, self.norms)
+            similarities = similarities * scale / (scale + self.epsilon)
+        return similarities
+
+    def top_n_many(
+            self, query_matrix: np.ndarray | sp.spmatrix, N: int
+        ) -> list[list[tuple[int, float]]]:
+        """
+        Get the N most similar entries for several queries.
+
+        Args:
+            query_matrix: Matrix with one query vector per row
+            N: Number of entries to return per query
+
+        Returns:
+            One list of (entry index, similarity) pairs per query
+        """
+        results = []
+        for start in range(0, query_matrix.shape[0], QUERY_CHUNK_SIZE):
+            scores = self.score_many(
+                query_matrix[start:start + QUERY_CHUNK_SIZE]
+            )
+            results.extend(
+                select_top_n(row, N, self.candidates) for row in scores
+            )
+        return results
+
+
+class OverlapScorer:
+    """
+    Keyword overlap scoring over a binary entry-term incidence matrix.
+
+    The score of an entry is the number of distinct query keywords it
+    contains. Single queries walk an inverted index (term -> postings
+    array of entry ids), so only entries sharing a keyword with the
+    query are touched; a batch of queries is scored with one sparse
+    matrix-matrix product.
+    """
+    def __init__(self, entry_keywords: list[set[str]]):
+        self.vocabulary = {}
+        rows, cols = [], []
+        for i, keywords in enumerate(entry_keywords):
+            for term in keywords:
+                j = self.vocabulary.setdefault(term, len(self.vocabulary))
+                rows.append(i)
+                cols.append(j)
+        self.entry_matrix = sp.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+            shape=(len(entry_keywords), len(self.vocabulary))
+        )
+        # columns of the CSC form are the postings lists
+        term_matrix = self.entry_matrix.tocsc()
+        term_matrix.sort_indices()
+        self.postings_indptr = term_matrix.indptr
+        self.postings_indices = term_matrix.indices
+
+    def postings(self, term: str) -> np.ndarray | None:
+        """
+        Get the ids of the entries containing a term.
+
+        Args:
+            term: Keyword to look up
+
+        Returns:
+            Sorted array of entry ids, or None for unknown terms
+        """
+        j = self.vocabulary.get(term)
+        if j is None:
+            return None
+        return self.postings_indices[
+            self.postings_indptr[j]:self.postings_indptr[j + 1]
+        ]
+
+    def save(self, directory: str):
+        """
+        Save the index to an artifact directory.
+
+        Args:
+            directory: Artifact directory
+        """
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        save_json(directory, 'vocabulary', terms)
+        save_sparse(directory, 'entry_matrix', self.entry_matrix)
+        save_array(directory, 'postings_indptr', self.postings_indptr)
+        save_array(directory, 'postings_indices', self.postings_indices)
+
+    @classmethod
+    def load(
+            cls, directory: str, mmap_mode: str | None = 'r'
+        ) -> 'OverlapScorer':
+        """
+        Load an index saved with `save`, memory-mapping its arrays.
+
+        Args:
+            directory: Artifact directory
+            mmap_mode: NumPy memory-map mode, or None to read into memory
+
+        Returns:
+            Loaded scorer
+        """
+        scorer = cls.__new__(cls)
+        scorer.vocabulary = {
+            term: j for j, term in enumerate(load_json(directory, 'vocabulary'))
+        }
+        scorer.entry_matrix = load_sparse(directory, 'entry_matrix', mmap_mode)
+        scorer.postings_indptr = load_array(
+            directory, 'postings_indptr', mmap_mode
+        )
+        scorer.postings_indices = load_array(
+            directory, 'postings_indices', mmap_mode
+        )
+        return scorer
+
+    def entry_keywords(self) -> list[set[str]]:
+        """
+        Recover the keyword set of every entry.
+
+        Returns:
+            Keyword set for each entry
+        """
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        entry_matrix = sp.csr_matrix(self.entry_matrix)
+        return [
+            {terms[j] for j in entry_matrix.indices[start:end]}
+            for start, end in zip(entry_matrix.indptr[:-1], entry_matrix.indptr[1:])
+        ]
+
+    def updated(
+            self,
+            sources: list[int],
+            new_keywords: list[set[str]]
+        ) -> 'OverlapScorer':
+        """
+        Build an index for a changed dataset, reusing the keyword sets of
+        unchanged entries.
+
+        Args:
+            sources: For each entry of the new dataset, its row in this
+                index, or -1 for the next set of `new_keywords`
+            new_keywords: Keyword sets of the new and changed entries,
+                in order
+
+        Returns:
+            New scorer; this one is left untouched
+        """
+        old_keywords = self.entry_keywords()
+        new_keywords = iter(new_keywords)
+        return OverlapScorer([
+            old_keywords[i] if i >= 0 else next(new_keywords)
+            for i in sources
+        ])
+
+    def top_n(
+            self, keywords: set[str], N: int
+        ) -> list[tuple[int, int]]:
+        """
+        Get the N entries with the largest overlap for one query.
+
+        Args:
+            keywords: Query keyword set
+            N: Number of entries to return
+
+        Returns:
+            List of (entry index, overlap) pairs, best first. Ties are
+            broken by entry index.
+        """
+        postings = [self.postings(term) for term in keywords]
+        postings = [ids for ids in postings if ids is not None]
+        if not postings or N <= 0:
+            return []
+
+        # accumulate overlap counts over the touched entries only
+        entry_ids, overlaps = np.unique(
+            np.concatenate(postings), return_counts=True
+        )
+        top_matches = heapq.nlargest(
+            N, zip(overlaps.tolist(), (-entry_ids).tolist())
+        )
+        return [(-i, overlap) for overlap, i in top_matches]
+
+    def _query_matrix(self, queries: list[set[str]]) -> sp.csr_matrix:
+        """
+        Build a binary query-term matrix, ignoring unknown terms.
+
+        Args:
+            queries: Keyword set for each query
+
+        Returns:
+            Sparse CSR matrix with one row per query
+        """
+        rows, cols = [], []
+        for i, keywords in enumerate(queries):
+            for term in keywords:
+                j = self.vocabulary.get(term)
+                if j is not None:
+                    rows.append(i)
+                    cols.append(j)
+        return sp.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+            shape=(len(queries), len(self.vocabulary))
+        )
+
+    def score_many(self, queries: list[set[str]]) -> np.ndarray:
+        """
+        Count keyword overlaps for several queries at once.
+
+        Args:
+            queries: Keyword set for each query
+
+        Returns:
+            Array of shape (num_queries, num_entries)
+        """
+        overlaps = self._query_matrix(queries) @ self.entry_matrix.T
+        return overlaps.toarray()
+
+    def top_n_many(
+            self, queries: list[set[str]], N: int
+        ) -> list[list[tuple[int, int]]]:
+        """
+        Get the N entries with the largest overlap for several queries.
+
+        Args:
+            queries: Keyword set for each query
+            N: Number of entries to return per query
+
+        Returns:
+            One list of (entry index, overlap) pairs per query
+        """
+        results = []
+        for start in range(0, len(queries), QUERY_CHUNK_SIZE):
+            overlaps = self.score_many(
+                queries[start:start + QUERY_CHUNK_SIZE]
+            )
+            results.extend(
+                [
+                    (i, int(overlap)) for i, overlap
+                    in select_top_n(row, N, np.flatnonzero(row))
+                ]
+                for row in overlaps
+            )
+        return results
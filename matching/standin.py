@@ -0,0 +1,143 @@
+"""
+Local stand-in for an OpenAI-compatible chat completion API.
+
+Serves `POST /v1/chat/completions` (and `/chat/completions`) from a
+`ReplayProvider`: answers are replayed recordings, delayed by the
+provider's latency model, and a configurable fraction of requests fail
+with an HTTP error or hang. Pointing a provider's base URL at it (e.g.
+`DEEPSEEK_BASE_URL=http://127.0.0.1:8089/v1`) exercises the real client
+stack, concurrency limits, caches and timeouts without network access.
+"""
+
+import json
+import time
+import uuid
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from matching.providers import ReplayProvider
+
+
+COMPLETION_PATHS: tuple[str, ...] = ('/v1/chat/completions', '/chat/completions')
+
+
+class StandInServer:
+    """
+    HTTP server answering chat completions from a replay provider in a
+    daemon thread.
+
+    Args:
+        provider: Replay provider deciding answers, latency and failures
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+        failure_status: HTTP status of simulated failures
+    """
+    def __init__(
+            self,
+            provider: ReplayProvider,
+            host: str = '127.0.0.1',
+            port: int = 8089,
+            failure_status: int = 500
+        ):
+        self.provider = provider
+        self.host = host
+        self.port = port
+        self.failure_status = failure_status
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        """
+        Base URL to configure OpenAI-compatible clients with.
+        """
+        return f'http://{self.host}:{self.port}/v1'
+
+    def start(self) -> int:
+        """
+        Start serving in the background.
+
+        Returns:
+            Port the server is bound to
+        """
+        if self._server is not None:
+            return self.port
+        provider = self.provider
+        failure_status = self.failure_status
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length)
+                if self.path.split('?')[0] not in COMPLETION_PATHS:
+                    self._send(404, {'error': {'message': 'Not found'}})
+                    return
+                try:
+                    request = json.loads(body)
+                    messages = request['messages']
+                except (ValueError, KeyError) as e:
+                    self._send(400, {'error': {'message': f'Bad request: {e}'}})
+                    return
+
+                delay, outcome = provider.draw()
+                time.sleep(delay)
+                if outcome is not None:
+                    self._send(failure_status, {'error': {
+                        'message': f'Simulated {outcome}',
+                        'type': 'server_error',
+                    }})
+                    return
+                content = provider.respond(messages)
+                self._send(200, {
+                    'id': f'chatcmpl-{uuid.uuid4().hex}',
+                    'object': 'chat.completion',
+                    'created': int(time.time()),
+                    'model': request.get('model', 'stand-in'),
+                    'choices': [{
+                        'index': 0,
+                        'message': {'role': 'assistant', 'content': content},
+                        'finish_reason': 'stop',
+                    }],
+                    'usage': {
+                        'prompt_tokens': 0,
+                        'completion_tokens': 0,
+                        'total_tokens': 0,
+                    },
+                })
+
+            def _send(self, status: int, payload: dict):
+                data = json.dumps(payload).encode('utf-8')
+                try:
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # the client timed out and went away
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name='llm-standin',
+            daemon=True
+        )
+        self._thread.start()
+        return self.port
+
+    def stop(self):
+        """
+        Stop serving.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -1,11 +1,13 @@
+import os
 from abc import ABC, abstractmethod
 
 import numpy as np
-from gensim.models import Word2Vec
-from gensim.models.doc2vec import Doc2Vec, TaggedDocument
-from sklearn.feature_extraction.text import TfidfVectorizer
+import scipy.sparse as sp
 
 from matching.preprocessors import Preprocessor
+from matching.artifacts import (
+    save_json, load_json, save_array, load_array
+)
 
 
 class Vectorizer(ABC):
@@ -25,18 +27,70 @@ class Vectorizer(ABC):
         """
         pass
 
+    def vectorize_many(self, texts: list[str]) -> np.ndarray:
+        """
+        Convert several texts to a matrix of vector representations.
+        
+        Args:
+            texts: Input texts to vectorize
+            
+        Returns:
+            Matrix with one row per text
+        """
+        return np.vstack([self.vectorize(text) for text in texts])
+
 
 class TFIDFVectorizer(Vectorizer):
     """
     Vectorizer implementation using TF-IDF.
     """
     def __init__(self, corpus: list[str]):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
         self.preprocessor = Preprocessor()
         self.vectorizer = TfidfVectorizer(
             tokenizer=self.preprocessor.preprocess,
             token_pattern=None
         )
         self.vectorizer.fit(corpus)
+
+    def save(self, directory: str):
+        """
+        Save the fitted vocabulary and IDF weights.
+        
+        Args:
+            directory: Artifact directory
+        """
+        terms = sorted(
+            self.vectorizer.vocabulary_, key=self.vectorizer.vocabulary_.get
+        )
+        save_json(directory, 'vocabulary', terms)
+        save_array(directory, 'idf', self.vectorizer.idf_)
+
+    @classmethod
+    def load(cls, directory: str) -> 'TFIDFVectorizer':
+        """
+        Load a vectorizer saved with `save` without refitting.
+        
+        Args:
+            directory: Artifact directory
+            
+        Returns:
+            Vectorizer with the saved vocabulary and IDF weights
+        """
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        vectorizer = cls.__new__(cls)
+        vectorizer.preprocessor = Preprocessor()
+        vectorizer.vectorizer = TfidfVectorizer(
+            tokenizer=vectorizer.preprocessor.preprocess,
+            token_pattern=None,
+            vocabulary={
+                term: j for j, term in enumerate(load_json(directory, 'vocabulary'))
+            }
+        )
+        vectorizer.vectorizer.idf_ = load_array(directory, 'idf', None)
+        return vectorizer
     
     def vectorize(self, text: str) -> np.ndarray:
         """
@@ -50,6 +104,18 @@ class TFIDFVectorizer(Vectorizer):
         """
         return self.vectorizer.transform([text]).toarray()[0]
 
+    def vectorize_many(self, texts: list[str]) -> sp.csr_matrix:
+        """
+        Convert several texts to a sparse TF-IDF matrix.
+        
+        Args:
+            texts: Input texts to vectorize
+            
+        Returns:
+            Sparse CSR matrix with one row per text
+        """
+        return self.vectorizer.transform(texts).tocsr()
+
 
 class Word2VecVectorizer(Vectorizer):
     """
@@ -63,6 +129,8 @@ class Word2VecVectorizer(Vectorizer):
             min_count: int = 1,
             workers: int = 4
         ):
+        from gensim.models import Word2Vec
+
         self.preprocessor = Preprocessor()
         processed_corpus = ([
             self.preprocessor.preprocess(doc) for doc in corpus
@@ -75,6 +143,42 @@ class Word2VecVectorizer(Vectorizer):
             min_count=min_count,
             workers=workers
         )
+        self.wv = self.model.wv
+
+    def save(self, directory: str):
+        """
+        Save the trained word vectors.
+        
+        Args:
+            directory: Artifact directory
+        """
+        self.wv.save(
+            os.path.join(directory, 'vectors.kv'), separately=['vectors']
+        )
+
+    @classmethod
+    def load(
+            cls, directory: str, mmap_mode: str | None = 'r'
+        ) -> 'Word2VecVectorizer':
+        """
+        Load word vectors saved with `save` without retraining.
+        
+        Args:
+            directory: Artifact directory
+            mmap_mode: NumPy memory-map mode, or None to read into memory
+            
+        Returns:
+            Vectorizer backed by the (memory-mapped) word vectors
+        """
+        from gensim.models import KeyedVectors
+
+        vectorizer = cls.__new__(cls)
+        vectorizer.preprocessor = Preprocessor()
+        vectorizer.model = None
+        vectorizer.wv = KeyedVectors.load(
+            os.path.join(directory, 'vectors.kv'), mmap=mmap_mode
+        )
+        return vectorizer
     
     def vectorize(self, text: str) -> np.ndarray:
         """
@@ -89,9 +193,9 @@ class Word2VecVectorizer(Vectorizer):
         tokens = self.preprocessor.preprocess(text)
         
         if not tokens:
-            return np.zeros(self.model.vector_size)
+            return np.zeros(self.wv.vector_size)
         
-        vectors = [self.model.wv[token] for token in tokens if token in self.model.wv]
+        vectors = [self.wv[token] for token in tokens if token in self.wv]
         if not vectors:
-            return np.zeros(self.model.vector_size)
+            return np.zeros(self.wv.vector_size)
         return np.mean(vectors, axis=0)
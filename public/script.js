@@ -9,6 +9,15 @@ let currentModel = "scraping"; // default LLM source
 let selectedModel = 'all';
 let selectedMatchingMethod = 'keyword';
 
+// Matching service (python app.py); the full dataset is only downloaded
+// and scored in the browser when it is unavailable (e.g. static hosting)
+const MATCH_LIMIT = 200;
+const PAGE_SIZE = 20;
+let apiAvailable = false;
+let shownResearchers = [];
+let nextPage = null;
+let matchController = null; // aborts a /match request superseded by a newer one
+
 // TF-IDF related variables
 let documentVectors = {};
 let idfScores = {};
@@ -68,7 +77,13 @@ function getWordVector(text) {
 }
 
 function searchResearchers() {
-  const searchQuery = document.getElementById('searchInput').value.toLowerCase();
+  const searchQuery = (document.getElementById('searchInput')?.value || '').toLowerCase();
+
+  if (apiAvailable) {
+    const topics = searchQuery ? [searchQuery] : Array.from(selectedResearchAreas);
+    findMatches(topics);
+    return;
+  }
   
   if (!searchQuery) {
     displayResearchers(matchingResearchers());
@@ -111,6 +126,70 @@ function searchResearchers() {
   displayResearchers(searchResults.map(result => result.researcher));
 }
 
+/* ───────────────────────────
+   Matching service
+──────────────────────────── */
+async function fetchJSON(url, options) {
+  const r = await fetch(url, options);
+  if (!r.ok) throw new Error(r.status);
+  return r.json();
+}
+
+function loadTopics() {
+  return fetchJSON(`/topics?model=${encodeURIComponent(currentModel)}`).then(
+    (data) => {
+      uniqueResearchAreas = new Set(
+        data.topics.map(cleanResearchArea).filter(Boolean)
+      );
+      populateResearchAreasDropdown();
+    }
+  );
+}
+
+function loadDataset() {
+  // fallback when the matching service is not running
+  return fetchJSON("/data/results.json").then((data) => {
+    allResearchers = data;
+    calculateTFIDF(allResearchers);  // Calculate TF-IDF after loading data
+    rebuildTopics();
+  });
+}
+
+async function findMatches(topics, page = 1) {
+  const params = new URLSearchParams({
+    strategy: selectedMatchingMethod,
+    model: currentModel,
+    N: MATCH_LIMIT,
+    page,
+    page_size: PAGE_SIZE,
+  });
+  topics.forEach((t) => params.append("q", t));
+
+  // only the latest request may update the results
+  matchController?.abort();
+  const controller = new AbortController();
+  matchController = controller;
+
+  try {
+    const data = await fetchJSON(`/match?${params}`, {
+      signal: controller.signal,
+    });
+    // the service only returns researchers with areas for this model
+    const results = data.results;
+    shownResearchers = page === 1 ? results : shownResearchers.concat(results);
+    nextPage = page * data.page_size < data.total
+      ? () => findMatches(topics, page + 1)
+      : null;
+    displayResearchers(shownResearchers);
+  } catch (e) {
+    if (e.name === "AbortError") return;
+    console.error("Matching error:", e);
+    document.getElementById(
+      "resultsContainer"
+    ).innerHTML = `<p class="error-msg">Error finding matches.</p>`;
+  }
+}
+
 /* ───────────────────────────
    Helpers
 ──────────────────────────── */
@@ -353,6 +432,14 @@ function displayResearchers(list) {
     card.addEventListener("click", () => showResearcherDetails(r));
     box.appendChild(card);
   });
+
+  if (apiAvailable && nextPage) {
+    const more = document.createElement("button");
+    more.className = "primary-button";
+    more.textContent = "Load more";
+    more.addEventListener("click", () => nextPage());
+    box.appendChild(more);
+  }
 }
 
 /* ───────────────────────────
@@ -449,17 +536,12 @@ document.addEventListener("DOMContentLoaded", () => {
     }, 150); // Debounce for better performance
   });
 
-  // Fetch faculty JSON but don't display initially
-  fetch("/data/results.json")
-    .then((r) => {
-      if (!r.ok) throw new Error(r.status);
-      return r.json();
-    })
-    .then((data) => {
-      allResearchers = data;
-      calculateTFIDF(allResearchers);  // Calculate TF-IDF after loading data
-      rebuildTopics();
+  // Ask the matching service for topics; fall back to the faculty JSON
+  loadTopics()
+    .then(() => {
+      apiAvailable = true;
     })
+    .catch(loadDataset)
     .catch((e) => {
       console.error("Loading error:", e);
       document.getElementById(
@@ -474,7 +556,11 @@ document.addEventListener("DOMContentLoaded", () => {
       radio.addEventListener("change", (e) => {
         currentModel = e.target.value;
         selectedResearchAreas.clear();
-        rebuildTopics();
+        if (apiAvailable) {
+          loadTopics().catch((err) => console.error("Loading error:", err));
+        } else {
+          rebuildTopics();
+        }
         // Clear results when model changes
         document.getElementById("resultsContainer").innerHTML = "";
         // Clear search
@@ -490,6 +576,10 @@ document.addEventListener("DOMContentLoaded", () => {
       const scrollPos = window.scrollY;
       
       // Display results
+      if (apiAvailable) {
+        findMatches(Array.from(selectedResearchAreas));
+        return;
+      }
       displayResearchers(matchingResearchers());
       
       // Restore scroll position after a brief delay to ensure DOM updates
@@ -499,7 +589,7 @@ document.addEventListener("DOMContentLoaded", () => {
     });
 
   // Initialize matching method selection
-  document.querySelectorAll('input[name="matching-method"]').forEach(radio => {
+  document.querySelectorAll('input[name="matching"]').forEach(radio => {
     radio.addEventListener('change', (e) => {
       selectedMatchingMethod = e.target.value;
       searchResearchers();
@@ -507,5 +597,5 @@ document.addEventListener("DOMContentLoaded", () => {
   });
 
   // Update event listeners to use new search function
-  document.getElementById('searchInput').addEventListener('input', searchResearchers);
+  document.getElementById('searchInput')?.addEventListener('input', searchResearchers);
 });
\ No newline at end of file
@@ -0,0 +1,95 @@
+'''
+Measures cold import time of the matching package in fresh interpreters.
+
+    python scripts/benchmark_imports.py --repeat 5 --offline
+
+Each statement runs in a new subprocess so module caches never carry
+over; pass --top to list the slowest modules reported by -X importtime.
+'''
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+
+REPO_ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATEMENTS: list[str] = [
+    'import matching',
+    'from matching.matchers import KeywordMatcher',
+    'from matching.matchers import TFIDFMatcher, Word2VecMatcher, DeepseekMatcher',
+    'import dashboard.monitor',
+]
+
+
+def time_statement(statement: str, env: dict[str, str]) -> float:
+    '''
+    Runs one statement in a fresh interpreter and returns its wall time.
+    '''
+    start_time = time.perf_counter()
+    subprocess.run(
+        [sys.executable, '-c', statement],
+        cwd=REPO_ROOT,
+        env=env,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - start_time
+
+
+def slowest_modules(
+    statement: str, env: dict[str, str], top: int
+) -> list[tuple[int, str]]:
+    '''
+    Returns the modules with the largest cumulative import time (us).
+    '''
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        modules.append((int(cumulative), name.strip()))
+    return sorted(modules, reverse=True)[:top]
+
+
+def main(repeat: int, offline: bool, top: int):
+    env = dict(os.environ)
+    if offline:
+        env['RESEARCHMATCH_OFFLINE'] = '1'
+
+    # interpreter start-up, subtracted from every measurement
+    baseline = statistics.median(
+        time_statement('pass', env) for _ in range(repeat)
+    )
+    print(f'Interpreter start-up: {baseline * 1000:.1f} ms\n')
+
+    for statement in STATEMENTS:
+        timings = [time_statement(statement, env) - baseline for _ in range(repeat)]
+        print(
+            f'{statement:<80} median {statistics.median(timings) * 1000:8.1f} ms'
+            f' | min {min(timings) * 1000:8.1f} ms'
+        )
+        if top:
+            for cumulative, name in slowest_modules(statement, env, top):
+                print(f'    {cumulative / 1000:8.1f} ms  {name}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Benchmark import time of the matching package.'
+    )
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per statement.')
+    parser.add_argument('--offline', action='store_true', help='Set RESEARCHMATCH_OFFLINE=1.')
+    parser.add_argument('--top', type=int, default=0, help='Show the N slowest modules.')
+    args = parser.parse_args()
+
+    main(args.repeat, args.offline, args.top)
@@ -0,0 +1,45 @@
+'''
+Builds the on-disk matcher index so matchers can start without refitting.
+
+    python scripts/build_index.py --data public/results.json --index index
+'''
+import os
+import sys
+import time
+import argparse
+
+# adjust path to import from parent directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matching.artifacts import INDEX_PATH
+from matching.matchers import (
+    DATA_PATH,
+    TFIDFMatcher,
+    Word2VecMatcher,
+    KeywordMatcher,
+)
+
+
+def build_index(data_path: str, index_path: str):
+    '''
+    Fits every indexable matcher and writes its artifacts.
+    '''
+    for matcher_class in (TFIDFMatcher, Word2VecMatcher, KeywordMatcher):
+        start_time = time.monotonic()
+        matcher = matcher_class(data_path)
+        matcher.save_index(index_path)
+        print(
+            f'Built {matcher.index_name} index in {time.monotonic() - start_time:.2f}s'
+        )
+    print(f'Index for dataset {matcher.dataset_version} written to {index_path}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Build persisted matcher index artifacts.'
+    )
+    parser.add_argument('--data', default=DATA_PATH, help='Dataset JSON file.')
+    parser.add_argument('--index', default=INDEX_PATH, help='Output index directory.')
+    args = parser.parse_args()
+
+    build_index(args.data, args.index)
@@ -0,0 +1,310 @@
+'''
+Populates research_areas from every LLM source in one concurrent batch job.
+
+    python scripts/enrich.py --data public/results.json --output public/data/results.json
+
+Each professor's Google Scholar profile is fetched once (SerpAPI, pooled
+session), reduced to a summary within the token budget (cached per scholar
+id, see scripts/scholar_features.py) and the resulting prompt is sent to
+every source at the same time.
+Sources share one provider per API (and one connection pool to the local
+Ollama server), each bounded by its own concurrency limit, so the job is
+limited by provider throughput rather than by waiting on one call at a time.
+
+Results are appended to a JSONL stream as they arrive. Rerunning skips every
+(professor, source) already in the stream whose scraped entry is unchanged,
+so interrupted runs resume and refreshed datasets only re-enrich changed
+profiles. The dataset is written at the end with research_areas keyed by
+source ('scraping', 'deepseek', 'chatgpt', 'mistral', 'llama').
+
+When it overwrites a previous enriched dataset, the changed and removed
+entries are also written as a delta to the delta directory (`--deltas`),
+keyed on the version of the file `app.py` serves, so its workers apply
+the refresh without a restart.
+'''
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# adjust path to import from parent directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matching.artifacts import dataset_version
+from matching.dataset import (
+    DELTA_PATH, record_key, record_hash, compute_delta, save_delta
+)
+from matching.providers import get_provider
+from scripts.llm import (
+    ENRICHMENT_SOURCES,
+    build_prompt,
+    parse_research_areas,
+)
+from scripts.scholar_features import (
+    SCHOLAR_TOKEN_BUDGET, ScholarFetchError, scholar_summary
+)
+
+
+DATA_PATH: str = 'public/results.json'
+OUTPUT_PATH: str = 'public/data/results.json'
+STREAM_PATH: str = 'enrichment.jsonl'
+SCHOLAR_CONCURRENCY: int = 4
+
+
+def scraped_research_areas(entry: dict) -> list[str]:
+    '''
+    Research areas of an entry that come from scraping.
+    '''
+    research_areas = entry.get('research_areas')
+    if isinstance(research_areas, dict):
+        return research_areas.get('scraping') or []
+    return research_areas or []
+
+
+def enrichment_hash(entry: dict) -> str:
+    '''
+    Hash of the fields an enrichment depends on; a change re-enriches the
+    entry.
+    '''
+    return record_hash({
+        'name': entry.get('name'),
+        'research_areas': scraped_research_areas(entry),
+        'google_scholar': (entry.get('link') or {}).get('google_scholar'),
+    })
+
+
+def load_stream(path: str) -> dict[tuple[str, str], dict]:
+    '''
+    Load the results already streamed to a JSONL file.
+
+    Args:
+        path: Stream file
+
+    Returns:
+        (record key, source) -> streamed row; later rows win
+    '''
+    rows = {}
+    if not os.path.exists(path):
+        return rows
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+                rows[(row['key'], row['source'])] = row
+            except (ValueError, KeyError):
+                # torn last line of an interrupted run
+                continue
+    return rows
+
+
+class EnrichmentRunner:
+    '''
+    Enriches dataset entries from several LLM sources concurrently,
+    streaming each result to a JSONL file.
+
+    Args:
+        sources: Names of the sources to query (keys of ENRICHMENT_SOURCES)
+        stream_path: JSONL file results are appended to
+        scholar_concurrency: Google Scholar profiles fetched at once
+        token_budget: Tokens of Scholar profile summary per prompt
+    '''
+    def __init__(
+            self,
+            sources: list[str],
+            stream_path: str = STREAM_PATH,
+            scholar_concurrency: int = SCHOLAR_CONCURRENCY,
+            token_budget: int = SCHOLAR_TOKEN_BUDGET
+        ):
+        self.sources = sources
+        self.stream_path = stream_path
+        self.scholar_concurrency = scholar_concurrency
+        self.token_budget = token_budget
+        self.results = load_stream(stream_path)
+        self.providers = {}
+        for source in sources:
+            provider = get_provider(ENRICHMENT_SOURCES[source][0])
+            if provider is None:
+                print(f'Warning: No provider for {source}, skipping it.')
+            else:
+                self.providers[source] = provider
+        self.counts = {'done': 0, 'reused': 0, 'failed': 0}
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=scholar_concurrency, pool_maxsize=scholar_concurrency
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _pending(self, entry: dict) -> list[str]:
+        '''
+        Sources without an up-to-date result for an entry.
+        '''
+        key, entry_hash = record_key(entry), enrichment_hash(entry)
+        pending = []
+        for source in self.providers:
+            row = self.results.get((key, source))
+            if row is not None and row.get('hash') == entry_hash:
+                self.counts['reused'] += 1
+            else:
+                pending.append(source)
+        return pending
+
+    async def _enrich_source(self, entry: dict, source: str, prompt: str, stream):
+        provider_name, model, system = ENRICHMENT_SOURCES[source]
+        messages = [{'role': 'user', 'content': prompt}]
+        if system is not None:
+            messages.insert(0, {'role': 'system', 'content': system})
+        try:
+            content = await self.providers[source].acomplete(messages, model)
+        except Exception as e:
+            self.counts['failed'] += 1
+            print(f"Warning: {source} failed for {entry.get('name')}. Error: {e!r}")
+            return
+
+        row = {
+            'key': record_key(entry),
+            'hash': enrichment_hash(entry),
+            'name': entry.get('name'),
+            'source': source,
+            'research_areas': parse_research_areas(content),
+            'raw': content,
+        }
+        stream.write(json.dumps(row) + '\n')
+        stream.flush()
+        self.results[(row['key'], source)] = row
+        self.counts['done'] += 1
+        print(f"[{self.counts['done']}] {source}: {row['name']}")
+
+    async def _enrich_entry(self, entry: dict, scholar_semaphore: asyncio.Semaphore, stream):
+        pending = self._pending(entry)
+        if not pending:
+            return
+        scholar_id = (entry.get('link') or {}).get('google_scholar', {}).get('google_scholar_id')
+        async with scholar_semaphore:
+            try:
+                google_scholar_summary = await asyncio.to_thread(
+                    scholar_summary, scholar_id, self.token_budget, self.session
+                )
+            except ScholarFetchError as e:
+                # nothing is streamed, so the next run retries the entry
+                self.counts['failed'] += len(pending)
+                print(f"Warning: Scholar profile failed for {entry.get('name')}. Error: {e}")
+                return
+        prompt = build_prompt(entry.get('name'), google_scholar_summary)
+        await asyncio.gather(*(
+            self._enrich_source(entry, source, prompt, stream) for source in pending
+        ))
+
+    async def run(self, entries: list[dict]):
+        '''
+        Enrich every entry from every source that has no up-to-date result.
+
+        Args:
+            entries: Dataset entries
+        '''
+        scholar_semaphore = asyncio.Semaphore(self.scholar_concurrency)
+        with open(self.stream_path, 'a') as stream:
+            await asyncio.gather(*(
+                self._enrich_entry(entry, scholar_semaphore, stream) for entry in entries
+            ))
+
+    def merge(self, entries: list[dict]) -> list[dict]:
+        '''
+        Entries with research_areas keyed by source.
+
+        Sources without a current result keep the areas the entry already
+        had for them, if any.
+
+        Args:
+            entries: Dataset entries
+
+        Returns:
+            New list of enriched entries
+        '''
+        merged = []
+        for entry in entries:
+            key, entry_hash = record_key(entry), enrichment_hash(entry)
+            previous = entry.get('research_areas')
+            previous = previous if isinstance(previous, dict) else {}
+            research_areas = {'scraping': scraped_research_areas(entry)}
+            for source in ENRICHMENT_SOURCES:
+                row = self.results.get((key, source))
+                if row is not None and row.get('hash') == entry_hash:
+                    research_areas[source] = row['research_areas']
+                else:
+                    research_areas[source] = previous.get(source) or []
+            merged.append({**entry, 'research_areas': research_areas})
+        return merged
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Populate research_areas from every LLM source.'
+    )
+    parser.add_argument('--data', default=DATA_PATH, help='Dataset JSON file to enrich.')
+    parser.add_argument('--output', default=OUTPUT_PATH, help='Enriched dataset JSON file.')
+    parser.add_argument('--stream', default=STREAM_PATH, help='JSONL file results are streamed to.')
+    parser.add_argument('--deltas', default=DELTA_PATH, help='Directory the dataset delta is written to.')
+    parser.add_argument(
+        '--sources', nargs='+', default=list(ENRICHMENT_SOURCES),
+        choices=list(ENRICHMENT_SOURCES), help='Sources to query.'
+    )
+    parser.add_argument(
+        '--scholar-concurrency', type=int, default=SCHOLAR_CONCURRENCY,
+        help='Google Scholar profiles fetched at once.'
+    )
+    parser.add_argument(
+        '--token-budget', type=int, default=SCHOLAR_TOKEN_BUDGET,
+        help='Tokens of Google Scholar profile summary per prompt.'
+    )
+    parser.add_argument(
+        '--concurrency', action='append', default=[],
+        help='Per-provider limit PROVIDER=N, e.g. ollama=1 (repeatable).'
+    )
+    parser.add_argument('--limit', type=int, default=None, help='Only query sources for the first N professors.')
+    args = parser.parse_args()
+
+    with open(args.data, 'r') as f:
+        entries = json.load(f)
+    old_records, base_version = None, None
+    if os.path.exists(args.output):
+        with open(args.output, 'rb') as f:
+            raw_data = f.read()
+        old_records, base_version = json.loads(raw_data), dataset_version(raw_data)
+
+    runner = EnrichmentRunner(
+        args.sources, args.stream, args.scholar_concurrency, args.token_budget
+    )
+    for limit in args.concurrency:
+        provider_name, _, value = limit.partition('=')
+        for source, provider in runner.providers.items():
+            if provider.name == provider_name:
+                provider.max_concurrency = int(value)
+
+    start_time = time.monotonic()
+    asyncio.run(runner.run(entries[:args.limit]))
+    enriched = runner.merge(entries)
+    raw_data = json.dumps(enriched, indent=4).encode('utf-8')
+    with open(f'{args.output}.tmp', 'wb') as f:
+        f.write(raw_data)
+    os.replace(f'{args.output}.tmp', args.output)
+    version = dataset_version(raw_data)
+
+    print(
+        f'Enriched {len(enriched)} professors in {time.monotonic() - start_time:.1f}s '
+        f'{runner.counts}, written to {args.output}'
+    )
+    if runner.counts['failed']:
+        print(f"{runner.counts['failed']} completions failed; rerun to retry them.")
+    if old_records is not None and version != base_version:
+        delta = compute_delta(old_records, enriched, base_version, version)
+        path = save_delta(delta, args.deltas)
+        print(
+            f"Delta {base_version} -> {version}: {len(delta['upserts'])} new or changed, "
+            f"{len(delta['removed'])} removed, written to {path}"
+        )
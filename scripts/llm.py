@@ -1,125 +1,181 @@
-from openai import OpenAI
-import requests
+import os
+import re
+import sys
 import json
+from functools import lru_cache
 
+# adjust path to import from parent directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-class LLM():
+from matching.providers import get_provider
+from scripts.scholar_features import (
+    SERPAPI_KEY, fetch_scholar_profile, scholar_summary
+)
+
+
+DATA_PATH = 'results.json'
+# research_areas source -> (provider name, model, system message)
+ENRICHMENT_SOURCES = {
+    'deepseek': ('deepseek', 'deepseek-chat', 'You are a helpful assistant'),
+    'chatgpt': ('openai', 'gpt-4', 'You are a helpful assistant.'),
+    'mistral': ('ollama', 'mistral', None),
+    'llama': ('ollama', 'llama3.2', None),
+}
+
+
+@lru_cache(maxsize=None)
+def load_professor_index(data_path=DATA_PATH):
     """
-    Class for interacting with various LLM APIs to analyze professor research areas.
+    Load the dataset once and index it by professor name.
+
+    Args:
+        data_path: Dataset JSON file
+
+    Returns:
+        Dictionary mapping names to data entries (the first entry wins)
     """
-    def __init__(self, professor):
-        self.serpapi_key = "ADD SERP KEY"
-        self.DEEPSEEK_API_KEY = "ADD DEEPSEEK KEY"
-        self.CHATGPT_API_KEY = "ADD CHATGPT KEY"
-        self.professor = professor
-        self.google_scholar_link = None
-        self.google_scholar_id = None
-        self.prof_info = self.get_prof_info()
-        self.google_scholar_html = self.get_html(self.google_scholar_id)
+    with open(data_path, 'r') as file:
+        data = json.load(file)
+
+    index = {}
+    for item in data:
+        index.setdefault(item.get('name'), item)
+    return index
+
+
+def build_prompt(professor, google_scholar_summary):
+    """
+    Build the prompt asking for a professor's research areas.
+
+    Args:
+        professor: Name of the professor
+        google_scholar_summary: Google Scholar profile summary from
+            `scholar_summary`
 
-        self.prompt = f""" 
-                        I want to work under {self.professor} as a Phd or research student. 
-                        To know if {self.professor} is the right fit for me, I want to know what kinds of topics they research and focus on. 
+    Returns:
+        Prompt string
+    """
+    return f""" 
+                        I want to work under {professor} as a Phd or research student. 
+                        To know if {professor} is the right fit for me, I want to know what kinds of topics they research and focus on. 
                         Give me keywords that describe the specific topics or subjects that they research or teach in. 
-                        To help you find the information I want, here is the html representation of their google scholar page:
+                        To help you find the information I want, here is a summary of their google scholar profile:
 
-                        {self.google_scholar_html}
+                        {google_scholar_summary}
 
                         The below is how I want you to format your response. Don't include anything in your response outside of the format shown below.
                         Your response should just be a single line. It should just have "Research Areas: " once, followed by a list of the keywords you determined separated by commas as shown below.
                         Research Areas: Topic 1, Topic 2, Topic 3, ... 
 
         """
-    
+
+
+def parse_research_areas(content):
+    """
+    Extract the research areas from an LLM response.
+
+    Args:
+        content: Response in the "Research Areas: Topic 1, Topic 2" format
+
+    Returns:
+        List of lowercase research areas
+    """
+    if not content:
+        return []
+    match = re.search(r"research areas:\s*(.*)", content, re.IGNORECASE | re.DOTALL)
+    text = match.group(1) if match else content
+    areas = [area.strip().strip('.').strip().lower() for area in re.split(r"[,;\n]", text)]
+    return [area for area in areas if area]
+
+
+class LLM():
+    """
+    Class for interacting with various LLM APIs to analyze professor research areas.
+
+    Completions go through the providers in matching/providers.py, which read
+    DEEPSEEK_API_KEY and OPENAI_API_KEY and can be pointed at the local
+    stand-in (scripts/llm_standin.py) or replay recordings via LLM_REPLAY_PATH.
+    For the whole dataset use scripts/enrich.py instead.
+    """
+    def __init__(self, professor):
+        self.serpapi_key = SERPAPI_KEY
+        self.professor = professor
+        self.google_scholar_link = None
+        self.google_scholar_id = None
+        self.prof_info = self.get_prof_info()
+        self.google_scholar_summary = scholar_summary(self.google_scholar_id)
+
+        self.prompt = build_prompt(self.professor, self.google_scholar_summary)
+
     def get_html(self, scholar_user_id):
         """
         Get Google Scholar profile data using SerpAPI.
-        
+
         Args:
             scholar_user_id: Google Scholar user ID
-            
+
         Returns:
             JSON response from SerpAPI
         """
-        try:
-            url = "https://serpapi.com/search"
-            params = {
-                "engine": "google_scholar_author",
-                "author_id": scholar_user_id,
-                "api_key": self.serpapi_key
-            }
-
-            response = requests.get(url, params=params)
-
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return f"Error: {response.status_code} - {response.reason}"
-        except Exception as e:
-            return f"An error occurred: {e}"
-    
+        return fetch_scholar_profile(scholar_user_id)
+
     def get_prof_info(self):
         """
         Get professor information from results.json.
-        
+
         Returns:
             Professor data entry or None if not found
         """
-        with open('results.json', 'r') as file:
-            data = json.load(file)
-        
-        for item in data:
-            if item.get('name') == self.professor:
-                google_scholar_link = item.get('link', {}).get('google_scholar', {}).get('google_scholar_link')
-                if google_scholar_link:
-                    self.google_scholar_link = google_scholar_link
-
-                google_scholar_id = item.get('link', {}).get('google_scholar', {}).get('google_scholar_id')
-                if google_scholar_id:
-                    self.google_scholar_id = google_scholar_id
-                return item  
-        return None 
+        item = load_professor_index().get(self.professor)
+        if item is None:
+            return None
+
+        google_scholar_link = item.get('link', {}).get('google_scholar', {}).get('google_scholar_link')
+        if google_scholar_link:
+            self.google_scholar_link = google_scholar_link
+
+        google_scholar_id = item.get('link', {}).get('google_scholar', {}).get('google_scholar_id')
+        if google_scholar_id:
+            self.google_scholar_id = google_scholar_id
+        return item
 
     def deepseek_for_info(self):
         """
         Get research areas using DeepSeek API.
-        
+
         Returns:
             Research areas as comma-separated string
         """
         prompt = self.prompt
-        client = OpenAI(api_key=self.DEEPSEEK_API_KEY, base_url="https://api.deepseek.com")
-        response = client.chat.completions.create(
+        content = get_provider("deepseek").complete(
             model="deepseek-chat",
             messages=[
                 {"role": "system", "content": "You are a helpful assistant"},
                 {"role": "user", "content": prompt},
             ],
-            stream=False
         )
 
-        print(response.choices[0].message.content)
-        return response.choices[0].message.content
-    
+        print(content)
+        return content
+
     def chatGPT_for_info(self):
         """
         Get research areas using ChatGPT API.
-        
+
         Returns:
             Research areas as comma-separated string
         """
         prompt = self.prompt
-        client = OpenAI(api_key=self.CHATGPT_API_KEY)
-        response = client.chat.completions.create(
-            model="gpt-4", 
+        content = get_provider("openai").complete(
+            model="gpt-4",
             messages=[
                 {"role": "system", "content": "You are a helpful assistant."},
                 {"role": "user", "content": prompt},
             ],
-            stream=False
         )
-        print(response.choices[0].message.content)
-        return response.choices[0].message.content
+        print(content)
+        return content
 
-llm = LLM("Mustaque Ahamad")
-llm.deepseek_for_info()
\ No newline at end of file
+if __name__ == "__main__":
+    llm = LLM("Mustaque Ahamad")
+    llm.deepseek_for_info()
@@ -0,0 +1,60 @@
+'''
+Runs a local OpenAI-compatible LLM stand-in that replays recorded completions.
+
+    python scripts/llm_standin.py --replay llm_evals/data/perplexity_outputs.jsonl \
+        --latency lognormal:0.8,0.5 --failure-rate 0.05 --port 8089
+
+Then point a provider at it, e.g. DEEPSEEK_BASE_URL=http://127.0.0.1:8089/v1.
+'''
+import os
+import sys
+import time
+import argparse
+
+# adjust path to import from parent directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matching.providers import ReplayProvider, LatencyModel
+from matching.standin import StandInServer
+
+
+REPLAY_PATH: str = 'llm_evals/data/perplexity_outputs.jsonl'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Serve recorded LLM completions over an OpenAI-compatible API.'
+    )
+    parser.add_argument('--replay', default=REPLAY_PATH, help='JSONL file of recorded completions.')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind.')
+    parser.add_argument('--port', type=int, default=8089, help='Port to bind.')
+    parser.add_argument(
+        '--latency', default='fixed:0',
+        help="Latency distribution: 'fixed:S', 'uniform:LOW,HIGH' or 'lognormal:MEDIAN,SIGMA'."
+    )
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Fraction of requests that fail.')
+    parser.add_argument('--failure-status', type=int, default=500, help='HTTP status of failed requests.')
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help='Fraction of requests that hang.')
+    parser.add_argument('--hang-seconds', type=float, default=3600.0, help='Duration of a hanging request.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the latency and failure draws.')
+    args = parser.parse_args()
+
+    provider = ReplayProvider.from_jsonl(
+        args.replay,
+        latency=LatencyModel.parse(args.latency),
+        failure_rate=args.failure_rate,
+        timeout_rate=args.timeout_rate,
+        hang_seconds=args.hang_seconds,
+        seed=args.seed,
+    )
+    server = StandInServer(provider, args.host, args.port, args.failure_status)
+    server.start()
+    print(
+        f'Replaying {len(provider.records)} completions at {server.base_url}'
+    )
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+        print(f'Stand-in stopped: {provider.stats()}')
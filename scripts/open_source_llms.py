@@ -1,32 +1,33 @@
-import subprocess
-import json
-import requests
-import time
+import os
+import sys
+
+# adjust path to import from parent directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matching.providers import get_provider
+from scripts.llm import load_professor_index, build_prompt
+from scripts.scholar_features import (
+    SERPAPI_KEY, fetch_scholar_profile, scholar_summary
+)
 
 class OpenSourceLLM():
     """
     Class for interacting with open source LLMs to analyze professor research areas.
+
+    Models are served by Ollama through its OpenAI-compatible API
+    (OLLAMA_BASE_URL, default http://localhost:11434/v1), or by the local
+    stand-in / LLM_REPLAY_PATH recordings (see matching/providers.py).
+    For the whole dataset use scripts/enrich.py instead.
     """
     def __init__(self, professor):
-         self.serpapi_key = "ADD SERP KEY"
+         self.serpapi_key = SERPAPI_KEY
          self.professor = professor
          self.google_scholar_link = None
          self.google_scholar_id = None
          self.prof_info = self.get_prof_info()
-         self.google_scholar_html = self.get_html(self.google_scholar_id)
-         self.prompt = f""" 
-                        I want to work under {self.professor} as a Phd or research student. 
-                        To know if {self.professor} is the right fit for me, I want to know what kinds of topics they research and focus on. 
-                        Give me keywords that describe the specific topics or subjects that they research or teach in. 
-                        To help you find the information I want, here is the html representation of their google scholar page:
-
-                        {self.google_scholar_html}
+         self.google_scholar_summary = scholar_summary(self.google_scholar_id)
+         self.prompt = build_prompt(self.professor, self.google_scholar_summary)
 
-                        The below is how I want you to format your response. Don't include anything in your response outside of the format shown below.
-                        Your response should just be a single line. It should just have "Research Areas: " once, followed by a list of the keywords you determined separated by commas as shown below.
-                        Research Areas: Topic 1, Topic 2, Topic 3, ... 
-
-        """
     def get_html(self, scholar_user_id):
         """
         Get Google Scholar profile data using SerpAPI.
@@ -37,22 +38,7 @@ class OpenSourceLLM():
         Returns:
             JSON response from SerpAPI
         """
-        try:
-            url = "https://serpapi.com/search"
-            params = {
-                "engine": "google_scholar_author",
-                "author_id": scholar_user_id,
-                "api_key": self.serpapi_key
-            }
-
-            response = requests.get(url, params=params)
-
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return f"Error: {response.status_code} - {response.reason}"
-        except Exception as e:
-            return f"An error occurred: {e}"
+        return fetch_scholar_profile(scholar_user_id)
         
     def get_prof_info(self):
         """
@@ -61,44 +47,48 @@ class OpenSourceLLM():
         Returns:
             Professor data entry or None if not found
         """
-        with open('results.json', 'r') as file:
-            data = json.load(file)
-        
-        for item in data:
-            if item.get('name') == self.professor:
-                google_scholar_link = item.get('link', {}).get('google_scholar', {}).get('google_scholar_link')
-                if google_scholar_link:
-                    self.google_scholar_link = google_scholar_link
+        item = load_professor_index().get(self.professor)
+        if item is None:
+            return None
+
+        google_scholar_link = item.get('link', {}).get('google_scholar', {}).get('google_scholar_link')
+        if google_scholar_link:
+            self.google_scholar_link = google_scholar_link
 
-                google_scholar_id = item.get('link', {}).get('google_scholar', {}).get('google_scholar_id')
-                if google_scholar_id:
-                    self.google_scholar_id = google_scholar_id
-                return item  
-        return None 
+        google_scholar_id = item.get('link', {}).get('google_scholar', {}).get('google_scholar_id')
+        if google_scholar_id:
+            self.google_scholar_id = google_scholar_id
+        return item 
     
-    def mistral_for_info(self):
+    def _ollama_for_info(self, model):
         """
-        Get research areas using Mistral model via Ollama.
+        Get research areas from a model served by Ollama.
         
+        Args:
+            model: Ollama model name
+            
         Returns:
             Research areas as comma-separated string
         """
         try:
-            result = subprocess.run(
-                ['ollama', 'run', 'mistral'], 
-                input=self.prompt,           
-                capture_output=True,           
-                text=True                     
+            content = get_provider("ollama").complete(
+                model=model,
+                messages=[{"role": "user", "content": self.prompt}],
             )
-
-            if result.returncode == 0:
-                print(result.stdout)
-                return(result.stdout)
-            else:
-                print(f"Error running Ollama: {result.stderr}")
+            print(content)
+            return content
 
         except Exception as e:
-            print(f"An error occurred: {e}")
+            print(f"Error running Ollama: {e}")
+
+    def mistral_for_info(self):
+        """
+        Get research areas using Mistral model via Ollama.
+        
+        Returns:
+            Research areas as comma-separated string
+        """
+        return self._ollama_for_info('mistral')
 
     def llama_for_info(self):
         """
@@ -107,22 +97,7 @@ class OpenSourceLLM():
         Returns:
             Research areas as comma-separated string
         """
-        try:
-            result = subprocess.run(
-                ['ollama', 'run', 'llama3.2'], 
-                input=self.prompt,           
-                capture_output=True,           
-                text=True                     
-            )
-
-            if result.returncode == 0:
-                print(result.stdout)
-                return(result.stdout)
-            else:
-                print(f"Error running Ollama: {result.stderr}")
-
-        except Exception as e:
-            print(f"An error occurred: {e}")
+        return self._ollama_for_info('llama3.2')
 
 if __name__ == "__main__":
     llm = OpenSourceLLM("Mustaque Ahamad")
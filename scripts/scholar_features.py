@@ -0,0 +1,284 @@
+'''
+Reduces Google Scholar profiles to the features LLM enrichment needs.
+
+A SerpAPI `google_scholar_author` response is tens of KB of JSON (links,
+thumbnails, citation graphs, ...). Only the interests, article titles and
+venues and the co-authors' affiliations say anything about research areas, so
+prompts carry just those, trimmed to a token budget:
+
+    Interests: Machine Learning, Optimization
+    Articles (title | venue, year):
+    - Online learning with ... | COLT, 2019
+    Co-authors (affiliation):
+    - Jane Doe (Georgia Tech)
+
+Extracted features are cached per scholar id (`SCHOLAR_CACHE_PATH`), so each
+profile is fetched from SerpAPI once and shared by every provider and run; the
+budget is applied when the prompt is built. Token counts use tiktoken when it
+is installed and about four characters per token otherwise.
+'''
+import os
+import json
+import requests
+
+
+SERPAPI_URL = os.environ.get('SERPAPI_URL', 'https://serpapi.com/search')
+SERPAPI_KEY = os.environ.get('SERPAPI_KEY', 'ADD SERP KEY')
+SCHOLAR_CACHE_PATH = os.environ.get('SCHOLAR_CACHE_PATH', 'scholar_cache')
+SCHOLAR_TOKEN_BUDGET = int(os.environ.get('SCHOLAR_TOKEN_BUDGET', 1000))
+TOKENIZER_ENCODING = 'cl100k_base'
+CHARS_PER_TOKEN = 4
+FEATURES_VERSION = 1
+NO_PROFILE = 'No Google Scholar profile available.'
+
+_encoding = None
+
+
+class ScholarFetchError(Exception):
+    """
+    Raised when a Google Scholar profile could not be fetched from SerpAPI.
+    """
+
+
+def count_tokens(text):
+    """
+    Estimate the number of tokens in a text.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Token count from tiktoken, or characters / 4 without it
+    """
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+        except Exception:
+            # tiktoken missing or its encoding cannot be downloaded
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text))
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def fetch_scholar_profile(scholar_user_id, session=None):
+    """
+    Get Google Scholar profile data using SerpAPI.
+
+    Args:
+        scholar_user_id: Google Scholar user ID
+        session: Optional pooled requests session
+
+    Returns:
+        JSON response from SerpAPI, or an error message
+    """
+    try:
+        params = {
+            "engine": "google_scholar_author",
+            "author_id": scholar_user_id,
+            "api_key": SERPAPI_KEY
+        }
+
+        response = (session or requests).get(SERPAPI_URL, params=params)
+
+        if response.status_code == 200:
+            return response.json()
+        else:
+            return f"Error: {response.status_code} - {response.reason}"
+    except Exception as e:
+        return f"An error occurred: {e}"
+
+
+def extract_features(profile):
+    """
+    Extract the research-relevant parts of a SerpAPI author response.
+
+    Args:
+        profile: Parsed SerpAPI response
+
+    Returns:
+        Dictionary of interests, articles and co-authors, or None if the
+        response is not a profile
+    """
+    if not isinstance(profile, dict) or 'author' not in profile:
+        return None
+    author = profile.get('author') or {}
+    return {
+        'version': FEATURES_VERSION,
+        'affiliations': author.get('affiliations'),
+        'interests': [
+            interest.get('title') for interest in author.get('interests') or []
+            if interest.get('title')
+        ],
+        # SerpAPI lists articles by citations, most cited first
+        'articles': [
+            {
+                'title': article.get('title'),
+                'venue': article.get('publication'),
+                'year': article.get('year'),
+            }
+            for article in profile.get('articles') or [] if article.get('title')
+        ],
+        'co_authors': [
+            {
+                'name': co_author.get('name'),
+                'affiliations': co_author.get('affiliations'),
+            }
+            for co_author in profile.get('co_authors') or [] if co_author.get('name')
+        ],
+    }
+
+
+def _article_line(article):
+    venue, year = article.get('venue'), article.get('year')
+    if venue and year and str(year) in venue:
+        # SerpAPI publications usually end with the year already
+        year = None
+    details = ', '.join(str(part) for part in (venue, year) if part)
+    return f"- {article['title']} | {details}" if details else f"- {article['title']}"
+
+
+def format_features(features, token_budget=SCHOLAR_TOKEN_BUDGET):
+    """
+    Render extracted features as prompt text within a token budget.
+
+    Affiliation and interests come first, then articles and co-authors in
+    order of relevance until the budget is used up. Every line, including
+    the affiliation and interests, counts against the budget.
+
+    Args:
+        features: Features from `extract_features`
+        token_budget: Maximum number of tokens of the rendered text
+
+    Returns:
+        Prompt text
+    """
+    lines = []
+    used = 0
+    if features.get('affiliations'):
+        line = f"Affiliation: {features['affiliations']}"
+        line_tokens = count_tokens(line) + 1
+        if line_tokens <= token_budget:
+            lines.append(line)
+            used += line_tokens
+    # keep as many interests as fit, dropping the last ones first
+    interests = list(features.get('interests') or [])
+    while interests:
+        line = f"Interests: {', '.join(interests)}"
+        line_tokens = count_tokens(line) + 1
+        if used + line_tokens <= token_budget:
+            lines.append(line)
+            used += line_tokens
+            break
+        interests.pop()
+    sections = [
+        ('Articles (title | venue, year):', [
+            _article_line(article) for article in features.get('articles') or []
+        ]),
+        ('Co-authors (affiliation):', [
+            f"- {co_author['name']}" + (
+                f" ({co_author['affiliations']})" if co_author.get('affiliations') else ''
+            )
+            for co_author in features.get('co_authors') or []
+        ]),
+    ]
+
+    for heading, items in sections:
+        if not items:
+            continue
+        heading_tokens = count_tokens(heading) + 1
+        if used + heading_tokens + count_tokens(items[0]) + 1 > token_budget:
+            continue
+        lines.append(heading)
+        used += heading_tokens
+        for item in items:
+            item_tokens = count_tokens(item) + 1
+            if used + item_tokens > token_budget:
+                break
+            lines.append(item)
+            used += item_tokens
+    return '\n'.join(lines) if lines else NO_PROFILE
+
+
+class ScholarFeatureCache:
+    """
+    Directory of extracted Scholar features, one JSON file per scholar id.
+
+    Args:
+        path: Cache directory, or None to disable caching
+    """
+    def __init__(self, path=SCHOLAR_CACHE_PATH):
+        self.path = path
+
+    def _file(self, scholar_id):
+        return os.path.join(self.path, f"{scholar_id}.json")
+
+    def get(self, scholar_id):
+        """
+        Cached features of a scholar, or None.
+        """
+        if self.path is None:
+            return None
+        try:
+            with open(self._file(scholar_id), 'r') as f:
+                features = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if features.get('version') != FEATURES_VERSION:
+            return None
+        return features
+
+    def set(self, scholar_id, features):
+        """
+        Cache the features of a scholar.
+        """
+        if self.path is None:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        path = self._file(scholar_id)
+        # unique temp name: several threads may fetch the same profile
+        tmp_path = f"{path}.{os.getpid()}.{id(features)}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(features, f)
+        os.replace(tmp_path, path)
+
+
+_default_cache = ScholarFeatureCache()
+
+
+def scholar_summary(scholar_id, token_budget=SCHOLAR_TOKEN_BUDGET, session=None, cache=None):
+    """
+    Prompt text describing a scholar's profile, fetched and extracted once
+    per scholar id.
+
+    Args:
+        scholar_id: Google Scholar user ID (None if unknown)
+        token_budget: Maximum number of tokens of the summary
+        session: Optional pooled requests session
+        cache: Feature cache (defaults to SCHOLAR_CACHE_PATH)
+
+    Returns:
+        Summary text
+
+    Raises:
+        ScholarFetchError: If SerpAPI failed; the error text must not be
+            passed off as a profile, so callers skip (and later retry) the
+            professor
+    """
+    if not scholar_id:
+        return NO_PROFILE
+    cache = _default_cache if cache is None else cache
+    features = cache.get(scholar_id)
+    if features is None:
+        profile = fetch_scholar_profile(scholar_id, session)
+        if isinstance(profile, str):
+            raise ScholarFetchError(profile)
+        if isinstance(profile, dict) and profile.get('error'):
+            raise ScholarFetchError(f"SerpAPI error: {profile['error']}")
+        features = extract_features(profile)
+        if features is None:
+            return NO_PROFILE
+        cache.set(scholar_id, features)
+    return format_features(features, token_budget)
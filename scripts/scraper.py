@@ -1,187 +1,933 @@
+'''
+Scrapes the faculty directory, profiles, Google Scholar and ORCID into
+results.json.
+
+The scrape runs as a pipeline of stages (directory -> profile -> scholar ->
+orcid) joined by queues, each with its own worker threads. Requests are
+bounded per host (concurrent requests and requests per second) instead of
+sleeping between professors, go through pooled sessions, and every finished
+step is appended to a journal so an interrupted run resumes where it stopped:
+
+    python scripts/scraper.py --output public/results.json --journal scraper_journal.jsonl
+
+With `--incremental`, pages are re-fetched conditionally with the ETag and
+Last-Modified validators of the previous run, unchanged pages (304 or same
+content hash) reuse their parsed results, and the Scholar / ORCID searches
+of a professor are only repeated once older than `--max-age` days:
+
+    python scripts/scraper.py --incremental --output public/results.json
+
+Running matchers are refreshed by `scripts/enrich.py`, which writes the
+served dataset and its delta.
+
+All base URLs can be pointed at a local server serving fixture pages, e.g.
+
+    SCRAPER_DIRECTORY_URL='http://127.0.0.1:8000/people/faculty?page=' \
+    SCRAPER_PROFILE_URL=http://127.0.0.1:8000 \
+    SCRAPER_SCHOLAR_URL=http://127.0.0.1:8000 \
+    SCRAPER_ORCID_URL=http://127.0.0.1:8000 \
+    SCRAPER_SEARCH_URL=http://127.0.0.1:8000/html/ \
+    python scripts/scraper.py --pages 2 --limit 127.0.0.1=8:50
+'''
+import os
 import re
+import sys
+import json
 import time
-import random
+import hashlib
+import queue
+import argparse
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlparse, parse_qs
+
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
-from duckduckgo_search import DDGS
 
-NUM_DIRECTORY_PAGES = 24
-UNIVERSITY = "Georgia Institute of Technology"
-DIRECTORY_BASE_URL = "https://www.cc.gatech.edu/people/faculty?page="
-PROFILE_BASE_URL = "https://www.cc.gatech.edu"
+# adjust path to import from parent directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+
+NUM_DIRECTORY_PAGES: int = int(os.environ.get('SCRAPER_DIRECTORY_PAGES', 24))
+UNIVERSITY: str = "Georgia Institute of Technology"
+DIRECTORY_BASE_URL: str = os.environ.get(
+    'SCRAPER_DIRECTORY_URL', "https://www.cc.gatech.edu/people/faculty?page="
+)
+PROFILE_BASE_URL: str = os.environ.get('SCRAPER_PROFILE_URL', "https://www.cc.gatech.edu")
+SCHOLAR_BASE_URL: str = os.environ.get('SCRAPER_SCHOLAR_URL', "https://scholar.google.com")
+ORCID_BASE_URL: str = os.environ.get('SCRAPER_ORCID_URL', "https://orcid.org")
+# HTML search endpoint answering `?q=` with `a.result__a` links (the layout of
+# html.duckduckgo.com); the duckduckgo_search client is used when unset
+SEARCH_URL: str | None = os.environ.get('SCRAPER_SEARCH_URL')
+SEARCH_HOST: str = 'duckduckgo.com'
+
+OUTPUT_PATH: str = 'public/results.json'
+JOURNAL_PATH: str = 'scraper_journal.jsonl'
+STATE_PATH: str = 'scraper_state.json'
+SEARCH_MAX_AGE_DAYS: float = 30.0
+REQUEST_TIMEOUT_SECONDS: float = float(os.environ.get('SCRAPER_TIMEOUT_SECONDS', 30))
+USER_AGENT: str = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/105.0.0.0 Safari/537.36'
+
+# host -> (max concurrent requests, requests per second)
+HOST_LIMITS: dict[str, tuple[int, float]] = {
+    'www.cc.gatech.edu': (4, 4.0),
+    'scholar.google.com': (1, 0.2),
+    SEARCH_HOST: (1, 0.5),
+    'orcid.org': (2, 1.0),
+}
+DEFAULT_HOST_LIMIT: tuple[int, float] = (2, 1.0)
+STAGE_WORKERS: dict[str, int] = {
+    'directory': 2,
+    'profile': 4,
+    'scholar': 2,
+    'orcid': 2,
+}
+
+
+class TokenBucket:
+    """
+    Rate limiter allowing `rate` acquisitions per second with bursts of up to
+    `capacity`. Callers over the rate reserve a future slot and sleep until it.
+
+    Args:
+        rate: Tokens added per second (0 or less disables limiting)
+        capacity: Maximum number of stored tokens
+    """
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take one token, blocking until it is available.
+        """
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+class HostLimiter:
+    """
+    Per-host concurrency limits and rate limiters, created on first use.
+
+    Args:
+        limits: Host -> (max concurrent requests, requests per second)
+        default: Limit of hosts not in `limits`
+    """
+    def __init__(
+            self,
+            limits: dict[str, tuple[int, float]] | None = None,
+            default: tuple[int, float] = DEFAULT_HOST_LIMIT
+        ):
+        self.limits = dict(HOST_LIMITS if limits is None else limits)
+        self.default = default
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _get(self, host: str) -> tuple[threading.Semaphore, TokenBucket]:
+        with self._lock:
+            if host not in self._hosts:
+                concurrency, rate = self.limits.get(host, self.default)
+                self._hosts[host] = (
+                    threading.BoundedSemaphore(max(1, concurrency)),
+                    TokenBucket(rate),
+                )
+            return self._hosts[host]
+
+    @contextmanager
+    def limit(self, host: str):
+        """
+        Hold one of the host's request slots for the duration of the block.
+
+        Args:
+            host: Host name the request goes to
+        """
+        semaphore, bucket = self._get(host)
+        with semaphore:
+            bucket.acquire()
+            yield
+
+
+def parse_host_limit(value: str) -> tuple[str, tuple[int, float]]:
+    """
+    Parse a `HOST=CONCURRENCY:RATE` limit.
+
+    Args:
+        value: Limit specification, e.g. `scholar.google.com=1:0.2`
+
+    Returns:
+        Tuple of (host, (concurrency, requests per second))
+    """
+    host, _, spec = value.partition('=')
+    concurrency, _, rate = spec.partition(':')
+    if not host or not concurrency or not rate:
+        raise ValueError(f"Invalid host limit '{value}', expected HOST=CONCURRENCY:RATE")
+    return host, (int(concurrency), float(rate))
+
+
+class Journal:
+    """
+    Append-only JSONL log of finished pipeline steps, keyed by (stage, key).
+
+    Loading tolerates a torn last line, so a run killed mid-write resumes from
+    every step that was fully recorded. A run that finishes cleanly appends a
+    marker with `finish`; steps recorded before the last marker belong to a
+    completed run and are not replayed, so a kept journal never stands in
+    for fetching (or revalidating) pages in a later run.
+
+    Args:
+        path: Journal file, or None to disable journaling
+    """
+    def __init__(self, path: str | None):
+        self.path = path
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._file = None
+        if path is None:
+            return
+        needs_newline = False
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                for line in f:
+                    needs_newline = not line.endswith('\n')
+                    try:
+                        entry = json.loads(line)
+                        if entry.get('finished'):
+                            self._entries.clear()
+                            continue
+                        self._entries[(entry['stage'], entry['key'])] = entry['data']
+                    except (ValueError, KeyError, AttributeError):
+                        continue
+        self._file = open(path, 'a')
+        if needs_newline:
+            self._file.write('\n')
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def done(self, stage: str, key: str) -> bool:
+        """
+        Whether a step has been recorded.
+        """
+        return (stage, key) in self._entries
+
+    def get(self, stage: str, key: str):
+        """
+        Result of a recorded step, or None.
+        """
+        return self._entries.get((stage, key))
+
+    def record(self, stage: str, key: str, data):
+        """
+        Record a finished step, flushing it to disk.
+
+        Args:
+            stage: Pipeline stage name
+            key: Item key within the stage
+            data: JSON-serializable step result
+        """
+        with self._lock:
+            self._entries[(stage, key)] = data
+            if self._file is not None:
+                self._file.write(json.dumps({'stage': stage, 'key': key, 'data': data}) + '\n')
+                self._file.flush()
+
+    def finish(self):
+        """
+        Mark the run as completed, so the next run starts from scratch.
+        """
+        with self._lock:
+            self._entries.clear()
+            if self._file is not None:
+                self._file.write(json.dumps({'finished': time.time()}) + '\n')
+                self._file.flush()
+
+    def close(self):
+        """
+        Close the journal file.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class PageCache:
+    """
+    State kept across runs for incremental refreshes: the HTTP validators,
+    content hash and parsed result of every fetched page, and the result of
+    every search with the time it was made.
+
+    Args:
+        path: JSON state file, or None to keep the state in memory only
+    """
+    def __init__(self, path: str | None):
+        self.path = path
+        self.state = {'pages': {}, 'searches': {}}
+        self._lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    self.state.update(json.load(f))
+            except ValueError as e:
+                print(f"Warning: Ignoring unreadable state {path}. Error: {e}")
+
+    def page(self, url: str) -> dict | None:
+        """
+        Cached entry of a page, or None.
+        """
+        return self.state['pages'].get(url)
+
+    def set_page(self, url: str, entry: dict):
+        with self._lock:
+            self.state['pages'][url] = entry
+
+    def search(self, kind: str, key: str) -> dict | None:
+        """
+        Cached result of a search, or None.
+        """
+        return self.state['searches'].get(f'{kind}:{key}')
+
+    def set_search(self, kind: str, key: str, result):
+        with self._lock:
+            self.state['searches'][f'{kind}:{key}'] = {
+                'result': result, 'checked': time.time()
+            }
+
+    def save(self):
+        """
+        Atomically write the state file.
+        """
+        if self.path is None:
+            return
+        with self._lock:
+            with open(f'{self.path}.tmp', 'w') as f:
+                json.dump(self.state, f)
+            os.replace(f'{self.path}.tmp', self.path)
+
+
+_local = threading.local()
+
+
+def get_session() -> requests.Session:
+    """
+    Pooled HTTP session of the calling thread, retrying throttled and failed
+    requests with backoff.
+    """
+    session = getattr(_local, 'session', None)
+    if session is None:
+        retry = Retry(
+            total=3,
+            backoff_factor=1.0,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=('GET',),
+        )
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8, max_retries=retry)
+        session = requests.Session()
+        session.headers['User-Agent'] = USER_AGENT
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _local.session = session
+    return session
+
+
+def fetch(limiter: HostLimiter, url: str, **kwargs) -> requests.Response:
+    """
+    GET a page within its host's limits.
+
+    Args:
+        limiter: Per-host limiter
+        url: Page URL
+        **kwargs: Passed to `requests.Session.get`
+
+    Returns:
+        Successful response
+    """
+    with limiter.limit(urlparse(url).hostname):
+        response = get_session().get(url, timeout=REQUEST_TIMEOUT_SECONDS, **kwargs)
+    response.raise_for_status()
+    return response
+
+
+def search_first_link(limiter: HostLimiter, query: str) -> str | None:
+    """
+    Link of the top web search result.
+
+    Args:
+        limiter: Per-host limiter
+        query: Search query
+
+    Returns:
+        First result URL or None
+    """
+    if SEARCH_URL:
+        response = fetch(limiter, SEARCH_URL, params={'q': query})
+        soup = BeautifulSoup(response.content, 'html.parser')
+        a_tag = soup.find('a', class_='result__a')
+        if a_tag is None:
+            return None
+        link = a_tag['href']
+        # DuckDuckGo wraps results in a redirect carrying the target in `uddg`
+        redirect_target = parse_qs(urlparse(link).query).get('uddg')
+        return redirect_target[0] if redirect_target else link
+
+    search = getattr(_local, 'ddgs', None)
+    if search is None:
+        from duckduckgo_search import DDGS
+        search = _local.ddgs = DDGS()
+    with limiter.limit(SEARCH_HOST):
+        results = search.text(query, max_results=1)
+    for r in results:
+        return r['href']
+    return None
 
-all_records = []
 
-def fetch_google_scholar_details(professor_name, university):
+def fetch_google_scholar_details(limiter, professor_name, university):
     """
     Fetch Google Scholar profile details using DuckDuckGo search.
-    
+
     Args:
+        limiter: Per-host limiter
         professor_name: Name of the professor
         university: University name
-        
+
     Returns:
         Tuple of (Google Scholar link, Google Scholar ID) or None
     """
-    search = DDGS()
-    query = f"{professor_name} {university} Google Scholar"
-    results = search.text(query, max_results=1)
-    for r in results:
-        link = r['href']
-        if 'https://scholar.google.com/citations?user=' not in link:
-            return
-        else:
-            scholar_id = link.split("user=")[1].split("&")[0]
-            return link, scholar_id
+    link = search_first_link(limiter, f"{professor_name} {university} Google Scholar")
+    if not link or f'{SCHOLAR_BASE_URL}/citations?user=' not in link:
+        return
+    scholar_id = link.split("user=")[1].split("&")[0]
+    return link, scholar_id
+
 
-def fetch_orcid_details(professor_name, university):
+def fetch_orcid_details(limiter, professor_name, university):
     """
     Fetch ORCID profile details using DuckDuckGo search.
-    
+
     Args:
+        limiter: Per-host limiter
         professor_name: Name of the professor
         university: University name
-        
+
     Returns:
         Tuple of (ORCID link, ORCID ID) or None
     """
-    search = DDGS()
-    query = f"{professor_name} {university} ORCID"
-    results = search.text(query, max_results=1)
-    for r in results:
-        link = r['href']
-        if 'https://orcid.org' not in link:
-            return
-        else:
-            orcid_id = link.split(".org/")[1]
-            return link, orcid_id
+    link = search_first_link(limiter, f"{professor_name} {university} ORCID")
+    if not link or ORCID_BASE_URL not in link:
+        return
+    orcid_id = link.split(urlparse(ORCID_BASE_URL).netloc + "/")[1]
+    return link, orcid_id
 
-for page_number in range(NUM_DIRECTORY_PAGES):
-    print("Page Number:", page_number)
-    url = DIRECTORY_BASE_URL + str(page_number)
-    directory_page = requests.get(url)
-    soup = BeautifulSoup(directory_page.content, 'html.parser')
-    card_blocks = soup.find_all('div', class_='card-block')
 
-    i = 1
-    for card in card_blocks:
-        print(i)
-        i += 1
+def parse_directory_page(content) -> list[dict]:
+    """
+    Faculty cards of a directory page.
 
+    Args:
+        content: Directory page HTML
+
+    Returns:
+        List of dicts with name, title and profile_link
+    """
+    soup = BeautifulSoup(content, 'html.parser')
+    cards = []
+    for card in soup.find_all('div', class_='card-block'):
         h4_tag = card.find('h4')
-        name = h4_tag.get_text(strip=True)
-        title = card.find('h6').get_text(strip=True)
-        
         a_tag = h4_tag.find('a')
-        profile_link = PROFILE_BASE_URL + a_tag['href']
-
-        profile_page = requests.get(profile_link)
-        soup = BeautifulSoup(profile_page.content, 'html.parser')
-        affiliation_divs = soup.find_all('div', class_='field__item')
-        
-        affiliations = None
-        for affiliation_div in affiliation_divs:
-            if "field__item" in affiliation_div['class'][0]:
-                a_tag = affiliation_div.find('a')
-
-                if a_tag:
-                    if affiliations:
-                        affiliations.append(a_tag.get_text(strip=True))
-                    else:
-                        affiliations = [a_tag.get_text(strip=True), ]
-
-        profile_details = soup.find_all('p', class_='card-block__text')
-
-        email_tag = profile_details[0].find('a')
-        email = None
-        if email_tag:
-            email = email_tag.get_text()
-
-        personal_website_tag = profile_details[1].find('a')
-        personal_website = None
-        if personal_website_tag:
-            personal_website = personal_website_tag.get_text()
-
-        research_areas_text = profile_details[2].get_text()
-        research_areas = None
-        if len(research_areas_text) > 1:
-            research_areas = re.split(r"[,;]\s*", research_areas_text.lstrip("\nResearch Areas:").lower().strip())
-
-        statistics_data = None
-        google_scholar_research_areas = None
-        google_scholar_details = fetch_google_scholar_details(name, UNIVERSITY)
-        if google_scholar_details:
-            google_scholar_link, google_scholar_id = google_scholar_details
-
-            headers = {'User-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/105.0.0.0 Safari/537.36'}
-            google_scholar_page = requests.get(google_scholar_link, headers=headers)
-            soup = BeautifulSoup(google_scholar_page.content, 'html.parser')
-            table = soup.find('table', id='gsc_rsb_st')
-
-            statistics_data = []
-            rows = table.find_all('tr')
-            for row in rows:
-                data_element = row.find_all('td', class_='gsc_rsb_std')
-                for datum in data_element:
-                    if not statistics_data:
-                        statistics_data = [datum.get_text(), ]
-                    else:
-                        statistics_data.append(datum.get_text())
-            
-            google_scholar_research_areas = soup.find('div', class_='gsc_prf_il', id='gsc_prf_int')
-            research_area_links = google_scholar_research_areas.find_all('a')
-            google_scholar_research_areas = []
-            for link in research_area_links:
-                google_scholar_research_areas.append(link.get_text().lower())
-        else:
-            google_scholar_link, google_scholar_id = None, None
-        
-        orcid_details = fetch_orcid_details(name, UNIVERSITY)
-        if orcid_details:
-            orcid_link, orcid_id = orcid_details
-        else:
-            orcid_link, orcid_id = None, None
-
-        if research_areas is not None and google_scholar_research_areas is not None:
-            research_areas.extend(google_scholar_research_areas)
-        elif research_areas is None and google_scholar_research_areas is not None:
-            research_areas = google_scholar_research_areas
-
-        record = {
-            "name": name,
-            "title": title,
-            "email": email,
-            "dept_affiliations": affiliations,
-            "research_areas": research_areas,
-            "link": {
-                "profile_link": profile_link,
-                "personal_website": personal_website,
-                "google_scholar": {
-                    "google_scholar_id": google_scholar_id,
-                    "google_scholar_link": google_scholar_link
-                },
-                "orcid": {
-                    "orcid_id": orcid_id,
-                    "orcid_link": orcid_link
-                }
+        cards.append({
+            "name": h4_tag.get_text(strip=True),
+            "title": card.find('h6').get_text(strip=True),
+            "profile_link": PROFILE_BASE_URL + a_tag['href'],
+        })
+    return cards
+
+
+def parse_profile_page(content) -> dict:
+    """
+    Affiliations, contact details and research areas of a profile page.
+
+    Args:
+        content: Profile page HTML
+
+    Returns:
+        Dict with email, dept_affiliations, personal_website and research_areas
+    """
+    soup = BeautifulSoup(content, 'html.parser')
+    affiliation_divs = soup.find_all('div', class_='field__item')
+
+    affiliations = None
+    for affiliation_div in affiliation_divs:
+        if "field__item" in affiliation_div['class'][0]:
+            a_tag = affiliation_div.find('a')
+
+            if a_tag:
+                if affiliations:
+                    affiliations.append(a_tag.get_text(strip=True))
+                else:
+                    affiliations = [a_tag.get_text(strip=True), ]
+
+    profile_details = soup.find_all('p', class_='card-block__text')
+
+    email_tag = profile_details[0].find('a')
+    email = None
+    if email_tag:
+        email = email_tag.get_text()
+
+    personal_website_tag = profile_details[1].find('a')
+    personal_website = None
+    if personal_website_tag:
+        personal_website = personal_website_tag.get_text()
+
+    research_areas_text = profile_details[2].get_text()
+    research_areas = None
+    if len(research_areas_text) > 1:
+        research_areas = re.split(r"[,;]\s*", research_areas_text.lstrip("\nResearch Areas:").lower().strip())
+
+    return {
+        "email": email,
+        "dept_affiliations": affiliations,
+        "personal_website": personal_website,
+        "research_areas": research_areas,
+    }
+
+
+def parse_scholar_page(content) -> tuple[list[str] | None, list[str] | None]:
+    """
+    Citation statistics and interests of a Google Scholar profile.
+
+    Args:
+        content: Google Scholar profile HTML
+
+    Returns:
+        Tuple of (statistics table cells, research areas), each None if absent
+    """
+    soup = BeautifulSoup(content, 'html.parser')
+
+    statistics_data = None
+    table = soup.find('table', id='gsc_rsb_st')
+    if table is not None:
+        statistics_data = [
+            datum.get_text()
+            for row in table.find_all('tr')
+            for datum in row.find_all('td', class_='gsc_rsb_std')
+        ] or None
+
+    google_scholar_research_areas = None
+    interests = soup.find('div', class_='gsc_prf_il', id='gsc_prf_int')
+    if interests is not None:
+        google_scholar_research_areas = [
+            link.get_text().lower() for link in interests.find_all('a')
+        ]
+    return statistics_data, google_scholar_research_areas
+
+
+def build_record(item: dict) -> dict:
+    """
+    Assemble the results.json entry of a professor that went through every
+    stage.
+    """
+    profile = item['profile']
+    scholar = item['scholar']
+    orcid = item['orcid']
+    statistics_data = scholar['statistics']
+
+    research_areas = profile['research_areas']
+    google_scholar_research_areas = scholar['research_areas']
+    if research_areas is not None and google_scholar_research_areas is not None:
+        research_areas = research_areas + google_scholar_research_areas
+    elif research_areas is None and google_scholar_research_areas is not None:
+        research_areas = google_scholar_research_areas
+
+    return {
+        "name": item['name'],
+        "title": item['title'],
+        "email": profile['email'],
+        "dept_affiliations": profile['dept_affiliations'],
+        "research_areas": research_areas,
+        "link": {
+            "profile_link": item['profile_link'],
+            "personal_website": profile['personal_website'],
+            "google_scholar": {
+                "google_scholar_id": scholar['id'],
+                "google_scholar_link": scholar['link']
             },
-            "statistics": {
-                "all": {
-                    "citations": statistics_data[0] if statistics_data else 0,
-                    "h-index": statistics_data[2] if statistics_data else 0,
-                    "i10-index": statistics_data[4] if statistics_data else 0
-                },
-                "since2020": {
-                    "citations": statistics_data[1] if statistics_data else 0,
-                    "h-index": statistics_data[3] if statistics_data else 0,
-                    "i10-index": statistics_data[5] if statistics_data else 0
-                }
+            "orcid": {
+                "orcid_id": orcid['id'],
+                "orcid_link": orcid['link']
+            }
+        },
+        "statistics": {
+            "all": {
+                "citations": statistics_data[0] if statistics_data else 0,
+                "h-index": statistics_data[2] if statistics_data else 0,
+                "i10-index": statistics_data[4] if statistics_data else 0
+            },
+            "since2020": {
+                "citations": statistics_data[1] if statistics_data else 0,
+                "h-index": statistics_data[3] if statistics_data else 0,
+                "i10-index": statistics_data[5] if statistics_data else 0
             }
         }
+    }
+
+
+class ScraperPipeline:
+    """
+    Directory, profile, Google Scholar and ORCID stages joined by queues.
+
+    Each stage looks its items up in the journal before doing any work and
+    records what it finished, so rerunning after an interruption only fetches
+    what is missing. Failed items are reported and left out of the journal to
+    be retried by the next run; a run with failures must not be written out,
+    since failed professors (or whole directory pages) are missing from its
+    records. A failed Scholar or ORCID lookup only degrades its professor,
+    who is written without it.
+
+    Args:
+        journal: Journal of finished steps
+        limiter: Per-host limiter shared by all stages
+        num_pages: Number of directory pages
+        workers: Stage name -> number of worker threads
+        cache: Page and search state of previous runs, updated as pages
+            are fetched
+        incremental: Whether to revalidate pages and reuse recent searches
+            from `cache` instead of fetching everything
+        max_age: Age in seconds after which a search is repeated
+    """
+    STAGES: tuple[str, ...] = ('directory', 'profile', 'scholar', 'orcid')
+
+    def __init__(
+            self,
+            journal: Journal,
+            limiter: HostLimiter,
+            num_pages: int = NUM_DIRECTORY_PAGES,
+            workers: dict[str, int] | None = None,
+            cache: PageCache | None = None,
+            incremental: bool = False,
+            max_age: float = SEARCH_MAX_AGE_DAYS * 86400
+        ):
+        self.journal = journal
+        self.limiter = limiter
+        self.num_pages = num_pages
+        self.workers = {**STAGE_WORKERS, **(workers or {})}
+        self.cache = cache if cache is not None else PageCache(None)
+        self.incremental = incremental
+        self.max_age = max_age
+        self.records = []
+        self.counts = {
+            stage: {'done': 0, 'unchanged': 0, 'resumed': 0, 'failed': 0, 'degraded': 0}
+            for stage in self.STAGES
+        }
+        self._lock = threading.Lock()
+
+    def _count(self, stage: str, outcome: str):
+        with self._lock:
+            self.counts[stage][outcome] += 1
+
+    def _step(self, stage: str, key: str, work):
+        """
+        Result of a stage for one item, from the journal or by running `work`.
+        """
+        if self.journal.done(stage, key):
+            self._count(stage, 'resumed')
+            return self.journal.get(stage, key)
+        data = work()
+        self.journal.record(stage, key, data)
+        self._count(stage, 'done')
+        return data
+
+    def _fetch_parsed(self, stage: str, url: str, parse):
+        """
+        Parsed content of a page, revalidated against the cached copy in
+        incremental mode.
+
+        Args:
+            stage: Stage counting the outcome
+            url: Page URL
+            parse: Function parsing the page content into JSON-serializable data
+
+        Returns:
+            Parsed page
+        """
+        entry = self.cache.page(url)
+        headers = {}
+        if self.incremental and entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        response = fetch(self.limiter, url, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            self._count(stage, 'unchanged')
+            return entry['data']
+
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        if self.incremental and entry is not None and entry['hash'] == content_hash:
+            self._count(stage, 'unchanged')
+            data = entry['data']
+        else:
+            data = parse(response.content)
+        self.cache.set_page(url, {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'hash': content_hash,
+            'data': data,
+        })
+        return data
+
+    def _search(self, kind: str, item: dict, lookup):
+        """
+        Search result for a professor, reusing a recent one in incremental
+        mode.
+
+        Args:
+            kind: Search kind, e.g. 'scholar'
+            item: Professor item
+            lookup: Search function taking (limiter, name, university)
+
+        Returns:
+            Tuple of (link, id) or None
+        """
+        cached = self.cache.search(kind, item['profile_link'])
+        if (
+            self.incremental and cached is not None
+            and time.time() - cached['checked'] < self.max_age
+        ):
+            return cached['result']
+        result = lookup(self.limiter, item['name'], UNIVERSITY)
+        self.cache.set_search(kind, item['profile_link'], list(result) if result else None)
+        return result
+
+    def _directory(self, page_number: int) -> list[dict]:
+        def work():
+            cards = self._fetch_parsed(
+                'directory', DIRECTORY_BASE_URL + str(page_number), parse_directory_page
+            )
+            return [{**card, 'order': [page_number, i]} for i, card in enumerate(cards)]
+        cards = self._step('directory', str(page_number), work)
+        print(f"Page {page_number}: {len(cards)} professors")
+        return cards
+
+    def _profile(self, item: dict) -> list[dict]:
+        item['profile'] = self._step(
+            'profile',
+            item['profile_link'],
+            lambda: self._fetch_parsed('profile', item['profile_link'], parse_profile_page),
+        )
+        return [item]
+
+    def _scholar(self, item: dict) -> list[dict]:
+        def work():
+            details = self._search('scholar', item, fetch_google_scholar_details)
+            if not details:
+                return {'link': None, 'id': None, 'statistics': None, 'research_areas': None}
+            link, scholar_id = details
+            statistics_data, research_areas = self._fetch_parsed(
+                'scholar', link, lambda content: list(parse_scholar_page(content))
+            )
+            return {
+                'link': link,
+                'id': scholar_id,
+                'statistics': statistics_data,
+                'research_areas': research_areas,
+            }
+        item['scholar'] = self._optional_step('scholar', item, work, {
+            'link': None, 'id': None, 'statistics': None, 'research_areas': None,
+        })
+        return [item]
+
+    def _orcid(self, item: dict) -> list[dict]:
+        def work():
+            details = self._search('orcid', item, fetch_orcid_details)
+            link, orcid_id = details if details else (None, None)
+            return {'link': link, 'id': orcid_id}
+        item['orcid'] = self._optional_step('orcid', item, work, {'link': None, 'id': None})
+        record = build_record(item)
+        with self._lock:
+            self.records.append((item['order'], record))
+            done = len(self.records)
+        print(f"{done}: {item['name']}")
+        return []
+
+    def _optional_step(self, stage: str, item: dict, work, fallback: dict) -> dict:
+        """
+        Like `_step`, but a failure is counted as degraded and yields
+        `fallback`, so the professor is still written. The step is not
+        journaled and its search not cached, so the next run retries it.
+        """
+        try:
+            return self._step(stage, item['profile_link'], work)
+        except Exception as e:
+            self._count(stage, 'degraded')
+            print(f"Warning: {stage} lookup failed for {item['name']}: {e}")
+            return fallback
+
+    def _worker(self, stage: str, handler, inbox: queue.Queue, outbox: queue.Queue | None):
+        while True:
+            item = inbox.get()
+            if item is None:
+                return
+            try:
+                for result in handler(item):
+                    outbox.put(result)
+            except Exception as e:
+                self._count(stage, 'failed')
+                label = item['name'] if isinstance(item, dict) else f'page {item}'
+                print(f"Warning: {stage} failed for {label}: {e}")
+
+    def run(self) -> list[dict]:
+        """
+        Scrape every directory page through all stages.
+
+        Returns:
+            Records in directory order
+        """
+        handlers = {
+            'directory': self._directory,
+            'profile': self._profile,
+            'scholar': self._scholar,
+            'orcid': self._orcid,
+        }
+        queues = {stage: queue.Queue() for stage in self.STAGES}
+        stage_threads = {}
+        for i, stage in enumerate(self.STAGES):
+            outbox = queues[self.STAGES[i + 1]] if i + 1 < len(self.STAGES) else None
+            stage_threads[stage] = [
+                threading.Thread(
+                    target=self._worker,
+                    args=(stage, handlers[stage], queues[stage], outbox),
+                    name=f'scraper-{stage}-{n}',
+                    daemon=True,
+                )
+                for n in range(max(1, self.workers[stage]))
+            ]
+            for thread in stage_threads[stage]:
+                thread.start()
+
+        for page_number in range(self.num_pages):
+            queues['directory'].put(page_number)
+        # a stage is drained once every upstream worker has exited
+        for stage in self.STAGES:
+            for _ in stage_threads[stage]:
+                queues[stage].put(None)
+            for thread in stage_threads[stage]:
+                thread.join()
+
+        self.records.sort(key=lambda entry: entry[0])
+        return [record for _, record in self.records]
+
+    @property
+    def failed(self) -> int:
+        """
+        Number of failed steps.
+        """
+        return sum(counts['failed'] for counts in self.counts.values())
+
+    @property
+    def degraded(self) -> int:
+        """
+        Number of failed optional lookups whose professors were written
+        without them.
+        """
+        return sum(counts['degraded'] for counts in self.counts.values())
+
+
+def write_results(records: list[dict], path: str):
+    """
+    Atomically write records as results.json.
+    """
+    with open(f'{path}.tmp', 'w') as outfile:
+        json.dump(records, outfile, indent=4)
+    os.replace(f'{path}.tmp', path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Scrape faculty profiles into results.json.'
+    )
+    parser.add_argument('--output', default=OUTPUT_PATH, help='Output JSON file.')
+    parser.add_argument('--journal', default=JOURNAL_PATH, help='Journal file used to resume runs.')
+    parser.add_argument('--fresh', action='store_true', help='Discard the journal and scrape everything.')
+    parser.add_argument('--keep-journal', action='store_true', help='Keep the journal after a clean run.')
+    parser.add_argument('--state', default=STATE_PATH, help='Page and search state kept across runs.')
+    parser.add_argument(
+        '--incremental', action='store_true',
+        help='Revalidate pages and reuse recent searches from the state file.'
+    )
+    parser.add_argument(
+        '--max-age', type=float, default=SEARCH_MAX_AGE_DAYS,
+        help='Days after which Scholar and ORCID searches are repeated.'
+    )
+    parser.add_argument('--pages', type=int, default=NUM_DIRECTORY_PAGES, help='Number of directory pages.')
+    parser.add_argument(
+        '--limit', action='append', default=[], type=parse_host_limit,
+        help='Per-host limit HOST=CONCURRENCY:RATE (repeatable).'
+    )
+    for stage, count in STAGE_WORKERS.items():
+        parser.add_argument(
+            f'--{stage}-workers', type=int, default=count,
+            help=f'Worker threads of the {stage} stage.'
+        )
+    args = parser.parse_args()
+
+    if args.fresh and os.path.exists(args.journal):
+        os.remove(args.journal)
+    journal = Journal(args.journal)
+    if len(journal):
+        print(f"Resuming from {args.journal} ({len(journal)} finished steps)")
 
-        all_records.append(record)
-        time.sleep(random.uniform(5, 10))
+    cache = PageCache(args.state)
+    pipeline = ScraperPipeline(
+        journal,
+        HostLimiter({**HOST_LIMITS, **dict(args.limit)}),
+        num_pages=args.pages,
+        workers={stage: getattr(args, f'{stage}_workers') for stage in STAGE_WORKERS},
+        cache=cache,
+        incremental=args.incremental,
+        max_age=args.max_age * 86400,
+    )
+    start_time = time.monotonic()
+    try:
+        records = pipeline.run()
+        if not pipeline.failed:
+            journal.finish()
+    finally:
+        journal.close()
+        cache.save()
+    if pipeline.failed:
+        # failed items are missing from the records; writing them would
+        # drop those professors from the dataset and from live matchers
+        for stage, counts in pipeline.counts.items():
+            print(f"  {stage}: {counts}")
+        print(
+            f"{pipeline.failed} steps failed; {args.output} was not updated. "
+            f"Rerun to retry them from {args.journal}"
+        )
+        sys.exit(1)
+    write_results(records, args.output)
 
-with open("../public/results.json", "w") as outfile:
-    json.dump(all_records, outfile, indent=4)
\ No newline at end of file
+    print(f"Wrote {len(records)} professors to {args.output} in {time.monotonic() - start_time:.1f}s")
+    for stage, counts in pipeline.counts.items():
+        print(f"  {stage}: {counts}")
+    if pipeline.degraded:
+        print(
+            f"Warning: {pipeline.degraded} Scholar / ORCID lookups failed; those "
+            f"professors were written without them and are retried by the next run"
+        )
+    if not args.keep_journal:
+        os.remove(args.journal)
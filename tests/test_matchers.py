@@ -3,6 +3,7 @@ import sys
 import time
 import json
 import nltk
+import asyncio
 import random
 import argparse
 import concurrent.futures
@@ -19,6 +20,9 @@ sys.path.append(
 )
 
 from matching.sorters import SortMetric
+from dashboard.monitor import (
+    get_cache_stats, metrics_writer, quality_evaluator
+)
 from matching.matchers import (
     NUM_MATCHES,
     Matcher,
@@ -163,6 +167,31 @@ def generate_random_query(
     return ' '.join(selected_words)
 
 
+def next_query(
+    research_words_list: list[str],
+    novel_words_list: list[str]
+) -> str:
+    '''
+    Repeats a recent query or generates a new one.
+    '''
+    if recent_queries and random.random() < REPEAT_QUERY_PROBABILITY:
+        # repeat query
+        return random.choice(recent_queries)
+    # new query
+    query = generate_random_query(
+        research_words_list, 
+        novel_words_list,
+        WORDS_PER_QUERY, 
+        NUM_NOVEL_WORDS
+    )
+    # add to recent queries
+    if query:
+        recent_queries.append(query)
+        if len(recent_queries) > RECENT_QUERY_BUFFER_SIZE:
+            recent_queries.pop(0)       # pop oldest
+    return query
+
+
 def run_match_query(
     matcher_instance: Matcher,
     query: str,
@@ -196,42 +225,18 @@ def run_match_query(
         )
 
 
-def main(duration_seconds: int):
-
-    print(
-        f'Starting metrics test for {duration_seconds} seconds...'
-    )
-    print(
-        f'Request rate (Poisson lambda): {POISSON_LAMBDA} requests/sec'
-    )
-
-    research_words_set = load_research_words(DATA_PATH)
-    if not research_words_set:
-        print(
-            'No research words for query generation.'
-        )
-        return
-    research_words_list = list(research_words_set)
-    
-    # get novel/dummy words
-    novel_words_list = get_novel_words(research_words_set)
-
-    # init matchers
-    matchers = ([
-        TFIDFMatcher(DATA_PATH), Word2VecMatcher(DATA_PATH), KeywordMatcher(DATA_PATH)
-    ])
-    
-    # init sorters
-    sort_options = (
-        [None]
-        +
-        [metric for metric in SortMetric if metric != SortMetric.CUSTOM]
-    )
-
-    start_time = time.time()
-    end_time = start_time + duration_seconds
+def run_threaded(
+    matchers: list[Matcher],
+    sort_options: list[Optional[SortMetric]],
+    research_words_list: list[str],
+    novel_words_list: list[str],
+    end_time: float,
+    duration_seconds: int
+) -> int:
+    '''
+    Issues Poisson-timed queries from a bounded thread pool.
+    '''
     run_count = 0
-
     with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
         threads = []
         while time.time() < end_time:
@@ -263,22 +268,7 @@ def main(duration_seconds: int):
                 sorter = random.choice(sort_options)
                 
                 # make or repeat query
-                if recent_queries and random.random() < REPEAT_QUERY_PROBABILITY:
-                    # repeat query
-                    query = random.choice(recent_queries)
-                else:
-                    # new query
-                    query = generate_random_query(
-                        research_words_list, 
-                        novel_words_list,
-                        WORDS_PER_QUERY, 
-                        NUM_NOVEL_WORDS
-                    )
-                    # add to recent queries
-                    if query:
-                        recent_queries.append(query)
-                        if len(recent_queries) > RECENT_QUERY_BUFFER_SIZE:
-                            recent_queries.pop(0)       # pop oldest
+                query = next_query(research_words_list, novel_words_list)
                 
                 thread = executor.submit(
                     run_match_query, matcher, query, sorter, run_count
@@ -291,10 +281,138 @@ def main(duration_seconds: int):
         )
         # wait for threads to complete
         concurrent.futures.wait(threads)
+    return run_count
+
+
+async def arun_match_query(
+    matcher_instance: Matcher,
+    query: str,
+    sort_metric: Optional[SortMetric],
+    run_id: int
+):
+    '''
+    Sends a matching query through the async interface.
+    '''
+    matcher_name = type(matcher_instance).__name__
+
+    sort_name = (
+        sort_metric.name if sort_metric else 'DefaultSimilarity'
+    )
+    start_time = time.monotonic()
+    try:
+        results = await matcher_instance.aget_matches(
+            query=query,
+            N=NUM_MATCHES,
+            sort_by=sort_metric,
+            sort_reverse=True
+        )
+        duration = time.monotonic() - start_time
+        print(
+            f'Run {run_id}: OK - {matcher_name} | Sort: {sort_name} | Query: "{query[:30]}..." | Duration: {duration:.4f}s | Results: {len(results)}'
+        )
+    except Exception as e:
+        duration = time.monotonic() - start_time
+        print(
+            f'Run {run_id}: FAILED - {matcher_name} | Sort: {sort_name} | Query: "{query[:30]}..." | Duration: {duration:.4f}s | Error: {e}'
+        )
+
+
+async def amain_loop(
+    matchers: list[Matcher],
+    sort_options: list[Optional[SortMetric]],
+    research_words_list: list[str],
+    novel_words_list: list[str],
+    duration_seconds: int
+) -> int:
+    '''
+    Issues Poisson-timed queries as tasks on one event loop.
+    '''
+    loop = asyncio.get_running_loop()
+    end_time = loop.time() + duration_seconds
+    run_count = 0
+    tasks = set()
+    while True:
+        # sleep until next query
+        await asyncio.sleep(random.expovariate(POISSON_LAMBDA))
+        if loop.time() >= end_time:
+            break
+        run_count += 1
+        task = asyncio.create_task(arun_match_query(
+            random.choice(matchers),
+            next_query(research_words_list, novel_words_list),
+            random.choice(sort_options),
+            run_count
+        ))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    print(
+        f'\nTest duration ({duration_seconds}s) reached. Waiting for {len(tasks)} pending tasks...'
+    )
+    await asyncio.gather(*tasks)
+    return run_count
+
+
+def main(duration_seconds: int, use_async: bool = False):
+
+    print(
+        f'Starting metrics test for {duration_seconds} seconds...'
+    )
+    print(
+        f'Request rate (Poisson lambda): {POISSON_LAMBDA} requests/sec'
+    )
+
+    research_words_set = load_research_words(DATA_PATH)
+    if not research_words_set:
+        print(
+            'No research words for query generation.'
+        )
+        return
+    research_words_list = list(research_words_set)
+    
+    # get novel/dummy words
+    novel_words_list = get_novel_words(research_words_set)
+
+    # init matchers
+    matchers = ([
+        TFIDFMatcher(DATA_PATH), Word2VecMatcher(DATA_PATH), KeywordMatcher(DATA_PATH)
+    ])
+    
+    # init sorters
+    sort_options = (
+        [None]
+        +
+        [metric for metric in SortMetric if metric != SortMetric.CUSTOM]
+    )
+
+    start_time = time.time()
+    end_time = start_time + duration_seconds
+
+    if use_async:
+        run_count = asyncio.run(amain_loop(
+            matchers, sort_options,
+            research_words_list, novel_words_list, duration_seconds
+        ))
+    else:
+        run_count = run_threaded(
+            matchers, sort_options,
+            research_words_list, novel_words_list, end_time, duration_seconds
+        )
 
     print(
         f'\nStress test finished. Total runs initiated: {run_count}'
     )
+    print(
+        f'Cache tiers: {get_cache_stats()}'
+    )
+    quality_evaluator.flush()
+    print(
+        f'Quality evaluation: {quality_evaluator.stats()}'
+    )
+    metrics_writer.flush()
+    print(
+        f'Metrics writer: {metrics_writer.stats()}'
+    )
 
 
 if __name__ == '__main__':
@@ -306,6 +424,12 @@ if __name__ == '__main__':
         type=int, 
         help='Duration of the test in seconds.'
     )
+    parser.add_argument(
+        '--async',
+        dest='use_async',
+        action='store_true',
+        help='Issue queries as asyncio tasks via aget_matches instead of threads.'
+    )
     args = parser.parse_args()
     
-    main(args.duration) 
\ No newline at end of file
+    main(args.duration, args.use_async) 
\ No newline at end of file